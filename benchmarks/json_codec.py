@@ -0,0 +1,108 @@
+"""
+Compares json codec backends on compiled blueprints of examples/
+
+Usage: python benchmarks/json_codec.py [-n ROUNDS] [EXAMPLE_FILE ...]
+
+Examples reading secrets (read_local_file) need those files in the local
+dir, and examples referring to server entities need a synced cache. Such
+examples are skipped if they can not be compiled.
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from prettytable import PrettyTable
+
+from calm.dsl.cli.bps import (
+    get_blueprint_module_from_file,
+    get_blueprint_class_from_module,
+)
+from calm.dsl.tools import codec
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "examples")
+
+
+def get_example_files():
+
+    files = []
+    for example_dir in sorted(glob.glob(os.path.join(EXAMPLES_DIR, "*"))):
+        py_files = sorted(glob.glob(os.path.join(example_dir, "*.py")))
+        bp_files = [f for f in py_files if "blueprint" in os.path.basename(f)]
+        if bp_files or py_files:
+            files.append((bp_files or py_files)[0])
+    return files
+
+
+def load_blueprint(bp_file):
+
+    try:
+        bp_module = get_blueprint_module_from_file(bp_file)
+        return get_blueprint_class_from_module(bp_module)
+    except Exception as exc:
+        print("Skipping {}: {}".format(bp_file, exc))
+        return None
+
+
+def timeit(func, rounds):
+
+    start = time.perf_counter()
+    try:
+        for _ in range(rounds):
+            func()
+    except Exception:
+        # Compile of some blueprints (ex: pod deployments) is not repeatable
+        return None
+    return (time.perf_counter() - start) / rounds * 1000  # ms
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--rounds", type=int, default=50)
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args()
+
+    backends = [codec.BACKEND.JSON]
+    if codec.orjson is not None:
+        backends.append(codec.BACKEND.ORJSON)
+    else:
+        print("orjson is not installed, only json backend is measured")
+
+    table = PrettyTable()
+    table.field_names = ["BLUEPRINT", "SIZE (KB)", "OPERATION"] + [
+        "{} (ms)".format(backend) for backend in backends
+    ]
+
+    default_backend = codec.get_backend()
+    for bp_file in args.files or get_example_files():
+        bp = load_blueprint(bp_file)
+        if bp is None:
+            continue
+
+        payload = bp.get_dict()
+        data = codec.dumps_bytes(payload)
+        operations = [
+            ("dumps", lambda: codec.dumps_bytes(payload)),
+            ("loads", lambda: codec.loads(data)),
+            ("get_dict", bp.get_dict),
+        ]
+
+        name = os.path.basename(bp_file)
+        for op_name, func in operations:
+            timings = []
+            for backend in backends:
+                codec.set_backend(backend)
+                timing = timeit(func, args.rounds)
+                timings.append("-" if timing is None else "{:.3f}".format(timing))
+
+            table.add_row([name, len(data) // 1024, op_name] + timings)
+            name = ""
+
+    codec.set_backend(default_backend)
+    print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Measures lookup and sync throughput of cache tables in local db, alone and
+under concurrent readers and writers (like parallel calm processes)
+
+Usage: python benchmarks/local_db.py [--entries N] [--readers R] [--writers W]
+                                     [--duration SECONDS]
+
+Each setting uses its own db file in a temp dir. "defaults" opens it like
+earlier versions did (peewee defaults, no secondary indexes, deferred write
+transactions), "tuned" with pragmas, busy timeout and indexes of
+calm.dsl.db.handler and write transactions taking the lock upfront.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from prettytable import PrettyTable
+from peewee import OperationalError
+
+import calm.dsl.cli  # noqa: F401, loads modules in order
+from calm.dsl.db.handler import DB_PRAGMAS, DB_BUSY_TIMEOUT
+from calm.dsl.db.table_config import dsl_database, AhvImagesCache
+
+IMAGE_TYPES = ["DISK_IMAGE", "ISO_IMAGE"]
+
+SETTINGS = {
+    "defaults": {"pragmas": [], "timeout": 5, "indexes": False, "lock_type": None},
+    "tuned": {
+        "pragmas": DB_PRAGMAS,
+        "timeout": DB_BUSY_TIMEOUT,
+        "indexes": True,
+        "lock_type": "IMMEDIATE",
+    },
+}
+
+
+def get_entries(count, offset=0):
+
+    return [
+        {
+            "name": "image-{}".format(index),
+            "uuid": "uuid-{}".format(index),
+            "image_type": IMAGE_TYPES[index % len(IMAGE_TYPES)],
+        }
+        for index in range(offset, offset + count)
+    ]
+
+
+def open_db(db_file, setting):
+
+    dsl_database.init(
+        db_file, pragmas=setting["pragmas"], timeout=setting["timeout"],
+    )
+    dsl_database.connect(reuse_if_open=True)
+
+
+def create_db(db_file, setting, entries):
+
+    open_db(db_file, setting)
+    dsl_database.create_tables([AhvImagesCache])
+    if not setting["indexes"]:
+        AhvImagesCache._schema.drop_indexes(safe=True)
+
+    start = time.perf_counter()
+    AhvImagesCache.replace_entries(get_entries(entries))
+    sync_time = time.perf_counter() - start
+    dsl_database.close()
+    return sync_time
+
+
+def lookup(entries):
+
+    index = random.randrange(entries)
+    return AhvImagesCache.get_entity_data(
+        "image-{}".format(index), image_type=IMAGE_TYPES[index % len(IMAGE_TYPES)]
+    )
+
+
+def time_lookups(db_file, setting, entries, count):
+
+    open_db(db_file, setting)
+    start = time.perf_counter()
+    for _ in range(count):
+        lookup(entries)
+    elapsed = time.perf_counter() - start
+    dsl_database.close()
+    return elapsed
+
+
+def worker(role, db_file, setting, entries, duration, results):
+    """Runs lookups (reader) or incremental syncs of 100 entries (writer) for
+    duration seconds. Puts (role, done operations, errors) in results"""
+
+    open_db(db_file, setting)
+    done = errors = 0
+    end = time.time() + duration
+    while time.time() < end:
+        try:
+            if role == "reader":
+                lookup(entries)
+            else:
+                offset = random.randrange(entries)
+                with dsl_database.atomic(setting["lock_type"]):
+                    # Sync reads synced uuids before writing updates
+                    len(AhvImagesCache.select(AhvImagesCache.uuid))
+                    AhvImagesCache.delete_entries(
+                        ["uuid-{}".format(offset + i) for i in range(100)]
+                    )
+                    AhvImagesCache.insert_entries(get_entries(100, offset))
+            done += 1
+        except OperationalError:
+            # database is locked
+            errors += 1
+
+    dsl_database.close()
+    results.put((role, done, errors))
+
+
+def run_concurrently(db_file, setting, args):
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker,
+            args=(role, db_file, setting, args.entries, args.duration, results),
+        )
+        for role in ["reader"] * args.readers + ["writer"] * args.writers
+    ]
+    for process in processes:
+        process.start()
+
+    totals = {"reader": [0, 0], "writer": [0, 0]}
+    for _ in processes:
+        role, done, errors = results.get()
+        totals[role][0] += done
+        totals[role][1] += errors
+    for process in processes:
+        process.join()
+
+    return totals
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=3)
+    args = parser.parse_args()
+
+    table = PrettyTable()
+    table.field_names = [
+        "SETTING",
+        "SYNC (rows/s)",
+        "LOOKUP (/s)",
+        "CONCURRENT LOOKUP (/s)",
+        "CONCURRENT SYNC (/s)",
+        "LOCKED ERRORS",
+    ]
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        for name, setting in SETTINGS.items():
+            db_file = os.path.join(tmp_dir, "{}.db".format(name))
+            sync_time = create_db(db_file, setting, args.entries)
+            lookup_time = time_lookups(db_file, setting, args.entries, args.lookups)
+            totals = run_concurrently(db_file, setting, args)
+
+            table.add_row(
+                [
+                    name,
+                    "{:.0f}".format(args.entries / sync_time),
+                    "{:.0f}".format(args.lookups / lookup_time),
+                    "{:.0f}".format(totals["reader"][0] / args.duration),
+                    "{:.1f}".format(totals["writer"][0] / args.duration),
+                    totals["reader"][1] + totals["writer"][1],
+                ]
+            )
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Measures cost of disabled (below log level) debug logging on compile and api calls
+
+Usage: python benchmarks/logging_overhead.py [-n ROUNDS] [--entities N]
+
+Each operation is timed with the lazy logger and with an eager one, which
+builds every debug message and looks up caller line with inspect.stack(),
+like the logger did before messages were made lazy. Log level is INFO in
+both cases, so no debug message is actually written.
+"""
+
+import argparse
+import inspect
+import os
+import time
+
+from prettytable import PrettyTable
+
+from calm.dsl.cli.bps import (
+    get_blueprint_module_from_file,
+    get_blueprint_class_from_module,
+)
+from calm.dsl.tools import logger
+from calm.dsl.fake_server import FakeServer
+
+EXAMPLE_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "examples", "Hadoop", "hadoop.py"
+)
+
+
+def eager_debug(self, msg, *args, **kwargs):
+    """Debug logging without level check, as done earlier"""
+
+    inspect.stack()
+    if callable(msg):
+        msg = msg()
+    if args:
+        msg = msg % args
+    self.get_logger().debug(":] {}".format(msg), **kwargs)
+
+
+def timeit(func, rounds):
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1000  # ms
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--rounds", type=int, default=20)
+    parser.add_argument("--entities", type=int, default=100)
+    parser.add_argument("--file", default=EXAMPLE_FILE)
+    args = parser.parse_args()
+
+    logger.set_verbose_level(logger.CustomLogging.INFO)
+
+    bp_module = get_blueprint_module_from_file(args.file)
+    bp = get_blueprint_class_from_module(bp_module)
+
+    server = FakeServer()
+    server.store.seed(blueprints=args.entities)
+
+    operations = [
+        ("compile {}".format(os.path.basename(args.file)), bp.get_dict),
+    ]
+
+    with server:
+        client = server.get_client_handle()
+        operations.append(
+            (
+                "list {} blueprints".format(args.entities),
+                lambda: client.blueprint.list({"length": args.entities}),
+            )
+        )
+        payload = {"spec": bp.get_dict(), "metadata": {"kind": "blueprint"}}
+        operations.append(
+            (
+                "create {}".format(os.path.basename(args.file)),
+                lambda: client.blueprint.create(payload),
+            )
+        )
+
+        table = PrettyTable()
+        table.field_names = ["OPERATION", "EAGER (ms)", "LAZY (ms)", "SAVING"]
+        lazy_debug = logger.CustomLogging.debug
+        for op_name, func in operations:
+            func()  # warm up
+            logger.CustomLogging.debug = eager_debug
+            eager = timeit(func, args.rounds)
+            logger.CustomLogging.debug = lazy_debug
+            lazy = timeit(func, args.rounds)
+
+            table.add_row(
+                [
+                    op_name,
+                    "{:.3f}".format(eager),
+                    "{:.3f}".format(lazy),
+                    "{:.0%}".format((eager - lazy) / eager),
+                ]
+            )
+
+    print(table)
+
+
+if __name__ == "__main__":
+    main()
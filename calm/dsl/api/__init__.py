@@ -1,9 +1,35 @@
-from .handle import get_client_handle, get_api_client, update_client_handle
+from .handle import (
+    get_client_handle,
+    get_api_client,
+    update_client_handle,
+    get_server_client,
+    get_server_names,
+    map_servers,
+)
+from .connection import RequestError, raise_request_errors
 from .resource import get_resource_api
+from .async_handle import get_async_client_handle, get_async_api_client
+from .metrics import get_request_metrics
+from .coalescer import (
+    request_coalescing,
+    start_request_coalescing,
+    stop_request_coalescing,
+)
 
 __all__ = [
     "get_client_handle",
     "get_resource_api",
     "get_api_client",
     "update_client_handle",
+    "get_server_client",
+    "get_server_names",
+    "map_servers",
+    "get_async_client_handle",
+    "get_async_api_client",
+    "get_request_metrics",
+    "request_coalescing",
+    "start_request_coalescing",
+    "stop_request_coalescing",
+    "RequestError",
+    "raise_request_errors",
 ]
@@ -1,8 +1,12 @@
 from .resource import ResourceAPI
 from .connection import REQUEST
+from .batch import BatchAPI
 
 
 class ApplicationAPI(ResourceAPI):
+
+    GROUPS_ENTITY_TYPE = "app"
+
     def __init__(self, connection):
         super().__init__(connection, resource_type="apps")
 
@@ -35,8 +39,28 @@ class ApplicationAPI(ResourceAPI):
             delete_url, verify=False, method=REQUEST.METHOD.DELETE
         )
 
-    def download_runlog(self, app_id, runlog_id):
+    def delete_many(self, app_ids, soft_delete=False):
+        delete_url = self.ITEM
+        if soft_delete:
+            delete_url += "?type=soft"
+        requests = [
+            (REQUEST.METHOD.DELETE, delete_url.format(app_id), None)
+            for app_id in app_ids
+        ]
+        return BatchAPI(self.connection).execute(requests)
+
+    def download_runlog(
+        self, app_id, runlog_id, file=None, progress=None, resume=False
+    ):
+        """Downloads runlog archive. If file (path or file object) is given,
+        archive is streamed into it instead of being loaded in memory"""
+
         download_url = self.DOWNLOAD_RUNLOG.format(app_id, runlog_id)
+        if file is not None:
+            return self.connection.stream(
+                download_url, file, verify=False, progress=progress, resume=resume
+            )
+
         return self.connection._call(
             download_url, method=REQUEST.METHOD.GET, verify=False
         )
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+async_connection: Provides an asyncio transport to make requests to calm
+
+Requests are still made by the blocking `Connection`, so url building,
+auth, retries and the (response, error) model are shared. Each request is
+run on a bounded thread pool and awaited from the event loop, which lets
+callers fan out list/read/poll calls instead of paying serial latency.
+
+Example:
+
+pc_ip = "<pc_ip>"
+pc_port = 9440
+client = AsyncConnection(pc_ip, pc_port,
+                         auth=("<pc_username>", "<pc_passwd>"))
+client.connect()
+res, err = await client.call("api/nutanix/v3/apps/list",
+                             request_json={"length": 20})
+
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from calm.dsl.tools import get_logging_handle
+from .connection import Connection, REQUEST
+
+LOG = get_logging_handle(__name__)
+
+
+class AsyncConnection:
+    """Asyncio interface over a blocking `Connection`.
+
+    This is not a native asyncio transport: each request occupies a worker
+    thread while it is made, and the event loop only awaits its result. So
+    at most `max_concurrency` requests (the size of worker pool) are in
+    flight, others wait for a free worker.
+    """
+
+    def __init__(
+        self,
+        host,
+        port,
+        auth_type=REQUEST.AUTH_TYPE.BASIC,
+        scheme=REQUEST.SCHEME.HTTPS,
+        auth=None,
+        max_concurrency=20,
+        **kwargs
+    ):
+        """Asyncio client to connect to server.
+
+        Args:
+            host (str): Hostname/IP address
+            port (int): Port to connect to
+            auth_type (str): auth type that needs to be used by the client
+            scheme (str): http scheme (http or https)
+            auth (tuple): authentication
+            max_concurrency (int): number of worker threads, so maximum number
+                                   of in-flight requests. Also used as the
+                                   size of the connection pool
+            kwargs (dict): extra params for `Connection` (retries_enabled etc.)
+        Returns:
+        Raises:
+        """
+
+        self.max_concurrency = int(max_concurrency)
+        kwargs.setdefault("pool_maxsize", self.max_concurrency)
+        kwargs.setdefault("pool_connections", self.max_concurrency)
+        self.connection = Connection(
+            host, port, auth_type, scheme=scheme, auth=auth, **kwargs
+        )
+        self._executor = None
+
+    @property
+    def base_url(self):
+        return self.connection.base_url
+
+    def connect(self):
+        """Connect to api server, create http session pool and worker threads.
+
+        Args:
+        Returns:
+            api server session
+        Raises:
+        """
+
+        session = self.connection.connect()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        LOG.debug("%s session created", self.__class__.__name__)
+        return session
+
+    def close(self):
+        """
+        Close the session and wait for in-flight requests.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.connection.close()
+
+    async def run(self, func, *args, **kwargs):
+        """Runs a blocking function making api calls on the worker pool
+
+        Args:
+            func (callable): function to be called
+            args (tuple): positional args for func
+            kwargs (dict): keyword args for func
+        Returns:
+            return value of func
+        """
+
+        if not self._executor:
+            raise Exception("{} is not connected".format(self.__class__.__name__))
+
+        # Calls beyond max_concurrency are queued by the worker pool
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def call(self, endpoint, **kwargs):
+        """Makes http request to calm. Accepts same args as `Connection._call`
+
+        Returns:
+            (tuple (requests.Response, dict)): Response
+        """
+
+        return await self.run(self.connection._call, endpoint, **kwargs)
@@ -0,0 +1,103 @@
+from calm.dsl.config import get_config
+
+from .async_connection import AsyncConnection
+from .connection import REQUEST
+from .handle import ClientHandle, get_connection_params
+
+
+class AsyncResourceAPI:
+    """Awaitable proxy over a (blocking) resource api object.
+
+    Every public method of the wrapped api returns a coroutine that runs the
+    original method on the connection's worker pool. Helpers that make
+    more than one call (e.g. `get_name_uuid_map`) run as a single unit.
+    """
+
+    def __init__(self, api, connection):
+        self._api = api
+        self._connection = connection
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        async def method(*args, **kwargs):
+            return await self._connection.run(attr, *args, **kwargs)
+
+        method.__name__ = name
+        method.__doc__ = attr.__doc__
+        return method
+
+
+class AsyncClientHandle:
+    """Client handle with awaitable apis. Calls are made by worker threads of
+    the `AsyncConnection`, see its limitations"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def _connect(self):
+
+        self.connection.connect()
+
+        # Reuse the api classes of blocking handle over the wrapped connection
+        sync_handle = ClientHandle(self.connection.connection)
+        sync_handle._setup_apis()
+
+        for api_name in ClientHandle.API_NAMES:
+            api = getattr(sync_handle, api_name)
+            setattr(self, api_name, AsyncResourceAPI(api, self.connection))
+
+    def close(self):
+        self.connection.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+def get_async_client_handle(
+    host,
+    port,
+    auth_type=REQUEST.AUTH_TYPE.BASIC,
+    scheme=REQUEST.SCHEME.HTTPS,
+    auth=None,
+    max_concurrency=20,
+    **kwargs
+):
+    """Returns a new connected async client handle"""
+
+    connection = AsyncConnection(
+        host,
+        port,
+        auth_type,
+        scheme=scheme,
+        auth=auth,
+        max_concurrency=max_concurrency,
+        **kwargs
+    )
+    handle = AsyncClientHandle(connection)
+    handle._connect()
+    return handle
+
+
+def get_async_api_client(max_concurrency=20):
+    """Returns a new async client handle for the server in config"""
+
+    config = get_config()
+
+    pc_ip = config["SERVER"].get("pc_ip")
+    pc_port = config["SERVER"].get("pc_port")
+    username = config["SERVER"].get("pc_username")
+    password = config["SERVER"].get("pc_password")
+
+    return get_async_client_handle(
+        pc_ip,
+        pc_port,
+        auth=(username, password),
+        max_concurrency=max_concurrency,
+        **get_connection_params(config)
+    )
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+batch: Combines many api calls into calls to the v3 batch endpoint
+
+Requests are sent in chunks of `REQUEST.BATCH.CHUNK_SIZE` (the max allowed by
+PC) to `api/nutanix/v3/batch`, and the response of every request is mapped
+back to it. If the server does not provide the batch endpoint, requests are
+made individually by a pool of workers instead.
+
+Example:
+
+batch = BatchAPI(connection)
+results = batch.execute([
+    ("delete", "api/nutanix/v3/blueprints/<uuid1>", None),
+    ("delete", "api/nutanix/v3/blueprints/<uuid2>", None),
+])
+for payload, err in results:
+    ...
+
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from calm.dsl.tools import get_logging_handle, codec
+from .connection import REQUEST
+
+LOG = get_logging_handle(__name__)
+
+# Status codes telling batch endpoint is not available
+BATCH_UNSUPPORTED_CODES = (404, 405, 501)
+
+
+def get_status_code(status):
+    """Returns int status code from batch item status (ex: '200 OK', 200)"""
+
+    return int(str(status).split()[0])
+
+
+class BatchAPI:
+
+    BATCH = "api/nutanix/v3/batch"
+
+    def __init__(
+        self,
+        connection,
+        chunk_size=REQUEST.BATCH.CHUNK_SIZE,
+        max_workers=REQUEST.BATCH.MAX_WORKERS,
+    ):
+        self.connection = connection
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+    def execute(self, requests):
+        """Makes the requests, in as few calls as possible.
+
+        Args:
+            requests (list): (method, endpoint, request_json) of requests.
+                             Endpoint may have query params
+        Returns:
+            (list): (response payload, error) of each request, in same order.
+                    error is a dict with code and error, like `_call` returns
+        """
+
+        results = []
+        for index in range(0, len(requests), self.chunk_size):
+            end = index + self.chunk_size
+            chunk = requests[index:end]
+            if len(chunk) > 1 and self.connection.batch_supported:
+                results.extend(self._execute_batch(chunk))
+            else:
+                results.extend(self._execute_each(chunk))
+        return results
+
+    def _execute_batch(self, requests):
+
+        paths = ["/" + endpoint.lstrip("/") for _, endpoint, _ in requests]
+
+        # Order of responses is guaranteed only for sequential execution. So
+        # requests run in parallel only if responses can be matched by path
+        execution_order = "NON_SEQUENTIAL"
+        if len(set(paths)) != len(paths):
+            execution_order = "SEQUENTIAL"
+
+        payload = {
+            "action_on_failure": "CONTINUE",
+            "execution_order": execution_order,
+            "api_version": "3.0",
+            "api_request_list": [
+                {
+                    "operation": method.upper(),
+                    "path_and_params": path,
+                    "body": request_json or {},
+                }
+                for (method, _, request_json), path in zip(requests, paths)
+            ],
+        }
+
+        res, err = self.connection._call(
+            self.BATCH,
+            verify=False,
+            request_json=payload,
+            method=REQUEST.METHOD.POST,
+            ignore_error=True,
+            warning_msg=None,
+        )
+        if err:
+            if err["code"] in BATCH_UNSUPPORTED_CODES:
+                LOG.debug("Batch api not supported by server")
+                self.connection.batch_supported = False
+            return self._execute_each(requests)
+
+        responses = res.json().get("api_response_list") or []
+        if len(responses) != len(requests):
+            LOG.debug(
+                "Batch response has %s items for %s requests",
+                len(responses),
+                len(requests),
+            )
+            return self._execute_each(requests)
+
+        if execution_order == "NON_SEQUENTIAL":
+            path_responses = {
+                response.get("path_and_params"): response for response in responses
+            }
+            if set(path_responses) != set(paths):
+                LOG.debug("Batch responses do not match the request paths")
+                return self._execute_each(requests)
+            responses = [path_responses[path] for path in paths]
+
+        results = []
+        for response in responses:
+            status_code = get_status_code(response.get("status", 500))
+            response_payload = response.get("api_response")
+            if isinstance(response_payload, str):
+                try:
+                    response_payload = codec.loads(response_payload)
+                except ValueError:
+                    pass
+
+            if status_code >= 400:
+                results.append((None, {"error": response_payload, "code": status_code}))
+            else:
+                results.append((response_payload or {}, None))
+
+        return results
+
+    def _execute_each(self, requests):
+        def call(request):
+            method, endpoint, request_json = request
+            res, err = self.connection._call(
+                endpoint,
+                verify=False,
+                request_json=request_json,
+                method=method,
+                ignore_error=True,
+                warning_msg=None,
+            )
+            if err:
+                # Reported to callers with the result of the request
+                LOG.debug("%s request to %s failed", method.upper(), endpoint)
+                return None, err
+            return (res.json() if res.content else {}), None
+
+        if len(requests) == 1:
+            return [call(requests[0])]
+
+        max_workers = min(self.max_workers, len(requests))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(call, requests))
@@ -5,6 +5,9 @@ from .project import ProjectAPI
 
 
 class BlueprintAPI(ResourceAPI):
+
+    GROUPS_ENTITY_TYPE = "blueprint"
+
     def __init__(self, connection):
         super().__init__(connection, resource_type="blueprints")
         self.UPLOAD = self.PREFIX + "/import_json"
@@ -333,10 +336,22 @@ class BlueprintAPI(ResourceAPI):
 
         return self.update(uuid, update_payload)
 
-    def export_json(self, uuid):
+    def export_json(self, uuid, file=None, progress=None):
+        """Exports blueprint json. If file (path or file object) is given,
+        json is streamed into it instead of being loaded in memory"""
+
         url = self.EXPORT_JSON.format(uuid)
-        return self.connection._call(url, verify=False, method=REQUEST.METHOD.GET)
+        if file is not None:
+            return self.connection.stream(url, file, verify=False, progress=progress)
 
-    def export_json_with_secrets(self, uuid):
+        return self.connection._cached_call(
+            url, get_entity_version=lambda: self.get_entity_version(uuid), verify=False
+        )
+
+    def export_json_with_secrets(self, uuid, file=None, progress=None):
         url = self.EXPORT_JSON_WITH_SECRETS.format(uuid)
+        if file is not None:
+            return self.connection.stream(url, file, verify=False, progress=progress)
+
+        # Not served from response cache, as secrets must not be stored on disk
         return self.connection._call(url, verify=False, method=REQUEST.METHOD.GET)
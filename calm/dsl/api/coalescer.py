@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+coalescer: Single-flight layer for duplicate read requests
+
+Identical read requests (GET and list/groups calls) made while a coalescing
+scope is active share one in-flight http call. The response is also reused
+by identical requests made within a short window after it completes. Any
+write request invalidates everything fetched so far.
+
+Example:
+
+with request_coalescing():
+    client.project.read(project_uuid)
+    client.project.read(project_uuid)  # served from the first call
+
+"""
+
+import copy
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+# Post endpoints that only read data
+READ_POST_SUFFIXES = ("/list", "/groups")
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.failed = False
+        self.done_at = None
+
+
+class RequestCoalescer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.hits = 0
+        self.misses = 0
+
+    def call(self, key, func, window=0):
+        """Returns result of func, shared by identical calls.
+
+        Args:
+            key (tuple): identity of the request
+            func (callable): makes the request, returns (response, error)
+            window (float): seconds for which a completed response is reused
+        Returns:
+            (tuple (requests.Response, dict)): Response
+        """
+
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight and (
+                flight.done_at is None or time.time() - flight.done_at <= window
+            ):
+                leader = False
+                self.hits += 1
+            else:
+                flight = _Flight()
+                self._flights[key] = flight
+                leader = True
+                self.misses += 1
+
+        if leader:
+            return self._lead(key, flight, func)
+
+        flight.event.wait()
+        res, err = flight.result or (None, None)
+        if flight.failed or err is not None:
+            # Errors are not shared, as callers handle them differently
+            return func()
+
+        LOG.debug("Coalesced request %s %s", key[0], key[1])
+        return copy_response(res), err
+
+    def _lead(self, key, flight, func):
+
+        try:
+            flight.result = func()
+        except BaseException:
+            flight.failed = True
+            self._discard(key, flight)
+            flight.event.set()
+            raise
+
+        with self._lock:
+            flight.done_at = time.time()
+            if flight.result[1] is not None:
+                self._discard(key, flight, locked=True)
+        flight.event.set()
+
+        return flight.result
+
+    def _discard(self, key, flight, locked=False):
+
+        if not locked:
+            with self._lock:
+                return self._discard(key, flight, locked=True)
+
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def invalidate(self):
+        """Forgets all requests, so that next reads go to the server"""
+
+        with self._lock:
+            self._flights.clear()
+
+
+def copy_response(res):
+    """Returns a copy of response, so that callers parse their own json"""
+
+    if res is None:
+        return None
+    return copy.copy(res)
+
+
+def is_read_request(method, endpoint):
+    """Returns true if request does not modify anything at server"""
+
+    method = method.lower()
+    if method == "get":
+        return True
+
+    return method == "post" and endpoint.rstrip("/").endswith(READ_POST_SUFFIXES)
+
+
+def get_request_key(method, url, request_json=None, request_params=None, headers=None):
+    """Returns key identifying a request"""
+
+    return (
+        method.lower(),
+        url,
+        json.dumps(request_json or {}, sort_keys=True, default=str),
+        json.dumps(request_params or {}, sort_keys=True, default=str),
+        json.dumps(headers or {}, sort_keys=True, default=str),
+    )
+
+
+_COALESCER = None
+
+
+def get_request_coalescer():
+    """Returns coalescer of active scope, None if there is no active scope"""
+
+    return _COALESCER
+
+
+def start_request_coalescing():
+    """Starts a coalescing scope (ex: for one cli command)"""
+
+    global _COALESCER
+    if _COALESCER is None:
+        _COALESCER = RequestCoalescer()
+    return _COALESCER
+
+
+def stop_request_coalescing():
+    """Ends the coalescing scope, dropping all shared responses"""
+
+    global _COALESCER
+    coalescer = _COALESCER
+    _COALESCER = None
+    if coalescer:
+        LOG.debug(
+            "Request coalescing: %s requests served by %s server calls",
+            coalescer.hits + coalescer.misses,
+            coalescer.misses,
+        )
+        coalescer.invalidate()
+
+
+@contextmanager
+def request_coalescing():
+    """Context manager for a coalescing scope"""
+
+    started = get_request_coalescer() is None
+    coalescer = start_request_coalescing()
+    try:
+        yield coalescer
+    finally:
+        if started:
+            stop_request_coalescing()
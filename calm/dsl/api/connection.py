@@ -11,21 +11,37 @@ client = get_connection(pc_ip, pc_port,
 
 """
 
+import base64
+import functools
 import traceback
 import json
+import random
+import threading
+import time
 import urllib3
 import sys
+import zlib
+from contextlib import contextmanager
+from urllib.parse import urlsplit
 
-from requests import Session as NonRetrySession
+from requests import Session
 from requests_toolbelt import MultipartEncoder
 from requests.adapters import HTTPAdapter
-from requests.exceptions import ConnectTimeout
+from requests.exceptions import ChunkedEncodingError, ConnectTimeout
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from urllib3.util.retry import Retry
 
-from calm.dsl.tools import get_logging_handle
+from calm.dsl.tools import get_logging_handle, codec
+from .coalescer import get_request_coalescer, get_request_key, is_read_request
+from .metrics import get_request_metrics
+from .throttle import RequestThrottle
 
 urllib3.disable_warnings()
 LOG = get_logging_handle(__name__)
 
+# Per thread flag, set within `raise_request_errors`
+_request_errors = threading.local()
+
 
 class REQUEST:
     """Request related constants"""
@@ -57,6 +73,300 @@ class REQUEST:
         POST = "post"
         PUT = "put"
 
+    class AUTH_SESSION:
+        """
+        Auth session cache defaults
+        """
+
+        TTL = 15 * 60  # seconds
+
+    class COALESCE:
+        """
+        Request coalescing defaults
+        """
+
+        # Kept short, as status of entities is polled every second or two
+        WINDOW = 0.5  # seconds
+
+    class STREAM:
+        """
+        Streaming download defaults
+        """
+
+        CHUNK_SIZE = 1024 * 1024  # bytes
+        # Number of times an interrupted download is resumed
+        RESUME_ATTEMPTS = 3
+
+    class COMPRESSION:
+        """
+        Request body compression defaults
+        """
+
+        MIN_SIZE = 64 * 1024  # bytes
+        LEVEL = 6
+        # Encoded json is handed to compressor in chunks of this size
+        CHUNK_SIZE = 64 * 1024
+
+    class BATCH:
+        """
+        Batch api defaults
+        """
+
+        # Max requests allowed in a call to batch api
+        CHUNK_SIZE = 60
+        # Workers making requests individually, if batch api is not available
+        MAX_WORKERS = 10
+
+    class RETRY:
+        """
+        Default retry policy
+        """
+
+        TOTAL = 5
+        BACKOFF_FACTOR = 0.5
+        BACKOFF_MAX = 30
+        STATUS_FORCELIST = (429, 500, 502, 503, 504)
+        # Only idempotent methods are retried by default
+        METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PUT", "TRACE")
+
+
+# urllib3 1.26 renamed `method_whitelist` to `allowed_methods` (2.x drops the
+# old name), and rejects a Retry given both
+if hasattr(Retry, "DEFAULT_ALLOWED_METHODS"):
+    RETRY_METHODS_KWARG = "allowed_methods"
+else:
+    RETRY_METHODS_KWARG = "method_whitelist"
+
+
+class RetryPolicy(Retry):
+    """urllib3 Retry with bounded exponential backoff and jitter.
+
+    Status codes in `Retry.RETRY_AFTER_STATUS_CODES` (413, 429, 503) honour
+    the `Retry-After` header sent by the server before falling back to backoff.
+    """
+
+    def __init__(
+        self,
+        total=REQUEST.RETRY.TOTAL,
+        backoff_factor=REQUEST.RETRY.BACKOFF_FACTOR,
+        backoff_max=REQUEST.RETRY.BACKOFF_MAX,
+        status_forcelist=REQUEST.RETRY.STATUS_FORCELIST,
+        allowed_methods=REQUEST.RETRY.METHODS,
+        jitter=True,
+        **kwargs
+    ):
+        # Retry.new() of older urllib3 passes the methods as method_whitelist
+        allowed_methods = kwargs.pop("method_whitelist", allowed_methods)
+        kwargs[RETRY_METHODS_KWARG] = allowed_methods
+        kwargs.setdefault("raise_on_status", False)
+        kwargs.setdefault("respect_retry_after_header", True)
+        super().__init__(
+            total=total,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            **kwargs
+        )
+        # Set after Retry.__init__, as urllib3 2.x sets its own backoff_max
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.backoff_max = self.backoff_max
+        retry.jitter = self.jitter
+        return retry
+
+    def get_backoff_time(self):
+        backoff = min(self.backoff_max, super().get_backoff_time())
+        if self.jitter and backoff:
+            # Equal jitter: keep half of the backoff, randomize the other half
+            backoff = backoff / 2 + random.uniform(0, backoff / 2)
+        return backoff
+
+    def increment(self, method=None, url=None, response=None, error=None, **kwargs):
+        reason = error or getattr(response, "status", None)
+        LOG.debug("Retrying '%s' at '%s' (reason: %s)", method, url, reason)
+        return super().increment(
+            method=method, url=url, response=response, error=error, **kwargs
+        )
+
+    @classmethod
+    def from_config(cls, conn_config):
+        """Builds the retry policy from the [CONNECTION] config section"""
+
+        status_forcelist = conn_config.get("retry_status_forcelist", None)
+        if status_forcelist is None:
+            status_forcelist = REQUEST.RETRY.STATUS_FORCELIST
+        else:
+            status_forcelist = [int(code) for code in status_forcelist.split(",")]
+
+        methods = conn_config.get("retry_methods", None)
+        if methods is None:
+            methods = REQUEST.RETRY.METHODS
+        else:
+            methods = [method.strip().upper() for method in methods.split(",")]
+
+        return cls(
+            total=conn_config.getint("retry_total", REQUEST.RETRY.TOTAL),
+            backoff_factor=conn_config.getfloat(
+                "retry_backoff_factor", REQUEST.RETRY.BACKOFF_FACTOR
+            ),
+            backoff_max=conn_config.getfloat(
+                "retry_backoff_max", REQUEST.RETRY.BACKOFF_MAX
+            ),
+            status_forcelist=status_forcelist,
+            allowed_methods=methods,
+            jitter=conn_config.getboolean("retry_jitter", True),
+        )
+
+
+class RequestError(Exception):
+    """Error of a failed request, raised within `raise_request_errors`"""
+
+    def __init__(self, err):
+        super().__init__("[{}] - {}".format(err["code"], err["error"]))
+        self.err = err
+
+
+def warn_ignored_error(endpoint, err, warning_msg=""):
+    """Logs warning for an error ignored by caller, see `Connection._call`"""
+
+    if warning_msg is None:
+        return
+
+    LOG.warning(
+        warning_msg
+        or "Request to {} failed: [{}] - {}".format(endpoint, err["code"], err["error"])
+    )
+
+
+@contextmanager
+def raise_request_errors():
+    """Requests failing within the block (made by this thread) raise
+    RequestError, instead of exiting the process. Used by callers which can
+    do without the server, ex: lookups falling back to cached data"""
+
+    raise_errors = getattr(_request_errors, "raise_errors", False)
+    _request_errors.raise_errors = True
+    try:
+        yield
+    finally:
+        _request_errors.raise_errors = raise_errors
+
+
+def get_file_positions(files):
+    """Returns current positions of file objects in multipart files (by
+    field), None if any of them can not be rewound"""
+
+    positions = {}
+    for field, value in (files or {}).items():
+        fileobj = value[1] if isinstance(value, (tuple, list)) else value
+        if not hasattr(fileobj, "read"):
+            # Content given as str/bytes
+            continue
+        try:
+            positions[field] = (fileobj, fileobj.tell())
+        except (AttributeError, OSError, ValueError):
+            return None
+    return positions
+
+
+def get_jwt_expiry(token):
+    """Returns the `exp` claim of a JWT, None if token is not a JWT"""
+
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return int(claims["exp"])
+    except Exception:
+        return None
+
+
+def iter_json(obj, depth=3):
+    """Yields compact json encoding (utf-8 bytes) of obj in chunks, same as
+    `codec.dumps_bytes(obj)`.
+
+    Containers upto `depth` levels are walked, deeper values are encoded in
+    one go by the json codec. So memory is bounded by the largest of those
+    values rather than the whole document.
+    """
+
+    if depth and isinstance(obj, dict):
+        yield b"{"
+        for index, (key, value) in enumerate(obj.items()):
+            if not isinstance(key, str):
+                key = json.dumps(key)
+            if index:
+                yield b","
+            yield codec.dumps_bytes(key) + b":"
+            yield from iter_json(value, depth - 1)
+        yield b"}"
+
+    elif depth and isinstance(obj, (list, tuple)):
+        yield b"["
+        for index, value in enumerate(obj):
+            if index:
+                yield b","
+            yield from iter_json(value, depth - 1)
+        yield b"]"
+
+    else:
+        yield codec.dumps_bytes(obj)
+
+
+def encode_json_body(request_json, compress_min_size=None):
+    """Encodes request json, gzip compressed if it is atleast compress_min_size
+    bytes long (no compression if compress_min_size is None).
+
+    Body is compressed while it is being encoded, so a large payload is never
+    held as a single string.
+
+    Returns:
+        (tuple (bytes, str)): body and its content encoding (or None)
+    """
+
+    if compress_min_size is None:
+        return codec.dumps_bytes(request_json), None
+
+    chunks = iter_json(request_json)
+    head = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= compress_min_size:
+            break
+    else:
+        return b"".join(head), None
+
+    # wbits=31 produces gzip container
+    compressor = zlib.compressobj(REQUEST.COMPRESSION.LEVEL, zlib.DEFLATED, 31)
+    body = [compressor.compress(b"".join(head))]
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= REQUEST.COMPRESSION.CHUNK_SIZE:
+            body.append(compressor.compress(b"".join(buffer)))
+            buffer = []
+            size = 0
+    body.append(compressor.compress(b"".join(buffer)))
+    body.append(compressor.flush())
+
+    return b"".join(body), "gzip"
+
+
+def use_json_codec(res, *args, **kwargs):
+    """Response hook, parses json body of response with the json codec"""
+
+    res.json = functools.partial(codec.response_json, res)
+    return res
+
 
 def build_url(host, port, endpoint="", scheme=REQUEST.SCHEME.HTTPS):
     """Build url.
@@ -91,6 +401,16 @@ class Connection:
         response_processor=None,
         session_headers=None,
         retries_enabled=False,
+        retry_policy=None,
+        session_store=None,
+        session_ttl=REQUEST.AUTH_SESSION.TTL,
+        response_cache=None,
+        coalesce_window=REQUEST.COALESCE.WINDOW,
+        compress_requests=False,
+        compress_min_size=REQUEST.COMPRESSION.MIN_SIZE,
+        metrics=None,
+        slow_request_threshold=None,
+        throttle=None,
         **kwargs
     ):
         """Generic client to connect to server.
@@ -110,6 +430,26 @@ class Connection:
             auth_type (str): auth type that needs to be used by the client
             auth (tuple): authentication
             retries_enabled (bool): Flag to perform retries (default: false)
+            retry_policy (RetryPolicy): retry policy used if retries are enabled
+            session_store (object): store used to reuse server issued auth
+                                    session cookies across processes. It
+                                    provides load(), save(cookies, expiry)
+                                    and clear() (ex: calm.dsl.store.AuthSession)
+            session_ttl (int): lifetime (seconds) of a stored auth session,
+                               used if server does not send an expiry
+            response_cache (ResponseCache): cache used by conditional GETs
+            coalesce_window (float): seconds for which a completed read is
+                                     shared by identical reads, when request
+                                     coalescing is active
+            compress_requests (bool): Flag to gzip json request bodies
+            compress_min_size (int): bodies smaller than this (bytes) are
+                                     sent uncompressed
+            metrics (RequestMetrics): records every request made, defaults
+                                      to the process wide metrics
+            slow_request_threshold (float): requests taking longer than this
+                                            (seconds) are logged as warning
+            throttle (RequestThrottle): rate and in-flight limits applied to
+                                        every request, none by default
         Returns:
         Raises:
         """
@@ -126,6 +466,20 @@ class Connection:
         self.auth_type = auth_type
         self.response_processor = response_processor
         self.retries_enabled = retries_enabled
+        self.retry_policy = retry_policy
+        self.session_store = session_store
+        self.session_ttl = session_ttl
+        self._auth_session_active = False
+        self._saved_session_cookies = {}
+        self.response_cache = response_cache
+        self.coalesce_window = coalesce_window
+        self.compress_requests = compress_requests
+        self.compress_min_size = compress_min_size
+        self.metrics = metrics or get_request_metrics()
+        self.slow_request_threshold = slow_request_threshold
+        self.throttle = throttle or RequestThrottle(adaptive=False)
+        # Set to False once server answers that it has no batch api
+        self.batch_supported = True
 
     def connect(self):
         """Connect to api server, create http session pool.
@@ -136,26 +490,85 @@ class Connection:
         Raises:
         """
 
-        # TODO: Add retries
-        # if self.retries_enabled:
-        #     self.session = RetrySession()
-        # else:
-        self.session = NonRetrySession()
+        self.session = Session()
         if self.auth and self.auth_type == REQUEST.AUTH_TYPE.BASIC:
             self.session.auth = self.auth
         self.session.headers.update({"Content-Type": "application/json"})
+        self.session.hooks["response"].append(use_json_codec)
+
+        max_retries = 0
+        if self.retries_enabled:
+            max_retries = self.retry_policy or RetryPolicy()
 
         http_adapter = HTTPAdapter(
             pool_block=bool(self._pool_block),
             pool_connections=int(self._pool_connections),
             pool_maxsize=int(self._pool_maxsize),
+            max_retries=max_retries,
         )
         self.session.mount("http://", http_adapter)
         self.session.mount("https://", http_adapter)
         self.base_url = build_url(self.host, self.port, scheme=self.scheme)
-        LOG.debug("{} session created".format(self.__class__.__name__))
+
+        if self.session_store:
+            self._load_auth_session()
+
+        LOG.debug("%s session created", self.__class__.__name__)
         return self.session
 
+    def _load_auth_session(self):
+        """Reuses the auth session cookies stored by an earlier process"""
+
+        cookies = self.session_store.load()
+        if not cookies:
+            return
+
+        LOG.debug("Reusing cached auth session")
+        self.session.cookies.update(cookies)
+        self._saved_session_cookies = dict(cookies)
+        # Session cookies are used instead of authenticating every call
+        self.session.auth = None
+        self._auth_session_active = True
+
+    def _reset_auth_session(self):
+        """Drops the cached auth session and goes back to basic auth"""
+
+        self.session.cookies.clear()
+        self.session_store.clear()
+        self._saved_session_cookies = {}
+        self._auth_session_active = False
+        if self.auth and self.auth_type in [
+            REQUEST.AUTH_TYPE.BASIC,
+            REQUEST.AUTH_TYPE.JWT,
+        ]:
+            self.session.auth = self.auth
+
+    def _update_auth_session(self):
+        """Stores the auth session cookies issued by server, if changed"""
+
+        if not self.session_store:
+            return
+
+        cookies = self.session.cookies.get_dict()
+        if not cookies or cookies == self._saved_session_cookies:
+            return
+
+        expiry = self._get_auth_session_expiry()
+        LOG.debug("Storing auth session (expires at %s)", expiry)
+        self.session_store.save(cookies, expiry)
+        self._saved_session_cookies = cookies
+
+    def _get_auth_session_expiry(self):
+        """Returns the expiry timestamp of the auth session cookies"""
+
+        expiry = time.time() + self.session_ttl
+        for cookie in self.session.cookies:
+            cookie_expiry = cookie.expires or get_jwt_expiry(cookie.value)
+            if cookie_expiry:
+                expiry = min(expiry, cookie_expiry)
+
+        return expiry
+
     def close(self):
         """
         Close the session.
@@ -167,6 +580,148 @@ class Connection:
         """
         self.session.close()
 
+    def _encode_body(self, request_json, headers):
+        """Returns json body and headers for it, compressing large bodies
+        if request compression is enabled"""
+
+        min_size = self.compress_min_size if self.compress_requests else None
+        data, encoding = encode_json_body(request_json, compress_min_size=min_size)
+        if encoding:
+            LOG.debug("Request body compressed to %s bytes", len(data))
+            headers = dict(headers or {})
+            headers["Content-Encoding"] = encoding
+        return data, headers
+
+    def _send(self, method, url, **kwargs):
+        """Sends the http request over the session, within limits of the
+        throttle, recording its metrics. Accepts same args as `_dispatch`
+
+        Returns:
+            (requests.Response): Response
+        """
+
+        start = time.time()
+        res = None
+        try:
+            with self.throttle.slot() as slot:
+                res = self._dispatch(method, url, **kwargs)
+                slot.done(res.status_code)
+            return res
+        finally:
+            self._record_request(method, url, res, time.time() - start)
+
+    def _record_request(self, method, url, res, elapsed, bytes_in=None):
+        """Records metrics of a request and logs it if it was slow"""
+
+        endpoint = urlsplit(url).path
+        status_code = None
+        server_time = 0.0
+        bytes_out = 0
+        retries = 0
+        if res is not None:
+            status_code = res.status_code
+            server_time = res.elapsed.total_seconds()
+            body = getattr(res.request, "body", None)
+            if body is not None:
+                bytes_out = getattr(body, "len", None) or len(body)
+            if bytes_in is None:
+                bytes_in = len(res.content or b"")
+            history = getattr(getattr(res.raw, "retries", None), "history", None)
+            retries = len(history or [])
+
+        self.metrics.record(
+            method,
+            endpoint,
+            status_code,
+            elapsed,
+            server_time=server_time,
+            bytes_out=bytes_out,
+            bytes_in=bytes_in or 0,
+            retries=retries,
+        )
+
+        threshold = self.slow_request_threshold
+        if threshold is not None and elapsed >= threshold:
+            LOG.warning(
+                "Slow request: {} {} took {:.2f}s (server {:.2f}s, status {})".format(
+                    method.upper(), endpoint, elapsed, server_time, status_code
+                )
+            )
+
+    def _dispatch(
+        self,
+        method,
+        url,
+        request_json=None,
+        request_params=None,
+        verify=True,
+        headers=None,
+        cookies=None,
+        files=None,
+        timeout=None,
+    ):
+        """Sends the http request over the session
+
+        Returns:
+            (requests.Response): Response
+        """
+
+        res = None
+        if method == REQUEST.METHOD.POST:
+            if files:
+                request_json.update(files)
+                m = MultipartEncoder(fields=request_json)
+                res = self.session.post(
+                    url,
+                    data=m,
+                    verify=verify,
+                    headers={"Content-Type": m.content_type},
+                    timeout=timeout,
+                )
+            else:
+                data, headers = self._encode_body(request_json, headers)
+                res = self.session.post(
+                    url,
+                    params=request_params,
+                    data=data,
+                    verify=verify,
+                    headers=headers,
+                    cookies=cookies,
+                    timeout=timeout,
+                )
+        elif method == REQUEST.METHOD.PUT:
+            data, headers = self._encode_body(request_json, headers)
+            res = self.session.put(
+                url,
+                params=request_params,
+                data=data,
+                verify=verify,
+                headers=headers,
+                cookies=cookies,
+                timeout=timeout,
+            )
+        elif method == REQUEST.METHOD.GET:
+            res = self.session.get(
+                url,
+                params=request_params or request_json,
+                verify=verify,
+                headers=headers,
+                cookies=cookies,
+                timeout=timeout,
+            )
+        elif method == REQUEST.METHOD.DELETE:
+            res = self.session.delete(
+                url,
+                params=request_params,
+                data=codec.dumps_bytes(request_json),
+                verify=verify,
+                headers=headers,
+                cookies=cookies,
+                timeout=timeout,
+            )
+
+        return res
+
     def _call(
         self,
         endpoint,
@@ -183,99 +738,147 @@ class Connection:
     ):
         """Private method for making http request to calm
 
+        Identical read requests share one server call while request
+        coalescing is active (see `calm.dsl.api.coalescer`), and write
+        requests invalidate the reads shared so far.
+
         Args:
             endpoint (str): calm server endpoint
             method (str): calm server http method
             cookies (dict): cookies that need to be forwarded.
             request_json (dict): request data
             request_params (dict): request params
+            ignore_error (bool): errors are returned instead of exiting
+            warning_msg (str): warning logged for ignored errors, the error if
+                               empty. None if caller reports errors itself
         Returns:
             (tuple (requests.Response, dict)): Response
         """
+
+        kwargs = dict(
+            method=method,
+            cookies=cookies,
+            request_json=request_json,
+            request_params=request_params,
+            verify=verify,
+            headers=headers,
+            files=files,
+            timeout=timeout,
+            ignore_error=ignore_error,
+            warning_msg=warning_msg,
+        )
+
+        coalescer = get_request_coalescer()
+        if coalescer is None or files or cookies:
+            return self._request(endpoint, **kwargs)
+
+        if not is_read_request(method, endpoint):
+            try:
+                return self._request(endpoint, **kwargs)
+            finally:
+                coalescer.invalidate()
+
+        key = get_request_key(
+            method,
+            "{}/{}".format(id(self), endpoint),
+            request_json=request_json,
+            request_params=request_params,
+            headers=headers,
+        )
+        return coalescer.call(
+            key, lambda: self._request(endpoint, **kwargs), window=self.coalesce_window
+        )
+
+    def _request(
+        self,
+        endpoint,
+        method=REQUEST.METHOD.POST,
+        cookies=None,
+        request_json=None,
+        request_params=None,
+        verify=True,
+        headers=None,
+        files=None,
+        timeout=(5, 30),
+        ignore_error=False,
+        warning_msg="",
+    ):
+        """Makes http request to calm. Accepts same args as `_call`"""
+
         if request_params is None:
             request_params = {}
 
         request_json = request_json or {}
         LOG.debug(
-            """Server Request- '{method}' at '{endpoint}' with body:
-            '{body}'""".format(
-                method=method, endpoint=endpoint, body=request_json
-            )
+            """Server Request- '%s' at '%s' with body:
+            '%s'""",
+            method,
+            endpoint,
+            request_json,
         )
         res = None
         err = None
         try:
             res = None
             url = build_url(self.host, self.port, endpoint=endpoint, scheme=self.scheme)
-            LOG.debug("URL is: {}".format(url))
-            base_headers = self.session.headers
+            LOG.debug("URL is: %s", url)
+            base_headers = self.session.headers.copy()
             if headers:
                 base_headers.update(headers)
 
-            if method == REQUEST.METHOD.POST:
-                if files:
-                    request_json.update(files)
-                    m = MultipartEncoder(fields=request_json)
-                    res = self.session.post(
-                        url,
-                        data=m,
-                        verify=verify,
-                        headers={"Content-Type": m.content_type},
-                        timeout=timeout,
-                    )
+            # Files are read while sending, they are rewound for a replay
+            file_positions = get_file_positions(files)
+            res = self._send(
+                method,
+                url,
+                request_json=request_json,
+                request_params=request_params,
+                verify=verify,
+                headers=base_headers,
+                cookies=cookies,
+                files=files,
+                timeout=timeout,
+            )
+            if res.status_code == 401 and self._auth_session_active:
+                LOG.debug("Cached auth session rejected, falling back to basic auth")
+                self._reset_auth_session()
+                if file_positions is None:
+                    LOG.debug("Request files can not be rewound, not replaying")
                 else:
-                    res = self.session.post(
+                    for fileobj, position in file_positions.values():
+                        fileobj.seek(position)
+                    res = self._send(
+                        method,
                         url,
-                        params=request_params,
-                        data=json.dumps(request_json),
+                        request_json=request_json,
+                        request_params=request_params,
                         verify=verify,
                         headers=base_headers,
                         cookies=cookies,
+                        files=files,
                         timeout=timeout,
                     )
-            elif method == REQUEST.METHOD.PUT:
-                res = self.session.put(
-                    url,
-                    params=request_params,
-                    data=json.dumps(request_json),
-                    verify=verify,
-                    headers=base_headers,
-                    cookies=cookies,
-                    timeout=timeout,
-                )
-            elif method == REQUEST.METHOD.GET:
-                res = self.session.get(
-                    url,
-                    params=request_params or request_json,
-                    verify=verify,
-                    headers=base_headers,
-                    cookies=cookies,
-                    timeout=timeout,
-                )
-            elif method == REQUEST.METHOD.DELETE:
-                res = self.session.delete(
-                    url,
-                    params=request_params,
-                    data=json.dumps(request_json),
-                    verify=verify,
-                    headers=base_headers,
-                    cookies=cookies,
-                    timeout=timeout,
-                )
+            self._update_auth_session()
+            if self.response_cache and method in [
+                REQUEST.METHOD.PUT,
+                REQUEST.METHOD.DELETE,
+            ]:
+                self.response_cache.delete(url)
             res.raise_for_status()
             if not url.endswith("/download"):
                 if not res.ok:
-                    LOG.debug("Server Response: {}".format(res.json()))
+                    LOG.debug(lambda: "Server Response: {}".format(res.json()))
         except ConnectTimeout as cte:
-            LOG.error(
-                "Could not establish connection to server at https://{}:{}.".format(
-                    self.host, self.port
-                )
-            )
-            LOG.debug("Error Response: {}".format(cte))
+            err_msg = "Could not establish connection to server at https://{}:{}."
+            err_msg = err_msg.format(self.host, self.port)
+            if getattr(_request_errors, "raise_errors", False):
+                raise RequestError({"error": err_msg, "code": -1})
+
+            LOG.error(err_msg)
+            LOG.debug("Error Response: %s", cte)
             sys.exit(-1)
         except Exception as ex:
-            LOG.debug("Got traceback\n{}".format(traceback.format_exc()))
+            LOG.debug(lambda: "Got traceback\n{}".format(traceback.format_exc()))
             if hasattr(res, "json") and callable(getattr(res, "json")):
                 try:
                     err_msg = res.json()
@@ -290,9 +893,12 @@ class Connection:
             err = {"error": err_msg, "code": status_code}
 
             if ignore_error:
-                LOG.warning(warning_msg)
+                warn_ignored_error(endpoint, err, warning_msg)
                 return None, err
 
+            if getattr(_request_errors, "raise_errors", False):
+                raise RequestError(err)
+
             LOG.error(
                 "Oops! Something went wrong.\n{}".format(
                     json.dumps(err, indent=4, separators=(",", ": "))
@@ -301,6 +907,252 @@ class Connection:
             sys.exit(-1)
         return res, err
 
+    def _cached_call(self, endpoint, get_entity_version=None, **kwargs):
+        """GET request served from response cache, if still valid.
+
+        A cached response is revalidated with its ETag (If-None-Match).
+        If server did not send an ETag, `get_entity_version` (a cheap call
+        returning current spec_version and last_update_time of entity) is
+        compared with the version noted when the response was cached. The
+        version is probed only if a response is cached, and before the
+        response is read again, so an update made in between only causes an
+        extra read later. So the first reads of an entity make no extra call.
+
+        Args:
+            endpoint (str): calm server endpoint
+            get_entity_version (callable): returns current entity version
+            kwargs (dict): other args for `_call`
+        Returns:
+            (tuple (requests.Response, dict)): Response
+        """
+
+        kwargs["method"] = REQUEST.METHOD.GET
+        if not self.response_cache:
+            return self._call(endpoint, **kwargs)
+
+        url = build_url(self.host, self.port, endpoint=endpoint, scheme=self.scheme)
+        versioned = get_entity_version is not None
+        cached = self.response_cache.get(url)
+        if cached and cached[1].get("etag"):
+            content, meta = cached
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers["If-None-Match"] = meta["etag"]
+            res, err = self._call(endpoint, headers=headers, **kwargs)
+            if err or res.status_code != 304:
+                self._cache_response(url, res, err, versioned=versioned)
+                return res, err
+
+            LOG.debug("Response cache revalidated (ETag) for %s", url)
+            return self.response_cache.build_response(url, content, meta), None
+
+        # Version is probed only to revalidate a cached response. Responses
+        # read without one are cached unversioned, and read again next time
+        version = None
+        if cached and versioned:
+            version = get_entity_version()
+            if version is not None and version == cached[1].get("version"):
+                LOG.debug("Response cache revalidated (version) for %s", url)
+                return self.response_cache.build_response(url, *cached), None
+
+        res, err = self._call(endpoint, **kwargs)
+        self._cache_response(url, res, err, version=version, versioned=versioned)
+        return res, err
+
+    def _cache_response(self, url, res, err, version=None, versioned=False):
+        """Stores successful GET response in response cache, if it can be
+        revalidated later by its ETag or entity version (if versioned)"""
+
+        if err or res is None or res.status_code != 200:
+            return
+
+        etag = res.headers.get("ETag")
+        if not etag and not versioned:
+            return
+
+        headers = {"Content-Type": res.headers.get("Content-Type", "")}
+        self.response_cache.put(
+            url,
+            res.content,
+            etag=etag,
+            version=None if etag else version,
+            headers=headers,
+        )
+
+    def stream(
+        self,
+        endpoint,
+        file,
+        request_params=None,
+        verify=True,
+        headers=None,
+        timeout=(5, 300),  # (connection timeout, read timeout of a chunk)
+        chunk_size=REQUEST.STREAM.CHUNK_SIZE,
+        progress=None,
+        resume=False,
+        ignore_error=False,
+        warning_msg="",
+    ):
+        """Downloads response of a GET request into a file, chunk by chunk.
+
+        Body is never held in memory as a whole. If the transfer breaks and
+        server supports byte ranges, it is resumed from the last written
+        byte (atmost `REQUEST.STREAM.RESUME_ATTEMPTS` times).
+
+        Args:
+            endpoint (str): calm server endpoint
+            file (str/file object): path of the file, or a writable binary
+                                    file object, to write the body to
+            request_params (dict): request params
+            chunk_size (int): bytes read from the socket at a time
+            progress (callable): called as progress(bytes_done, total_bytes)
+                                 after every chunk. total_bytes is None if
+                                 server did not send Content-Length
+            resume (bool): if file (path) already has data from a previous
+                           download, fetch only the remaining bytes
+        Returns:
+            (tuple (requests.Response, dict)): Response, whose content is
+                already consumed
+        """
+
+        url = build_url(self.host, self.port, endpoint=endpoint, scheme=self.scheme)
+        LOG.debug("Streaming download from: %s", url)
+        base_headers = self.session.headers.copy()
+        if headers:
+            base_headers.update(headers)
+
+        fd = file
+        if isinstance(file, str):
+            fd = open(file, "ab" if resume else "wb")
+
+        res = None
+        try:
+            done = fd.tell() if resume else 0
+            attempts = 0
+            while True:
+                req_headers = base_headers.copy()
+                if done:
+                    req_headers["Range"] = "bytes={}-".format(done)
+
+                start = time.time()
+                received = 0
+                res = None
+                try:
+                    res = self._send_stream(
+                        url, request_params, verify, req_headers, timeout
+                    )
+                    if done and res.status_code == 416:
+                        # File already holds the complete body
+                        break
+
+                    res.raise_for_status()
+                    if res.status_code != 206 and done:
+                        # Range not honoured by server, start over
+                        fd.seek(0)
+                        fd.truncate()
+                        done = 0
+
+                    total = res.headers.get("Content-Length")
+                    total = int(total) + done if total else None
+                    try:
+                        for chunk in res.iter_content(chunk_size=chunk_size):
+                            fd.write(chunk)
+                            done += len(chunk)
+                            received += len(chunk)
+                            if progress:
+                                progress(done, total)
+                        break
+
+                    except (ChunkedEncodingError, RequestsConnectionError) as ex:
+                        attempts += 1
+                        accepts_ranges = res.status_code == 206 or (
+                            res.headers.get("Accept-Ranges") == "bytes"
+                        )
+                        if (
+                            not accepts_ranges
+                            or attempts > REQUEST.STREAM.RESUME_ATTEMPTS
+                        ):
+                            raise
+
+                        LOG.debug(
+                            "Download interrupted at %s bytes (%s), resuming", done, ex
+                        )
+
+                finally:
+                    # Error responses are read later for the error message
+                    if res is not None and res.ok:
+                        res.close()
+                    self._record_request(
+                        REQUEST.METHOD.GET,
+                        url,
+                        res,
+                        time.time() - start,
+                        bytes_in=received,
+                    )
+
+        except ConnectTimeout as cte:
+            LOG.error(
+                "Could not establish connection to server at https://{}:{}.".format(
+                    self.host, self.port
+                )
+            )
+            LOG.debug("Error Response: %s", cte)
+            sys.exit(-1)
+
+        except Exception as ex:
+            LOG.debug(lambda: "Got traceback\n{}".format(traceback.format_exc()))
+            err_msg = "{}".format(ex)
+            if res is not None and not res.ok:
+                try:
+                    err_msg = res.json()
+                except Exception:
+                    err_msg = res.text or err_msg
+            status_code = res.status_code if hasattr(res, "status_code") else 500
+            err = {"error": err_msg, "code": status_code}
+
+            if ignore_error:
+                warn_ignored_error(endpoint, err, warning_msg)
+                return None, err
+
+            LOG.error(
+                "Oops! Something went wrong.\n{}".format(
+                    json.dumps(err, indent=4, separators=(",", ": "))
+                )
+            )
+            sys.exit(-1)
+
+        finally:
+            if fd is not file:
+                fd.close()
+
+        return res, None
+
+    def _send_stream(self, url, request_params, verify, headers, timeout):
+        """Sends a streaming GET request, falling back to basic auth if the
+        cached auth session is rejected"""
+
+        def send():
+            # Slot is held till response headers arrive, not for the download
+            with self.throttle.slot() as slot:
+                res = self.session.get(
+                    url,
+                    params=request_params,
+                    verify=verify,
+                    headers=headers,
+                    timeout=timeout,
+                    stream=True,
+                )
+                slot.done(res.status_code)
+            return res
+
+        res = send()
+        if res.status_code == 401 and self._auth_session_active:
+            LOG.debug("Cached auth session rejected, falling back to basic auth")
+            res.close()
+            self._reset_auth_session()
+            res = send()
+        self._update_auth_session()
+        return res
+
 
 _CONNECTION = None
 
@@ -311,6 +1163,7 @@ def get_connection(
     auth_type=REQUEST.AUTH_TYPE.BASIC,
     scheme=REQUEST.SCHEME.HTTPS,
     auth=None,
+    **kwargs
 ):
     """Get api server (aplos/styx) handle.
 
@@ -321,6 +1174,7 @@ def get_connection(
         scheme (str): http scheme (http or https)
         session_headers (dict): session headers dict
         auth (tuple): authentication
+        kwargs (dict): extra connection params (retries_enabled, retry_policy etc.)
     Returns:
         Client handle
     Raises:
@@ -328,7 +1182,7 @@ def get_connection(
     """
     global _CONNECTION
     if not _CONNECTION:
-        update_connection(host, port, auth_type, scheme, auth)
+        update_connection(host, port, auth_type, scheme, auth, **kwargs)
     return _CONNECTION
 
 
@@ -338,6 +1192,7 @@ def update_connection(
     auth_type=REQUEST.AUTH_TYPE.BASIC,
     scheme=REQUEST.SCHEME.HTTPS,
     auth=None,
+    **kwargs
 ):
     global _CONNECTION
-    _CONNECTION = Connection(host, port, auth_type, scheme=scheme, auth=auth)
+    _CONNECTION = Connection(host, port, auth_type, scheme=scheme, auth=auth, **kwargs)
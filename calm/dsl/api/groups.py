@@ -0,0 +1,110 @@
+from .resource import ResourceAPI
+from .connection import REQUEST
+
+
+def list_group_uuids(call, entity_type, filter_query="", page_size=500):
+    """Lists uuids of all entities of the type, using groups api without any
+    attributes. Pages are requested till `filtered_entity_count` uuids are seen.
+
+    Args:
+        call (callable): makes groups api call for a payload, returning
+                         (response, error)
+        entity_type (str): groups api entity type
+        filter_query (str): filter_criteria of groups api
+        page_size (int): number of uuids requested per call
+    Returns:
+        (set, dict): uuids and error of the failed call, if any
+    """
+
+    payload = {
+        "entity_type": entity_type,
+        "group_member_count": page_size,
+        "group_member_offset": 0,
+        "group_member_attributes": [],
+    }
+    if filter_query:
+        payload["filter_criteria"] = filter_query
+
+    uuids = set()
+    while True:
+        res, err = call(dict(payload))
+        if err:
+            return None, err
+
+        res = res.json()
+        count = 0
+        for group in res.get("group_results", []):
+            for entity in group.get("entity_results", []):
+                uuids.add(entity["entity_id"])
+                count += 1
+
+        payload["group_member_offset"] += count
+        if not count or payload["group_member_offset"] >= res.get(
+            "filtered_entity_count", 0
+        ):
+            return uuids, None
+
+
+class GroupsAPI(ResourceAPI):
+    def __init__(self, connection):
+        super().__init__(connection, resource_type="groups")
+
+    def list_members(self, entity_type, attributes, params=None):
+        """Lists only the given attributes of entities of the type.
+
+        Args:
+            entity_type (str): groups api entity type, ex: "blueprint", "app"
+            attributes (list): attribute names to fetch
+            params (dict): other groups api options, ex: filter_criteria,
+                           group_member_count, group_member_sort_attribute
+
+        Errors are returned to caller, which can fall back to list api
+        """
+
+        payload = {
+            "entity_type": entity_type,
+            "group_member_attributes": [
+                {"attribute": attribute} for attribute in attributes
+            ],
+        }
+        payload.update(params or {})
+        return self.query(payload)
+
+    def query(self, payload):
+        """Makes groups api call for the payload. Errors are returned to caller"""
+
+        return self.connection._call(
+            self.PREFIX,
+            verify=False,
+            request_json=payload,
+            method=REQUEST.METHOD.POST,
+            ignore_error=True,
+            warning_msg=None,
+        )
+
+    def get_member(self, entity_type, uuid, attributes):
+        """Returns first value of each of the attributes of an entity, None if
+        entity is not found or groups api call fails"""
+
+        params = {
+            "filter_criteria": "_entity_id_=={}".format(uuid),
+            "group_member_count": 1,
+        }
+        res, err = self.list_members(entity_type, attributes, params=params)
+        if err:
+            return None
+
+        for group in res.json().get("group_results", []):
+            for entity in group.get("entity_results", []):
+                member = {}
+                for item in entity.get("data", []):
+                    values = item.get("values") or [{}]
+                    member[item["name"]] = (values[0].get("values") or [None])[0]
+                return member
+
+        return None
+
+    def list_uuids(self, entity_type, filter_query="", page_size=500):
+        """Lists uuids of all entities of the type, see `list_group_uuids`"""
+
+        return list_group_uuids(self.query, entity_type, filter_query, page_size)
@@ -1,6 +1,19 @@
-from calm.dsl.config import get_config
+import configparser
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from .connection import get_connection, update_connection, REQUEST, Connection
+from calm.dsl.config import get_config, get_init_data
+
+from .connection import (
+    get_connection,
+    update_connection,
+    REQUEST,
+    Connection,
+    RetryPolicy,
+)
+from .throttle import RequestThrottle
+from .response_cache import ResponseCache
 from .blueprint import BlueprintAPI
 from .application import ApplicationAPI
 from .project import ProjectAPI
@@ -9,15 +22,33 @@ from .marketplace import MarketPlaceAPI
 from .app_icons import AppIconAPI
 from .version import VersionAPI
 from .showback import ShowbackAPI
+from .groups import GroupsAPI
 
 
 class ClientHandle:
+
+    # Note - add entity api attributes here and in `_setup_apis`
+    API_NAMES = [
+        "project",
+        "blueprint",
+        "application",
+        "account",
+        "market_place",
+        "app_icon",
+        "version",
+        "showback",
+        "groups",
+    ]
+
     def __init__(self, connection):
         self.connection = connection
 
     def _connect(self):
 
         self.connection.connect()
+        self._setup_apis()
+
+    def _setup_apis(self):
 
         # Note - add entity api classes here
         self.project = ProjectAPI(self.connection)
@@ -28,10 +59,20 @@ class ClientHandle:
         self.app_icon = AppIconAPI(self.connection)
         self.version = VersionAPI(self.connection)
         self.showback = ShowbackAPI(self.connection)
+        self.groups = GroupsAPI(self.connection)
 
 
 _CLIENT_HANDLE = None
 
+# Handles of named servers ([SERVER:<name>] config sections)
+_SERVER_HANDLES = {}
+_SERVER_HANDLES_LOCK = threading.Lock()
+
+# Name of server in [SERVER] config section
+DEFAULT_SERVER = "default"
+SERVER_SECTION_PREFIX = "SERVER:"
+SERVER_CREDENTIALS = ["pc_ip", "pc_port", "pc_username", "pc_password"]
+
 
 def get_client_handle(
     host,
@@ -40,17 +81,18 @@ def get_client_handle(
     scheme=REQUEST.SCHEME.HTTPS,
     auth=None,
     temp=False,  # This flag is used to generate temp handle
+    **kwargs
 ):
     global _CLIENT_HANDLE
     if temp:
-        connection = Connection(host, port, auth_type, scheme, auth)
+        connection = Connection(host, port, auth_type, scheme, auth, **kwargs)
         handle = ClientHandle(connection)
         handle._connect()
         return handle
 
     else:
         if not _CLIENT_HANDLE:
-            update_client_handle(host, port, auth_type, scheme, auth)
+            update_client_handle(host, port, auth_type, scheme, auth, **kwargs)
         return _CLIENT_HANDLE
 
 
@@ -60,9 +102,10 @@ def update_client_handle(
     auth_type=REQUEST.AUTH_TYPE.BASIC,
     scheme=REQUEST.SCHEME.HTTPS,
     auth=None,
+    **kwargs
 ):
     global _CLIENT_HANDLE
-    update_connection(host, port, auth_type, scheme=scheme, auth=auth)
+    update_connection(host, port, auth_type, scheme=scheme, auth=auth, **kwargs)
     connection = get_connection(host, port, auth_type, scheme, auth)
     _CLIENT_HANDLE = ClientHandle(connection)
     _CLIENT_HANDLE._connect()
@@ -71,6 +114,11 @@ def update_client_handle(
 
 def get_api_client():
 
+    # Connection params build sessions, caches and throttles, so they are
+    # read only when the handle is created
+    if _CLIENT_HANDLE:
+        return _CLIENT_HANDLE
+
     config = get_config()
 
     pc_ip = config["SERVER"].get("pc_ip")
@@ -78,4 +126,169 @@ def get_api_client():
     username = config["SERVER"].get("pc_username")
     password = config["SERVER"].get("pc_password")
 
-    return get_client_handle(pc_ip, pc_port, auth=(username, password))
+    return get_client_handle(
+        pc_ip, pc_port, auth=(username, password), **get_connection_params(config)
+    )
+
+
+def get_server_names(config=None):
+    """Returns names of servers in config. Server in [SERVER] section is
+    named 'default', others are named by their [SERVER:<name>] section"""
+
+    config = config or get_config()
+    names = [DEFAULT_SERVER]
+    for section in config.sections():
+        if section.startswith(SERVER_SECTION_PREFIX):
+            names.append(section.split(":", 1)[1])
+    return names
+
+
+def get_server_config(config, server=DEFAULT_SERVER):
+    """Returns config section of the named server"""
+
+    section = "SERVER"
+    if server != DEFAULT_SERVER:
+        section = SERVER_SECTION_PREFIX + server
+
+    if section not in config:
+        raise ValueError(
+            "Server '{}' not found in config. Known servers: {}".format(
+                server, ", ".join(get_server_names(config))
+            )
+        )
+    return config[section]
+
+
+def get_server_client(server=DEFAULT_SERVER):
+    """Returns client handle of the named server.
+
+    Every server has its own connection (and so connection pool), credentials,
+    auth session and response cache. Settings in [CONNECTION] section can be
+    overridden for a server in its own section.
+    """
+
+    if server == DEFAULT_SERVER:
+        return get_api_client()
+
+    with _SERVER_HANDLES_LOCK:
+        handle = _SERVER_HANDLES.get(server)
+        if not handle:
+            config = get_config()
+            server_config = get_server_config(config, server)
+            handle = get_client_handle(
+                server_config.get("pc_ip"),
+                server_config.get("pc_port"),
+                auth=(
+                    server_config.get("pc_username"),
+                    server_config.get("pc_password"),
+                ),
+                temp=True,
+                **get_connection_params(config, server=server)
+            )
+            _SERVER_HANDLES[server] = handle
+
+    return handle
+
+
+def map_servers(func, servers, max_workers=None):
+    """Calls func(client) for each named server concurrently.
+
+    Args:
+        func (callable): called with client handle of a server
+        servers (list): names of servers
+        max_workers (int): max servers called at once, defaults to all
+    Returns:
+        (list): (server, result, error) for each server, in given order.
+                error is the exception (or exit) raised by func, if any
+    """
+
+    def call(server):
+        try:
+            return server, func(get_server_client(server)), None
+        except (Exception, SystemExit) as exc:
+            # Connection exits on errors not ignored by caller
+            return server, None, exc
+
+    if not servers:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(servers)) as executor:
+        return list(executor.map(call, servers))
+
+
+def get_connection_params(config, server=DEFAULT_SERVER):
+    """Returns the extra connection params from the [CONNECTION] config section,
+    with settings overridden in config section of the server"""
+
+    server_config = {}
+    if server != DEFAULT_SERVER or "SERVER" in config:
+        server_config = get_server_config(config, server)
+
+    options = {}
+    if "CONNECTION" in config:
+        options.update(config["CONNECTION"])
+    for key, value in server_config.items():
+        if key not in SERVER_CREDENTIALS:
+            options[key] = value
+
+    if not options:
+        return {}
+
+    conn_config = configparser.ConfigParser()
+    conn_config.optionxform = str
+    conn_config.read_dict({"CONNECTION": options})
+    conn_config = conn_config["CONNECTION"]
+
+    params = {}
+    if conn_config.getboolean("retries_enabled", False):
+        params["retries_enabled"] = True
+        params["retry_policy"] = RetryPolicy.from_config(conn_config)
+
+    if conn_config.getboolean("session_cache", False):
+        # Imported here as store depends upon api module
+        from calm.dsl.store import AuthSession
+
+        params["session_store"] = AuthSession(
+            server_config.get("pc_ip"),
+            server_config.get("pc_port"),
+            server_config.get("pc_username"),
+            server_config.get("pc_password"),
+        )
+        params["session_ttl"] = conn_config.getint(
+            "session_ttl", REQUEST.AUTH_SESSION.TTL
+        )
+
+    if conn_config.getboolean("response_cache", False):
+        local_dir = get_init_data()["LOCAL_DIR"].get("location")
+        cache_size = conn_config.getint("response_cache_size", 100)  # MiB
+        cache_dir = "response_cache"
+        if server != DEFAULT_SERVER:
+            cache_dir += "_" + server
+        params["response_cache"] = ResponseCache(
+            os.path.join(local_dir, cache_dir), max_size=cache_size * 1024 * 1024
+        )
+
+    if conn_config.getboolean("compress_requests", False):
+        params["compress_requests"] = True
+        params["compress_min_size"] = conn_config.getint(
+            "compress_min_size", REQUEST.COMPRESSION.MIN_SIZE
+        )
+
+    if "slow_request_threshold" in conn_config:
+        params["slow_request_threshold"] = conn_config.getfloat(
+            "slow_request_threshold"
+        )
+
+    if "coalesce_window" in conn_config:
+        params["coalesce_window"] = conn_config.getfloat("coalesce_window")
+
+    if "rate_limit" in conn_config or "max_in_flight" in conn_config:
+        params["throttle"] = RequestThrottle(
+            rate=conn_config.getfloat("rate_limit", None) or None,
+            burst=conn_config.getint("rate_burst", None),
+            max_in_flight=conn_config.getint("max_in_flight", None) or None,
+            adaptive=conn_config.getboolean("adaptive_throttle", True),
+            latency_threshold=conn_config.getfloat("throttle_latency", None),
+        )
+
+    return params
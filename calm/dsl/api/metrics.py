@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+metrics: Latency, size and error metrics of requests made to calm
+
+Every request sent by a `Connection` is recorded in the process wide
+`RequestMetrics` (see `get_request_metrics`), grouped by method and endpoint
+(uuids in endpoints are replaced by '{uuid}').
+
+For each request, both the total time and the server time are recorded.
+Server time is the time till response headers arrive (`Response.elapsed`),
+total time also covers body encoding, upload, download and retries. A large
+gap between the two points at client side overhead.
+"""
+
+import re
+import threading
+import time
+
+UUID_REGEX = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+
+# Upper bounds (seconds) of latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def get_endpoint_name(endpoint):
+    """Returns endpoint with uuids and query string stripped"""
+
+    endpoint = endpoint.split("?", 1)[0]
+    return UUID_REGEX.sub("{uuid}", endpoint)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.total_time = 0.0
+        self.server_time = 0.0
+        self.max_time = 0.0
+        self.status_codes = {}
+        # Last bucket counts requests slower than all bounds
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, status_code, elapsed, server_time, bytes_out, bytes_in, retries):
+
+        self.count += 1
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+        self.retries += retries
+        self.bytes_out += bytes_out
+        self.bytes_in += bytes_in
+        self.total_time += elapsed
+        self.server_time += server_time
+        self.max_time = max(self.max_time, elapsed)
+
+        status = str(status_code) if status_code else "error"
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if elapsed <= bound:
+                self.histogram[index] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+
+    def get_percentile(self, percentile):
+        """Returns upper bound of bucket holding the given latency percentile"""
+
+        if not self.count:
+            return 0
+
+        rank = self.count * percentile / 100.0
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank and count:
+                if index < len(LATENCY_BUCKETS):
+                    return LATENCY_BUCKETS[index]
+                break
+        return self.max_time
+
+    def to_dict(self):
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "total_time": round(self.total_time, 6),
+            "server_time": round(self.server_time, 6),
+            "max_time": round(self.max_time, 6),
+            "p50": self.get_percentile(50),
+            "p95": self.get_percentile(95),
+            "status_codes": dict(self.status_codes),
+            "histogram": {
+                "le_{}".format(bound): count
+                for bound, count in zip(LATENCY_BUCKETS + ("inf",), self.histogram)
+            },
+        }
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.start_time = time.time()
+
+    def record(
+        self,
+        method,
+        endpoint,
+        status_code,
+        elapsed,
+        server_time=0.0,
+        bytes_out=0,
+        bytes_in=0,
+        retries=0,
+    ):
+        """Records a request
+
+        Args:
+            method (str): http method
+            endpoint (str): calm server endpoint
+            status_code (int): response status, None if no response came
+            elapsed (float): total time (seconds) taken by the request
+            server_time (float): time (seconds) till response headers came
+            bytes_out (int): size of request body
+            bytes_in (int): size of response body
+            retries (int): number of retries made for the request
+        """
+
+        key = (method.upper(), get_endpoint_name(endpoint))
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats()
+            stats.add(status_code, elapsed, server_time, bytes_out, bytes_in, retries)
+
+    def get_stats(self):
+        """Returns {(method, endpoint): EndpointStats}"""
+
+        with self._lock:
+            return dict(self._stats)
+
+    def reset(self):
+
+        with self._lock:
+            self._stats = {}
+            self.start_time = time.time()
+
+    def to_dict(self):
+        """Returns metrics as a json serializable dict"""
+
+        requests = []
+        totals = EndpointStats()
+        for (method, endpoint), stats in sorted(self.get_stats().items()):
+            data = stats.to_dict()
+            data.update({"method": method, "endpoint": endpoint})
+            requests.append(data)
+
+            totals.count += stats.count
+            totals.errors += stats.errors
+            totals.retries += stats.retries
+            totals.bytes_out += stats.bytes_out
+            totals.bytes_in += stats.bytes_in
+            totals.total_time += stats.total_time
+            totals.server_time += stats.server_time
+            totals.max_time = max(totals.max_time, stats.max_time)
+            totals.histogram = [
+                a + b for a, b in zip(totals.histogram, stats.histogram)
+            ]
+
+        summary = totals.to_dict()
+        summary.pop("status_codes")
+        summary["wall_time"] = round(time.time() - self.start_time, 6)
+        return {"summary": summary, "requests": requests}
+
+
+_REQUEST_METRICS = RequestMetrics()
+
+
+def get_request_metrics():
+    """Returns the process wide request metrics"""
+
+    return _REQUEST_METRICS
@@ -1,8 +1,12 @@
 from .resource import ResourceAPI
 from .connection import REQUEST
+from .batch import BatchAPI
 
 
 class ProjectAPI(ResourceAPI):
+
+    GROUPS_ENTITY_TYPE = "project"
+
     def __init__(self, connection):
         super().__init__(connection, resource_type="projects")
         self.CREATE_PREFIX = ResourceAPI.ROOT + "/projects_internal"
@@ -25,6 +29,15 @@ class ProjectAPI(ResourceAPI):
         )
 
     def read(self, id):
-        return self.connection._call(
-            self.INTERNAL_ITEM.format(id), verify=False, method=REQUEST.METHOD.GET
+        return self.connection._cached_call(
+            self.INTERNAL_ITEM.format(id),
+            get_entity_version=lambda: self.get_entity_version(id),
+            verify=False,
         )
+
+    def read_many(self, uuids):
+        requests = [
+            (REQUEST.METHOD.GET, self.INTERNAL_ITEM.format(uuid), None)
+            for uuid in uuids
+        ]
+        return BatchAPI(self.connection).execute(requests)
@@ -1,9 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 from .connection import REQUEST
+from .batch import BatchAPI
 
 
 class ResourceAPI:
 
     ROOT = "api/nutanix/v3"
+    PAGE_SIZE = 250
+    # Entity type of the resource in groups api, if available there
+    GROUPS_ENTITY_TYPE = None
+    VERSION_ATTRIBUTES = ["spec_version", "last_update_time"]
 
     def __init__(self, connection, resource_type):
         self.connection = connection
@@ -18,7 +26,16 @@ class ResourceAPI:
 
     def read(self, id=None):
         url = self.ITEM.format(id) if id else self.PREFIX
-        return self.connection._call(url, verify=False, method=REQUEST.METHOD.GET)
+        if not id:
+            return self.connection._call(url, verify=False, method=REQUEST.METHOD.GET)
+
+        get_entity_version = None
+        if self.GROUPS_ENTITY_TYPE:
+            get_entity_version = partial(self.get_entity_version, id)
+
+        return self.connection._cached_call(
+            url, get_entity_version=get_entity_version, verify=False
+        )
 
     def update(self, uuid, payload):
         return self.connection._call(
@@ -38,6 +55,94 @@ class ResourceAPI:
             self.LIST, verify=False, request_json=params, method=REQUEST.METHOD.POST
         )
 
+    def list_many(self, params_list):
+        """Makes list calls for each of the params in batches.
+
+        Returns:
+            (list): (response payload, error) of each list call
+        """
+
+        requests = [(REQUEST.METHOD.POST, self.LIST, params) for params in params_list]
+        return BatchAPI(self.connection).execute(requests)
+
+    def read_many(self, uuids):
+        """Reads entities in batches. Returns (payload, error) of each read"""
+
+        requests = [
+            (REQUEST.METHOD.GET, self.ITEM.format(uuid), None) for uuid in uuids
+        ]
+        return BatchAPI(self.connection).execute(requests)
+
+    def delete_many(self, uuids):
+        """Deletes entities in batches. Returns (payload, error) of each delete"""
+
+        requests = [
+            (REQUEST.METHOD.DELETE, self.ITEM.format(uuid), None) for uuid in uuids
+        ]
+        return BatchAPI(self.connection).execute(requests)
+
+    def iter_entities(self, filter_query="", page_size=None, params=None):
+        """Yields entities one at a time, walking all the pages of list call.
+
+        Pages are requested by offset/length until `metadata.total_matches`
+        entities are seen. The next page is fetched on a background worker
+        while the caller consumes the current one.
+
+        Args:
+            filter_query (str): filter for the list call
+            page_size (int): number of entities requested per call
+            params (dict): extra list params (sort_attribute, sort_order etc.)
+        Returns:
+            (generator): entities
+        """
+
+        params = dict(params or {})
+        page_size = page_size or self.PAGE_SIZE
+        offset = params.pop("offset", 0)
+        if filter_query:
+            params["filter"] = filter_query
+
+        def fetch_page(offset):
+            page_params = dict(params, offset=offset, length=page_size)
+            res, err = self.list(page_params)
+            if err:
+                raise Exception("[{}] - {}".format(err["code"], err["error"]))
+            return res.json()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page = executor.submit(fetch_page, offset)
+            while next_page:
+                response = next_page.result()
+                entities = response.get("entities") or []
+                total_matches = response["metadata"].get("total_matches", 0)
+
+                offset += len(entities)
+                next_page = None
+                if entities and offset < total_matches:
+                    next_page = executor.submit(fetch_page, offset)
+
+                for entity in entities:
+                    yield entity
+
+    def get_entity_version(self, uuid):
+        """Returns version (spec_version and last_update_time) of entity, read
+        through groups api projecting only those attributes. None if not found,
+        or if entities of the resource are not available in groups api"""
+
+        if not self.GROUPS_ENTITY_TYPE:
+            return None
+
+        # groups module imports this one
+        from .groups import GroupsAPI
+
+        member = GroupsAPI(self.connection).get_member(
+            self.GROUPS_ENTITY_TYPE, uuid, self.VERSION_ATTRIBUTES
+        )
+        if not member:
+            return None
+
+        return ":".join(str(member.get(name)) for name in self.VERSION_ATTRIBUTES)
+
     def get_name_uuid_map(self, params={}):
         response, err = self.list(params)
 
@@ -51,25 +156,18 @@ class ResourceAPI:
             return {}
 
         name_uuid_map = {}
-
         for entity in response["entities"]:
             entity_name = entity["status"]["name"]
             entity_uuid = entity["metadata"]["uuid"]
 
-            if entity_name in name_uuid_map:
-                uuid = name_uuid_map[entity_name]
-
-                if type(uuid) is str:
-                    uuids = uuid.split()
-                    uuids.append(entity_uuid)
-                    name_uuid_map[entity_name] = uuids
-
-                elif type(uuid) is list:
-                    uuid.append(entity_uuid)
-                    name_uuid_map[entity_name] = uuid
-
-            else:
+            # Names shared by many entities map to list of their uuids
+            uuid = name_uuid_map.get(entity_name)
+            if uuid is None:
                 name_uuid_map[entity_name] = entity_uuid
+            elif isinstance(uuid, list):
+                uuid.append(entity_uuid)
+            else:
+                name_uuid_map[entity_name] = [uuid, entity_uuid]
 
         return name_uuid_map
 
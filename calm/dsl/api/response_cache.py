@@ -0,0 +1,133 @@
+import os
+import json
+import hashlib
+import functools
+import threading
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from calm.dsl.tools import get_logging_handle, codec
+
+LOG = get_logging_handle(__name__)
+
+
+class ResponseCache:
+    """On-disk cache of GET responses keyed by url (which includes server).
+
+    Every entry is stored as a body file and a metadata file holding the
+    validators (ETag, entity version) used to revalidate it. Least recently
+    used entries are evicted once the total size crosses `max_size` bytes.
+    """
+
+    BODY_EXT = ".body"
+    META_EXT = ".meta"
+
+    def __init__(self, cache_dir, max_size=100 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_paths(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        path = os.path.join(self.cache_dir, key)
+        return path + self.BODY_EXT, path + self.META_EXT
+
+    def get(self, url):
+        """Returns (content, meta) of cached response, None if absent"""
+
+        body_file, meta_file = self._get_paths(url)
+        try:
+            with open(meta_file) as fd:
+                meta = json.load(fd)
+            with open(body_file, "rb") as fd:
+                content = fd.read()
+        except (OSError, ValueError):
+            return None
+
+        # Mark entry as recently used
+        try:
+            os.utime(body_file)
+        except OSError:
+            pass
+
+        return content, meta
+
+    def put(self, url, content, etag=None, version=None, headers=None):
+        """Stores the response content with its validators"""
+
+        body_file, meta_file = self._get_paths(url)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "version": version,
+            "headers": dict(headers or {}),
+        }
+
+        with self._lock:
+            try:
+                with open(body_file, "wb") as fd:
+                    fd.write(content)
+                with open(meta_file, "w") as fd:
+                    json.dump(meta, fd)
+            except OSError as exc:
+                LOG.debug("Could not write response cache entry: %s", exc)
+                return
+
+            self.evict()
+
+    def delete(self, url):
+        """Removes the cached response of url"""
+
+        for file in self._get_paths(url):
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Removes all the cached responses"""
+
+        for file in os.listdir(self.cache_dir):
+            if file.endswith(self.BODY_EXT) or file.endswith(self.META_EXT):
+                os.remove(os.path.join(self.cache_dir, file))
+
+    def evict(self):
+        """Removes least recently used entries till cache fits in max_size"""
+
+        entries = []
+        total_size = 0
+        for file in os.listdir(self.cache_dir):
+            if not file.endswith(self.BODY_EXT):
+                continue
+
+            stat = os.stat(os.path.join(self.cache_dir, file))
+            entries.append((stat.st_mtime, stat.st_size, file))
+            total_size += stat.st_size
+
+        entries.sort()
+        while entries and total_size > self.max_size:
+            _, size, file = entries.pop(0)
+            key = file[: -len(self.BODY_EXT)]
+            LOG.debug("Evicting response cache entry %s", key)
+            for ext in [self.BODY_EXT, self.META_EXT]:
+                try:
+                    os.remove(os.path.join(self.cache_dir, key + ext))
+                except OSError:
+                    pass
+            total_size -= size
+
+    @staticmethod
+    def build_response(url, content, meta):
+        """Returns a `requests.Response` for cached content"""
+
+        res = Response()
+        res.status_code = 200
+        res.url = url
+        res._content = content
+        res.headers = CaseInsensitiveDict(meta.get("headers", {}))
+        res.encoding = "utf-8"
+        res.json = functools.partial(codec.response_json, res)
+        return res
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+throttle: Client side rate limiting and concurrency control of requests
+
+Every request sent by a `Connection` with a `RequestThrottle` first takes a
+token from a token bucket (requests per second, with bursts) and then a slot
+among the requests allowed in flight. Both limits adapt to the server:
+
+  - an overload response (429, 502-504), a failed request or a slow
+    response halves the in-flight limit and the rate (multiplicative
+    decrease),
+  - successful responses raise them back, by one per `limit` responses
+    (additive increase), upto the configured limits.
+
+So callers running many requests from their own thread pools get the
+maximum throughput the server sustains, without tuning sleeps.
+
+Example:
+
+throttle = RequestThrottle(rate=20, max_in_flight=8)
+with throttle.slot() as slot:
+    res = session.get(url)
+    slot.done(res.status_code)
+
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+# Status codes sent by server when it is overloaded
+THROTTLE_STATUS_CODES = (429, 502, 503, 504)
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, and upto `burst`
+    acquisitions at once"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(rate, 1))
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def acquire(self):
+        """Blocks till a token is available. Returns the time waited"""
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill()
+            self.rate = float(rate)
+
+
+class AdaptiveLimiter:
+    """Semaphore whose limit follows AIMD (additive increase, multiplicative
+    decrease) between `min_limit` and `max_limit`"""
+
+    def __init__(self, max_limit, min_limit=1, decrease_factor=0.5):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def increase(self):
+        """Raises limit by one, spread over `limit` successful requests"""
+
+        with self._cond:
+            if self.limit < self.max_limit:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                self._cond.notify_all()
+
+    def decrease(self):
+        with self._cond:
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+
+
+class _Slot:
+    def __init__(self):
+        self.status_code = None
+        self.failed = False
+
+    def done(self, status_code):
+        """Records status of the response, None if request failed"""
+
+        self.status_code = status_code
+        self.failed = status_code is None or status_code in THROTTLE_STATUS_CODES
+
+
+class RequestThrottle:
+    """Token bucket rate limiter with an in-flight limit, adapting both to
+    errors and latency of the server.
+
+    Args:
+        rate (float): max requests per second, None for no rate limit
+        burst (int): max requests sent at once by rate limiter, defaults to rate
+        max_in_flight (int): max requests in flight, None for no limit
+        adaptive (bool): adapt limits to errors and latency of server
+        latency_threshold (float): responses slower than this (seconds) are
+                                   treated as a sign of overload
+        min_rate (float): rate is not reduced below this
+    """
+
+    def __init__(
+        self,
+        rate=None,
+        burst=None,
+        max_in_flight=None,
+        adaptive=True,
+        latency_threshold=None,
+        min_rate=1.0,
+    ):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate) if rate else min_rate
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.limiter = AdaptiveLimiter(max_in_flight) if max_in_flight else None
+        self.adaptive = adaptive
+        self.latency_threshold = latency_threshold
+        self.throttled = 0
+        self.wait_time = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        """Waits for rate limiter and a free in-flight slot. Caller reports
+        the response status with `slot.done(status_code)`"""
+
+        start = time.monotonic()
+        if self.bucket:
+            self.bucket.acquire()
+        if self.limiter:
+            self.limiter.acquire()
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self.wait_time += waited
+
+        slot = _Slot()
+        sent_at = time.monotonic()
+        try:
+            yield slot
+        except BaseException:
+            slot.done(None)
+            raise
+        finally:
+            if self.limiter:
+                self.limiter.release()
+            if self.adaptive:
+                self._adapt(slot, time.monotonic() - sent_at)
+
+    def _adapt(self, slot, elapsed):
+
+        slow = self.latency_threshold is not None and elapsed > self.latency_threshold
+        if slot.failed or slow:
+            with self._lock:
+                self.throttled += 1
+            if self.limiter:
+                self.limiter.decrease()
+            if self.bucket:
+                self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+            LOG.debug(
+                "Backing off (status %s, %.2fs): rate %s, in-flight limit %s",
+                slot.status_code,
+                elapsed,
+                self.bucket.rate if self.bucket else "-",
+                int(self.limiter.limit) if self.limiter else "-",
+            )
+            return
+
+        if self.limiter:
+            self.limiter.increase()
+        if self.bucket and self.bucket.rate < self.max_rate:
+            rate = self.bucket.rate
+            self.bucket.set_rate(min(self.max_rate, rate + 1.0 / rate))
+
+    def get_stats(self):
+        """Returns current limits and counters"""
+
+        return {
+            "rate": self.bucket.rate if self.bucket else None,
+            "in_flight_limit": int(self.limiter.limit) if self.limiter else None,
+            "throttled": self.throttled,
+            "wait_time": round(self.wait_time, 6),
+        }
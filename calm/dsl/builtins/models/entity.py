@@ -7,7 +7,7 @@ import uuid
 
 from ruamel.yaml import YAML, resolver, SafeRepresenter
 from calm.dsl.tools import StrictDraft7Validator
-from calm.dsl.tools import get_logging_handle
+from calm.dsl.tools import get_logging_handle, codec
 from .schema import get_schema_details
 
 LOG = get_logging_handle(__name__)
@@ -49,7 +49,7 @@ class EntityDict(OrderedDict):
                 ("variables" in vdict and isinstance(value, (VariableType,)))
                 or ("actions" in vdict and isinstance(type(value), DescriptorType))
             ):
-                LOG.debug("Validating object: {}".format(vdict))
+                LOG.debug("Validating object: %s", vdict)
                 raise
 
             # Validate and set variable/action
@@ -351,16 +351,19 @@ class EntityType(EntityTypeBase):
 
     def json_dumps(cls, pprint=False, sort_keys=False):
 
+        if not pprint:
+            return codec.dumps(cls, default=encode_entity, sort_keys=sort_keys)
+
         dump = json.dumps(
             cls,
             cls=EntityJSONEncoder,
             sort_keys=sort_keys,
-            indent=4 if pprint else None,
-            separators=(",", ": ") if pprint else (",", ":"),
+            indent=4,
+            separators=(",", ": "),
         )
 
         # Add newline for pretty print
-        return dump + "\n" if pprint else dump
+        return dump + "\n"
 
     def json_loads(cls, data):
         return json.loads(data, cls=EntityJSONDecoder)
@@ -396,7 +399,7 @@ class EntityType(EntityTypeBase):
         return ref(name, bases, attrs)
 
     def get_dict(cls):
-        return json.loads(cls.json_dumps())
+        return codec.loads(codec.dumps_bytes(cls, default=encode_entity))
 
 
 class Entity(metaclass=EntityType):
@@ -412,6 +415,17 @@ class EntityJSONEncoder(JSONEncoder):
         return cls.compile()
 
 
+def encode_entity(cls):
+    """`default` hook of codec to encode entities"""
+
+    if not hasattr(cls, "__kind__"):
+        raise TypeError(
+            "Object of type {} is not JSON serializable".format(type(cls).__name__)
+        )
+
+    return cls.compile()
+
+
 class EntityJSONDecoder(JSONDecoder):
     def __init__(self, *args, **kwargs):
         super().__init__(object_hook=self.object_hook, *args, **kwargs)
@@ -58,9 +58,10 @@ class PODDeploymentType(DeploymentType):
             # In simple deployment there will be no explicit contianers
             if len(containers_list) != len(cls.containers):
                 LOG.debug(
-                    "No. of container services provided in entity {}: {}, while no. of containers provided in deployment spec: {}".format(
-                        cls, len(cls.containers), len(containers_list)
-                    )
+                    "No. of container services provided in entity %s: %s, while no. of containers provided in deployment spec: %s",
+                    cls,
+                    len(cls.containers),
+                    len(containers_list),
                 )
                 raise Exception(
                     "No. of container services does not match k8s deployment spec"
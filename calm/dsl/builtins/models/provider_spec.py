@@ -49,7 +49,7 @@ def read_spec(filename, depth=1):
     )
 
     if not file_exists(file_path):
-        LOG.debug("file {} not found at location {}".format(filename, file_path))
+        LOG.debug("file %s not found at location %s", filename, file_path)
         raise ValueError("file {} not found".format(filename))
 
     with open(file_path, "r") as f:
@@ -1,6 +1,5 @@
 """ Schema should be according to OpenAPI 3 format with x-calm-dsl-type extension"""
 
-import json
 from copy import deepcopy
 from io import StringIO
 
@@ -10,7 +9,7 @@ import jsonref
 from bidict import bidict
 
 from .validator import get_property_validators
-from calm.dsl.tools import get_logging_handle
+from calm.dsl.tools import get_logging_handle, codec
 
 
 LOG = get_logging_handle(__name__)
@@ -33,7 +32,7 @@ def _load_all_schemas(schema_file="main.yaml.jinja2"):
     tdict = yaml.safe_load(StringIO(template.render()))
 
     # Check if all references are resolved
-    tdict = jsonref.loads(json.dumps(tdict))
+    tdict = jsonref.loads(codec.dumps(tdict))
     # print(json.dumps(tdict, cls=EntityJSONEncoder, indent=4, separators=(",", ": ")))
 
     schemas = tdict["components"]["schemas"]
@@ -45,7 +44,7 @@ def get_schema(name):
     schemas = _get_all_schemas()
     schema = schemas.get(name, None)
     if not schema:
-        LOG.debug("Schema name can be one of {}".format(list(schema.keys())))
+        LOG.debug("Schema name can be one of %s", list(schema.keys()))
         raise TypeError("Invalid schema name {} given".format(name))
 
     return schema
@@ -60,7 +59,7 @@ def get_schema_props(name):
     elif schema_type == "app_provider_spec":
         schema_props = {}
     elif not schema_props:
-        LOG.debug("Schema properties for schema {} is not available".format(name))
+        LOG.debug("Schema properties for schema %s is not available", name)
         raise TypeError("Invalid schema name {} given".format(name))
 
     return schema_props
@@ -103,7 +102,7 @@ def get_validator_details(schema_props, name):
         item_props = props.get("items", None)
         item_type = item_props.get("type", None)
         if item_type is None:
-            LOG.debug("Item type not found in schema {}".format(item_props))
+            LOG.debug("Item type not found in schema %s", item_props)
             raise Exception("Invalid schema {} given".format(item_props))
 
         ValidatorType, _, _ = get_validator_details(props, "items")
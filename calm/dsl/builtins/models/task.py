@@ -494,7 +494,7 @@ def http_task_delete(
 
 def _header_variables_from_dict(headers, secret=False):
     variables = []
-    LOG.debug("Headers for HTTP task : {}".format(headers))
+    LOG.debug("Headers for HTTP task : %s", headers)
     if not isinstance(headers, dict):
         raise TypeError(
             "Headers for HTTP task "
@@ -621,7 +621,7 @@ def http_task(
         kwargs["attrs"]["headers"] = header_variables
 
     if status_mapping is not None:
-        LOG.debug("Status mapping for HTTP Task : {}".format(status_mapping))
+        LOG.debug("Status mapping for HTTP Task : %s", status_mapping)
         if not isinstance(status_mapping, dict):
             raise TypeError(
                 "Status mapping for HTTP task "
@@ -648,7 +648,7 @@ def http_task(
         kwargs["attrs"]["expected_response_params"] = expected_response
 
     if response_paths is not None:
-        LOG.debug("Response paths for HTTP Task : {}".format(response_paths))
+        LOG.debug("Response paths for HTTP Task : %s", response_paths)
         if not isinstance(response_paths, dict):
             raise TypeError(
                 "Response paths for HTTP task "
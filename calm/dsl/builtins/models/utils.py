@@ -24,7 +24,7 @@ def read_file(filename, depth=1):
     )
 
     if not file_exists(file_path):
-        LOG.debug("file {} not found at location {}".format(filename, file_path))
+        LOG.debug("file %s not found at location %s", filename, file_path)
         raise ValueError("file {} not found".format(filename))
 
     with open(file_path, "r") as data:
@@ -58,7 +58,7 @@ def read_env(relpath=".env"):
     # Get filepath
     filepath = _get_caller_filepath(relpath)
 
-    LOG.debug("Reading env from file: {}".format(filepath))
+    LOG.debug("Reading env from file: %s", filepath)
 
     # Check if file path exists
     if not os.path.exists(filepath):
@@ -92,7 +92,7 @@ def read_env(relpath=".env"):
 
     local_env = dict(local_env_list)
     LOG.debug(
-        "Got local env:\n{}".format(
+        lambda: "Got local env:\n{}".format(
             json.dumps(local_env, indent=4, separators=(",", ": "))
         )
     )
@@ -10,7 +10,7 @@ from calm.dsl.config import get_config
 
 from .utils import get_name_query, get_states_filter, highlight_text
 from .constants import ACCOUNT
-from calm.dsl.store import Version
+from calm.dsl.store import Version, NameResolver
 from calm.dsl.tools import get_logging_handle
 
 LOG = get_logging_handle(__name__)
@@ -96,40 +96,33 @@ def get_accounts(name, filter_by, limit, offset, quiet, all_items, account_type)
 
 def get_account(client, account_name):
 
-    params = {"filter": "name=={}".format(account_name)}
-    res, err = client.account.list(params=params)
-    if err:
-        raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-    response = res.json()
-    entities = response.get("entities", None)
-    account = None
-    if entities:
-        if len(entities) != 1:
-            raise Exception("More than one account found - {}".format(entities))
-
-        LOG.info("{} found ".format(account_name))
-        account = entities[0]
-    else:
+    found = NameResolver(client).get_entities("account", [account_name])
+    entities = found[account_name]
+    if not entities:
         raise Exception("No account having name {} found".format(account_name))
 
-    account_id = account["metadata"]["uuid"]
-    LOG.info("Fetching account details")
-    res, err = client.account.read(account_id)
-    if err:
-        raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    if len(entities) != 1:
+        raise Exception("More than one account found - {}".format(entities))
 
-    account = res.json()
-    return account
+    LOG.info("{} found ".format(account_name))
+    return entities[0]
 
 
 def delete_account(account_names):
 
     client = get_api_client()
+    resolver = NameResolver(client)
+    # Names are looked up on server, an indexed uuid may now be another entity
+    resolved = resolver.resolve("account", account_names, use_index=False)
     for account_name in account_names:
-        account = get_account(client, account_name)
-        account_id = account["metadata"]["uuid"]
-        res, err = client.account.delete(account_id)
+        account_ids = resolved[account_name]
+        if not account_ids:
+            raise Exception("No account having name {} found".format(account_name))
+        if len(account_ids) != 1:
+            raise Exception("More than one account found - {}".format(account_ids))
+
+        res, err = client.account.delete(account_ids[0])
+        resolver.invalidate("account", [account_name])
         if err:
             raise Exception("[{}] - {}".format(err["code"], err["error"]))
         LOG.info("Account {} deleted".format(account_name))
@@ -3,7 +3,7 @@ import click
 from calm.dsl.api import get_api_client
 
 from .main import main, get, describe, delete, run, watch, download
-from .utils import Display, FeatureFlagGroup
+from .utils import Display, FeatureFlagGroup, servers_option
 from .apps import (
     get_apps,
     describe_app,
@@ -33,9 +33,10 @@ LOG = get_logging_handle(__name__)
 @click.option(
     "--all-items", "-a", is_flag=True, help="Get all items, including deleted ones"
 )
-def _get_apps(name, filter_by, limit, offset, quiet, all_items):
+@servers_option
+def _get_apps(name, filter_by, limit, offset, quiet, all_items, servers):
     """Get Apps, optionally filtered by a string"""
-    get_apps(name, filter_by, limit, offset, quiet, all_items)
+    get_apps(name, filter_by, limit, offset, quiet, all_items, servers)
 
 
 @describe.command("app")
@@ -141,18 +142,28 @@ def _watch_app(app_name, poll_interval):
     "--app", "app_name", "-a", required=True, help="App the action belongs to"
 )
 @click.option("--file", "file_name", "-f", help="How to name the downloaded file")
-def _download_runlog(runlog_uuid, app_name, file_name):
+@click.option(
+    "--resume",
+    "-r",
+    is_flag=True,
+    default=False,
+    help="Continue a partial download into the same file",
+)
+def _download_runlog(runlog_uuid, app_name, file_name, resume):
     """Download runlogs, given runlog uuid and app name"""
-    download_runlog(runlog_uuid, app_name, file_name)
+    download_runlog(runlog_uuid, app_name, file_name, resume=resume)
 
 
 @delete.command("app")
 @click.argument("app_names", nargs=-1)
 @click.option("--soft", "-s", is_flag=True, default=False, help="Soft delete app")
-def _delete_app(app_names, soft):
+@click.option(
+    "--wait", "-w", is_flag=True, default=False, help="Wait till apps are deleted"
+)
+def _delete_app(app_names, soft, wait):
     """Deletes an application"""
 
-    delete_app(app_names, soft)
+    delete_app(app_names, soft, wait=wait)
 
 
 @main.group(cls=FeatureFlagGroup)
@@ -3,6 +3,7 @@ import sys
 from prettytable import PrettyTable
 
 from calm.dsl.api import get_api_client
+from calm.dsl.store import NameResolver
 from calm.dsl.tools import get_logging_handle
 from .utils import highlight_text, get_name_query
 
@@ -14,20 +15,24 @@ def create_app_icon(name, file):
 
     client = get_api_client()
     client.app_icon.upload(name, file)
+    NameResolver(client).invalidate("app_icon", [name])
 
 
 def delete_app_icon(icon_names):
     """deletes app_icons in icon_names"""
 
     client = get_api_client()
-    app_icon_name_uuid_map = client.app_icon.get_name_uuid_map()
+    resolver = NameResolver(client)
+    # Names are looked up on server, an indexed uuid may now be another entity
+    app_icon_name_uuid_map = resolver.resolve("app_icon", icon_names, use_index=False)
 
     for icon_name in icon_names:
-        app_icon_uuid = app_icon_name_uuid_map.get(icon_name, None)
-        if not app_icon_uuid:
-            LOG.error("APP icon: {} not found")
+        app_icon_uuids = app_icon_name_uuid_map[icon_name]
+        if not app_icon_uuids:
+            LOG.error("APP icon: {} not found".format(icon_name))
             sys.exit(-1)
-        client.app_icon.delete(app_icon_uuid)
+        client.app_icon.delete(app_icon_uuids[0])
+        resolver.invalidate("app_icon", [icon_name])
         LOG.info("App Icon {} deleted".format(icon_name))
 
 
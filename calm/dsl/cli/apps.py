@@ -1,3 +1,4 @@
+import sys
 import time
 import json
 from json import JSONEncoder
@@ -9,19 +10,104 @@ from anytree import NodeMixin, RenderTree
 
 from calm.dsl.api import get_api_client
 from calm.dsl.config import get_config
-
-from .utils import get_name_query, get_states_filter, highlight_text, Display
-from .constants import APPLICATION, RUNLOG, SYSTEM_ACTIONS
+from calm.dsl.store import NameResolver
+
+from .utils import (
+    get_name_query,
+    get_states_filter,
+    get_time_text,
+    highlight_text,
+    Display,
+    DownloadProgress,
+    list_on_servers,
+    list_group_members,
+    delete_entities,
+)
+from .constants import APPLICATION, RUNLOG, SYSTEM_ACTIONS, DELETION
 from calm.dsl.tools import get_logging_handle
 
 LOG = get_logging_handle(__name__)
 
 
-def get_apps(name, filter_by, limit, offset, quiet, all_items):
-    client = get_api_client()
-    config = get_config()
+# Attributes of apps shown by `calm get apps`, fetched using groups api
+APPLICATION_GROUP_ATTRIBUTES = [
+    "name",
+    "blueprint_name",
+    "_state",
+    "project_name",
+    "owner_username",
+    "_created_timestamp_usecs_",
+    "last_update_time",
+]
+
+
+def get_app_row(entity):
+    """Returns displayed fields of app in list api response"""
+
+    row = entity["status"]
+    metadata = entity["metadata"]
+    return {
+        "name": row["name"],
+        "blueprint": row["resources"]["app_blueprint_reference"]["name"],
+        "state": row["state"],
+        "project": metadata.get("project_reference", {}).get("name"),
+        "owner": metadata["owner_reference"]["name"],
+        "creation_time": metadata["creation_time"],
+        "last_update_time": metadata["last_update_time"],
+        "uuid": row["uuid"],
+    }
+
+
+def get_app_group_row(member):
+    """Returns displayed fields of app listed by groups api"""
+
+    # Attributes without a value are not returned by groups api
+    return {
+        "name": member["name"],
+        "blueprint": member["blueprint_name"] or "-",
+        "state": member["_state"] or "-",
+        "project": member["project_name"] or "-",
+        "owner": member["owner_username"] or "-",
+        "creation_time": member["_created_timestamp_usecs_"],
+        "last_update_time": member["last_update_time"],
+        "uuid": member["uuid"],
+    }
+
+
+def list_app_rows(client, filter_query, limit, offset, all_items=False):
+    """Returns (rows, err). Rows have only the displayed fields, fetched
+    using groups api. Falls back to list api if groups api call fails"""
 
+    # list api skips deleted apps by default, groups api does not
+    group_filter = filter_query
+    if not all_items:
+        group_filter += ";_state!=deleted" if filter_query else "_state!=deleted"
+
+    members = list_group_members(
+        client,
+        "app",
+        APPLICATION_GROUP_ATTRIBUTES,
+        filter_query=group_filter,
+        limit=limit,
+        offset=offset,
+    )
+    if members is not None:
+        return [get_app_group_row(member) for member in members], None
+
+    LOG.debug("Listing applications using list api")
     params = {"length": limit, "offset": offset}
+    if filter_query:
+        params["filter"] = filter_query
+
+    res, err = client.application.list(params=params)
+    if err:
+        return None, err
+
+    return [get_app_row(entity) for entity in res.json()["entities"]], None
+
+
+def get_apps(name, filter_by, limit, offset, quiet, all_items, servers=None):
+
     filter_query = ""
     if name:
         filter_query = get_name_query([name])
@@ -32,29 +118,34 @@ def get_apps(name, filter_by, limit, offset, quiet, all_items):
     if filter_query.startswith(";"):
         filter_query = filter_query[1:]
 
-    if filter_query:
-        params["filter"] = filter_query
+    def list_rows(client):
+        return list_app_rows(client, filter_query, limit, offset, all_items)
 
-    res, err = client.application.list(params=params)
+    if servers:
+        json_rows = list_on_servers(list_rows, servers, "applications")
+    else:
+        client = get_api_client()
+        rows, err = list_rows(client)
 
-    if err:
-        pc_ip = config["SERVER"]["pc_ip"]
-        LOG.warning("Cannot fetch applications from {}".format(pc_ip))
-        return
+        if err:
+            config = get_config()
+            pc_ip = config["SERVER"]["pc_ip"]
+            LOG.warning("Cannot fetch applications from {}".format(pc_ip))
+            return
+
+        json_rows = [(None, row) for row in rows]
 
-    json_rows = res.json()["entities"]
     if not json_rows:
         click.echo(highlight_text("No application found !!!\n"))
         return
 
     if quiet:
-        for _row in json_rows:
-            row = _row["status"]
+        for _, row in json_rows:
             click.echo(highlight_text(row["name"]))
         return
 
     table = PrettyTable()
-    table.field_names = [
+    table.field_names = (["SERVER"] if servers else []) + [
         "NAME",
         "SOURCE BLUEPRINT",
         "STATE",
@@ -64,28 +155,17 @@ def get_apps(name, filter_by, limit, offset, quiet, all_items):
         "LAST UPDATED",
         "UUID",
     ]
-    for _row in json_rows:
-        row = _row["status"]
-        metadata = _row["metadata"]
-
-        project = (
-            metadata["project_reference"]["name"]
-            if "project_reference" in metadata
-            else None
-        )
-
-        creation_time = int(metadata["creation_time"]) // 1000000
-        last_update_time = int(metadata["last_update_time"]) // 1000000
-
+    for server, row in json_rows:
         table.add_row(
-            [
+            ([highlight_text(server)] if servers else [])
+            + [
                 highlight_text(row["name"]),
-                highlight_text(row["resources"]["app_blueprint_reference"]["name"]),
+                highlight_text(row["blueprint"]),
                 highlight_text(row["state"]),
-                highlight_text(project),
-                highlight_text(metadata["owner_reference"]["name"]),
-                highlight_text(time.ctime(creation_time)),
-                "{}".format(arrow.get(last_update_time).humanize()),
+                highlight_text(row["project"]),
+                highlight_text(row["owner"]),
+                highlight_text(get_time_text(row["creation_time"])),
+                get_time_text(row["last_update_time"], humanize=True),
                 highlight_text(row["uuid"]),
             ]
         )
@@ -93,48 +173,38 @@ def get_apps(name, filter_by, limit, offset, quiet, all_items):
 
 
 def _get_app(client, app_name, screen=Display(), all=False):
-    # 1. Get app_uuid from list api
-    params = {"filter": "name=={}".format(app_name)}
-    if all:
-        params["filter"] += get_states_filter(APPLICATION.STATES, state_key="_state")
 
-    res, err = client.application.list(params=params)
-    if err:
-        raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    return _get_apps(client, [app_name], screen=screen, all=all)[0]
 
-    response = res.json()
-    entities = response.get("entities", None)
-    app = None
-    if entities:
-        app = entities[0]
-        if len(entities) != 1:
-            # If more than one item found, check if an exact name match is present. Else raise.
-            found = False
-            for ent in entities:
-                if ent["metadata"]["name"] == app_name:
-                    app = ent
-                    found = True
-                    break
-            if not found:
-                raise Exception("More than one app found - {}".format(entities))
+
+def _get_apps(client, app_names, screen=Display(), all=False):
+    """Returns details of apps with given names. Names are resolved through
+    the local name index, unless apps in all states are searched"""
+
+    filter_query = ""
+    if all:
+        filter_query = get_states_filter(APPLICATION.STATES, state_key="_state")
+
+    resolver = NameResolver(client)
+    found = resolver.get_entities(
+        "application",
+        app_names,
+        filter_query=filter_query.lstrip(";"),
+        use_index=not all,
+    )
+
+    apps = []
+    for app_name in app_names:
+        entities = found[app_name]
+        if not entities:
+            raise Exception("No app found with name {} found".format(app_name))
 
         screen.clear()
         LOG.info("App {} found".format(app_name))
         screen.refresh()
-        app = entities[0]
-    else:
-        raise Exception("No app found with name {} found".format(app_name))
-    app_id = app["metadata"]["uuid"]
+        apps.append(entities[0])
 
-    # 2. Get app details
-    screen.clear()
-    LOG.info("Fetching app details")
-    screen.refresh()
-    res, err = client.application.read(app_id)
-    if err:
-        raise Exception("[{}] - {}".format(err["code"], err["error"]))
-    app = res.json()
-    return app
+    return apps
 
 
 def describe_app(app_name, out):
@@ -502,22 +572,60 @@ def watch_app(app_name, screen, app=None):
     poll_action(poll_func, is_complete)
 
 
-def delete_app(app_names, soft=False):
-    client = get_api_client()
+class AppDeletionState:
+    """Returns deletion status of apps, read while they are being deleted.
 
-    for app_name in app_names:
-        app = _get_app(client, app_name)
-        app_id = app["metadata"]["uuid"]
-        action_label = "Soft Delete" if soft else "Delete"
-        LOG.info("Triggering {}".format(action_label))
-        res, err = client.application.delete(app_id, soft_delete=soft)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    Apps in error state are commonly deleted. So an app in error state is
+    reported failed only after it was seen deleting.
+    """
 
-        LOG.info("{} action triggered".format(action_label))
-        response = res.json()
-        runlog_id = response["status"]["runlog_uuid"]
-        LOG.info("Action runlog uuid: {}".format(runlog_id))
+    def __init__(self):
+        self.deleting = set()
+
+    def __call__(self, app):
+
+        app_uuid = app["metadata"]["uuid"]
+        app_state = app["status"]["state"]
+        if app_state == APPLICATION.STATES.DELETED:
+            return DELETION.STATUS.DELETED, ""
+
+        elif app_state == APPLICATION.STATES.DELETING:
+            self.deleting.add(app_uuid)
+
+        elif app_state == APPLICATION.STATES.ERROR and app_uuid in self.deleting:
+            return DELETION.STATUS.FAILED, "App is in {} state".format(app_state)
+
+        return DELETION.STATUS.IN_PROGRESS, ""
+
+
+def delete_app(app_names, soft=False, wait=False):
+    client = get_api_client()
+    resolver = NameResolver(client)
+
+    # Names are looked up on server, an indexed uuid may now be another entity
+    resolved = resolver.resolve("application", app_names, use_index=False)
+    action_label = "Soft Delete" if soft else "Delete"
+    LOG.info("Triggering {}".format(action_label))
+
+    rows = delete_entities(
+        client.application,
+        "app",
+        app_names,
+        resolved,
+        delete_func=lambda app_ids: client.application.delete_many(
+            app_ids, soft_delete=soft
+        ),
+        get_deletion_state=AppDeletionState(),
+        get_message=lambda response: "Action runlog uuid: {}".format(
+            response["status"]["runlog_uuid"]
+        ),
+        wait=wait,
+    )
+    resolver.invalidate("application", app_names)
+
+    failed_statuses = [DELETION.STATUS.FAILED, DELETION.STATUS.TIMED_OUT]
+    if any(row["status"] in failed_statuses for row in rows):
+        sys.exit(-1)
 
 
 def run_actions(screen, app_name, action_name, watch):
@@ -588,7 +696,7 @@ def poll_action(poll_func, completion_func, poll_interval=10):
         time.sleep(poll_interval)
 
 
-def download_runlog(runlog_id, app_name, file_name):
+def download_runlog(runlog_id, app_name, file_name, resume=False):
     """Download runlogs, given runlog uuid and app name"""
 
     client = get_api_client()
@@ -598,10 +706,11 @@ def download_runlog(runlog_id, app_name, file_name):
     if not file_name:
         file_name = "runlog_{}.zip".format(runlog_id)
 
-    res, err = client.application.download_runlog(app_id, runlog_id)
+    with DownloadProgress("Downloading runlogs") as progress:
+        res, err = client.application.download_runlog(
+            app_id, runlog_id, file=file_name, progress=progress, resume=resume
+        )
     if not err:
-        with open(file_name, "wb") as fw:
-            fw.write(res.content)
         click.echo("Runlogs saved as {}".format(highlight_text(file_name)))
     else:
         LOG.error("[{}] - {}".format(err["code"], err["error"]))
@@ -5,10 +5,11 @@ import click
 
 from calm.dsl.api import get_api_client
 from calm.dsl.config import get_config
-from calm.dsl.tools import get_logging_handle
+from calm.dsl.store import NameResolver
+from calm.dsl.tools import get_logging_handle, codec
 
 from .secrets import find_secret, create_secret
-from .utils import highlight_text
+from .utils import highlight_text, servers_option
 from .main import get, compile, describe, create, launch, delete, format
 from .bps import (
     get_blueprint_list,
@@ -38,10 +39,11 @@ LOG = get_logging_handle(__name__)
 @click.option(
     "--all-items", "-a", is_flag=True, help="Get all items, including deleted ones"
 )
-def _get_blueprint_list(name, filter_by, limit, offset, quiet, all_items):
+@servers_option
+def _get_blueprint_list(name, filter_by, limit, offset, quiet, all_items, servers):
     """Get the blueprints, optionally filtered by a string"""
 
-    get_blueprint_list(name, filter_by, limit, offset, quiet, all_items)
+    get_blueprint_list(name, filter_by, limit, offset, quiet, all_items, servers)
 
 
 @describe.command("bp")
@@ -137,13 +139,15 @@ def create_blueprint(
 
     categories = bp_payload["metadata"].get("categories", None)
 
-    return client.blueprint.upload_with_secrets(
+    res = client.blueprint.upload_with_secrets(
         bp_name,
         bp_desc,
         bp_resources,
         categories=categories,
         force_create=force_create,
     )
+    NameResolver(client).invalidate("blueprint", [bp_name])
+    return res
 
 
 def create_blueprint_from_json(
@@ -151,7 +155,7 @@ def create_blueprint_from_json(
 ):
 
     with open(path_to_json, "r") as f:
-        bp_payload = json.loads(f.read())
+        bp_payload = codec.loads(f.read())
     return create_blueprint(
         client,
         bp_payload,
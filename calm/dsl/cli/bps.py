@@ -22,25 +22,114 @@ from calm.dsl.api import get_api_client
 from .utils import (
     get_name_query,
     get_states_filter,
+    get_time_text,
     highlight_text,
     get_module_from_file,
     import_var_from_file,
+    list_on_servers,
+    list_group_members,
+    delete_entities,
 )
-from .constants import BLUEPRINT
-from calm.dsl.store import Cache
+from .constants import BLUEPRINT, DELETION
+from calm.dsl.store import Cache, NameResolver
 from calm.dsl.tools import get_logging_handle
 from calm.dsl.providers import get_provider
 
 LOG = get_logging_handle(__name__)
 
 
-def get_blueprint_list(name, filter_by, limit, offset, quiet, all_items):
-    """Get the blueprints, optionally filtered by a string"""
+# Attributes of blueprints shown by `calm get bps`, fetched using groups api
+BLUEPRINT_GROUP_ATTRIBUTES = [
+    "name",
+    "description",
+    "state",
+    "application_count",
+    "project_name",
+    "categories",
+    "_created_timestamp_usecs_",
+    "last_update_time",
+]
+
+
+def get_blueprint_row(entity):
+    """Returns displayed fields of blueprint in list api response"""
+
+    row = entity["status"]
+    metadata = entity["metadata"]
+    categories = metadata.get("categories", {})
+    return {
+        "name": row["name"],
+        "template_type": categories.get("TemplateType"),
+        "description": row["description"],
+        "application_count": row["application_count"],
+        "project": metadata.get("project_reference", {}).get("name"),
+        "state": row["state"],
+        "creation_time": metadata["creation_time"],
+        "last_update_time": metadata["last_update_time"],
+        "uuid": row["uuid"],
+    }
 
-    client = get_api_client()
-    config = get_config()
 
+def get_blueprint_group_row(member):
+    """Returns displayed fields of blueprint listed by groups api"""
+
+    template_type = None
+    for category in member["categories"] or []:
+        key, _, value = category.partition(":")
+        if key == "TemplateType":
+            template_type = value
+
+    # Attributes without a value are not returned by groups api
+    return {
+        "name": member["name"],
+        "template_type": template_type,
+        "description": member["description"] or "",
+        "application_count": int(member["application_count"] or 0),
+        "project": member["project_name"] or "-",
+        "state": member["state"] or "-",
+        "creation_time": member["_created_timestamp_usecs_"],
+        "last_update_time": member["last_update_time"],
+        "uuid": member["uuid"],
+    }
+
+
+def list_blueprint_rows(client, filter_query, limit, offset, all_items=False):
+    """Returns (rows, err). Rows have only the displayed fields, fetched
+    using groups api. Falls back to list api if groups api call fails"""
+
+    # list api skips deleted blueprints by default, groups api does not
+    group_filter = filter_query
+    if not all_items:
+        group_filter += ";state!=DELETED" if filter_query else "state!=DELETED"
+
+    members = list_group_members(
+        client,
+        "blueprint",
+        BLUEPRINT_GROUP_ATTRIBUTES,
+        filter_query=group_filter,
+        limit=limit,
+        offset=offset,
+        list_attributes=["categories"],
+    )
+    if members is not None:
+        return [get_blueprint_group_row(member) for member in members], None
+
+    LOG.debug("Listing blueprints using list api")
     params = {"length": limit, "offset": offset}
+    if filter_query:
+        params["filter"] = filter_query
+
+    res, err = client.blueprint.list(params=params)
+    if err:
+        return None, err
+
+    return [get_blueprint_row(entity) for entity in res.json()["entities"]], None
+
+
+def get_blueprint_list(name, filter_by, limit, offset, quiet, all_items, servers=None):
+    """Get the blueprints, optionally filtered by a string. If servers are
+    given, blueprints of all those servers are listed"""
+
     filter_query = ""
     if name:
         filter_query = get_name_query([name])
@@ -51,29 +140,34 @@ def get_blueprint_list(name, filter_by, limit, offset, quiet, all_items):
     if filter_query.startswith(";"):
         filter_query = filter_query[1:]
 
-    if filter_query:
-        params["filter"] = filter_query
+    def list_rows(client):
+        return list_blueprint_rows(client, filter_query, limit, offset, all_items)
 
-    res, err = client.blueprint.list(params=params)
+    if servers:
+        json_rows = list_on_servers(list_rows, servers, "blueprints")
+    else:
+        client = get_api_client()
+        rows, err = list_rows(client)
 
-    if err:
-        pc_ip = config["SERVER"]["pc_ip"]
-        LOG.warning("Cannot fetch blueprints from {}".format(pc_ip))
-        return
+        if err:
+            config = get_config()
+            pc_ip = config["SERVER"]["pc_ip"]
+            LOG.warning("Cannot fetch blueprints from {}".format(pc_ip))
+            return
+
+        json_rows = [(None, row) for row in rows]
 
-    json_rows = res.json()["entities"]
     if not json_rows:
         click.echo(highlight_text("No blueprint found !!!\n"))
         return
 
     if quiet:
-        for _row in json_rows:
-            row = _row["status"]
+        for _, row in json_rows:
             click.echo(highlight_text(row["name"]))
         return
 
     table = PrettyTable()
-    table.field_names = [
+    table.field_names = (["SERVER"] if servers else []) + [
         "NAME",
         "BLUEPRINT TYPE",
         "DESCRIPTION",
@@ -84,36 +178,20 @@ def get_blueprint_list(name, filter_by, limit, offset, quiet, all_items):
         "LAST UPDATED",
         "UUID",
     ]
-    for _row in json_rows:
-        row = _row["status"]
-        metadata = _row["metadata"]
-        bp_type = (
-            "Single VM"
-            if "categories" in metadata
-            and "TemplateType" in metadata["categories"]
-            and metadata["categories"]["TemplateType"] == "Vm"
-            else "Multi VM/Pod"
-        )
-
-        project = (
-            metadata["project_reference"]["name"]
-            if "project_reference" in metadata
-            else None
-        )
-
-        creation_time = int(metadata["creation_time"]) // 1000000
-        last_update_time = int(metadata["last_update_time"]) // 1000000
+    for server, row in json_rows:
+        bp_type = "Single VM" if row["template_type"] == "Vm" else "Multi VM/Pod"
 
         table.add_row(
-            [
+            ([highlight_text(server)] if servers else [])
+            + [
                 highlight_text(row["name"]),
                 highlight_text(bp_type),
                 highlight_text(row["description"]),
                 highlight_text(row["application_count"]),
-                highlight_text(project),
+                highlight_text(row["project"]),
                 highlight_text(row["state"]),
-                highlight_text(time.ctime(creation_time)),
-                "{}".format(arrow.get(last_update_time).humanize()),
+                highlight_text(get_time_text(row["creation_time"])),
+                get_time_text(row["last_update_time"], humanize=True),
                 highlight_text(row["uuid"]),
             ]
         )
@@ -126,12 +204,6 @@ def describe_bp(blueprint_name, out):
     client = get_api_client()
     bp = get_blueprint(client, blueprint_name, all=True)
 
-    res, err = client.blueprint.read(bp["metadata"]["uuid"])
-    if err:
-        raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-    bp = res.json()
-
     if out == "json":
         bp.pop("status", None)
         click.echo(json.dumps(bp, indent=4, separators=(",", ": ")))
@@ -301,27 +373,34 @@ def format_blueprint_command(bp_file):
 
 def get_blueprint(client, name, all=False):
 
-    # find bp
-    params = {"filter": "name=={}".format(name)}
-    if not all:
-        params["filter"] += ";state!=DELETED"
+    return get_blueprints(client, [name], all=all)[0]
 
-    res, err = client.blueprint.list(params=params)
-    if err:
-        raise Exception("[{}] - {}".format(err["code"], err["error"]))
 
-    response = res.json()
-    entities = response.get("entities", None)
-    blueprint = None
-    if entities:
+def get_blueprints(client, names, all=False):
+    """Returns blueprints with given names. Names are resolved through the
+    local name index, unless deleted blueprints are also searched"""
+
+    resolver = NameResolver(client)
+    found = resolver.get_entities(
+        "blueprint",
+        names,
+        filter_query="" if all else "state!=DELETED",
+        use_index=not all,
+    )
+
+    blueprints = []
+    for name in names:
+        entities = found[name]
+        if not entities:
+            raise Exception("No blueprint found with name {} found".format(name))
+
         if len(entities) != 1:
             raise Exception("More than one blueprint found - {}".format(entities))
 
         LOG.info("{} found ".format(name))
-        blueprint = entities[0]
-    else:
-        raise Exception("No blueprint found with name {} found".format(name))
-    return blueprint
+        blueprints.append(entities[0])
+
+    return blueprints
 
 
 def get_blueprint_runtime_editables(client, blueprint):
@@ -693,6 +772,8 @@ def launch_blueprint_simple(
         LOG.info("Blueprint {} queued for launch".format(blueprint_name))
     else:
         raise Exception("[{}] - {}".format(err["code"], err["error"]))
+
+    NameResolver(client).invalidate("application", [launch_payload["spec"]["app_name"]])
     response = res.json()
     launch_req_id = response["status"]["request_id"]
 
@@ -739,11 +820,14 @@ def poll_launch_status(client, blueprint_uuid, launch_req_id):
 def delete_blueprint(blueprint_names):
 
     client = get_api_client()
+    resolver = NameResolver(client)
 
-    for blueprint_name in blueprint_names:
-        blueprint = get_blueprint(client, blueprint_name)
-        blueprint_id = blueprint["metadata"]["uuid"]
-        res, err = client.blueprint.delete(blueprint_id)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-        LOG.info("Blueprint {} deleted".format(blueprint_name))
+    # Names are looked up on server, an indexed uuid may now be another entity
+    resolved = resolver.resolve(
+        "blueprint", blueprint_names, filter_query="state!=DELETED", use_index=False
+    )
+    rows = delete_entities(client.blueprint, "blueprint", blueprint_names, resolved)
+    resolver.invalidate("blueprint", blueprint_names)
+
+    if any(row["status"] == DELETION.STATUS.FAILED for row in rows):
+        sys.exit(-1)
@@ -1,3 +1,4 @@
+import click
 import datetime
 
 from calm.dsl.store import Cache
@@ -25,9 +26,16 @@ def clear_cache():
 
 
 @update.command("cache")
-def update_cache():
+@click.option(
+    "--full",
+    "-f",
+    is_flag=True,
+    default=False,
+    help="Fetch all entities, instead of the ones updated since last update",
+)
+def update_cache(full):
     """Update the data for dynamic entities stored in the cache"""
 
-    Cache.sync()
+    Cache.sync(full=full)
     Cache.show_data()
     LOG.info(highlight_text("Cache updated at {}".format(datetime.datetime.now())))
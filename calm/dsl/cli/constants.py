@@ -101,3 +101,16 @@ class MARKETPLACE_BLUEPRINT:
     class SOURCES:
         GLOBAL = "GLOBAL_STORE"
         LOCAL = "LOCAL"
+
+
+class DELETION:
+    # If asked to wait, pending deletions are polled at this interval
+    # (seconds) till timeout
+    POLL_INTERVAL = 2
+    TIMEOUT = 20
+
+    class STATUS:
+        DELETED = "DELETED"
+        IN_PROGRESS = "DELETE_IN_PROGRESS"
+        FAILED = "FAILED"
+        TIMED_OUT = "TIMED_OUT"
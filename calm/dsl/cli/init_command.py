@@ -1,6 +1,5 @@
 import click
 import os
-import json
 import sys
 
 from calm.dsl.config import (
@@ -19,7 +18,7 @@ from calm.dsl.init import init_bp
 from calm.dsl.providers import get_provider_types
 
 from .main import init, set
-from calm.dsl.tools import get_logging_handle
+from calm.dsl.tools import get_logging_handle, codec
 
 LOG = get_logging_handle(__name__)
 
@@ -181,7 +180,7 @@ def set_server_details(
         click.echo("[Fail]")
         raise Exception("[{}] - {}".format(err["code"], err["error"]))
 
-    result = json.loads(res.content)
+    result = codec.loads(res.content)
     service_enablement_status = result["service_enablement_status"]
     LOG.info(service_enablement_status)
 
@@ -202,7 +201,7 @@ def init_db():
 
 def sync_cache():
     LOG.info("Updating Cache")
-    Cache.sync()
+    Cache.sync(full=True)
 
 
 @init.command("bp")
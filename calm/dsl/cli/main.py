@@ -1,6 +1,5 @@
 from ruamel import yaml
 import click
-import json
 import copy
 
 import click_completion
@@ -10,8 +9,15 @@ from prettytable import PrettyTable
 
 # TODO - move providers to separate file
 from calm.dsl.providers import get_provider, get_provider_types
-from calm.dsl.api import get_api_client, get_resource_api
+from calm.dsl.api import (
+    get_api_client,
+    get_resource_api,
+    get_request_metrics,
+    start_request_coalescing,
+    stop_request_coalescing,
+)
 from calm.dsl.tools import (
+    codec,
     get_logging_handle,
     simple_verbosity_option,
     show_trace_option,
@@ -47,9 +53,23 @@ LOG = get_logging_handle(__name__)
     default=False,
     help="Update cache before running command",
 )
+@click.option(
+    "--http-stats",
+    "http_stats",
+    is_flag=True,
+    default=False,
+    help="Print stats of requests made to server at exit",
+)
+@click.option(
+    "--http-stats-file",
+    "http_stats_file",
+    default=None,
+    type=click.Path(file_okay=True, dir_okay=False, writable=True),
+    help="Write stats of requests made to server as json to this file at exit",
+)
 @click.version_option("0.1")
 @click.pass_context
-def main(ctx, config_file, sync):
+def main(ctx, config_file, sync, http_stats, http_stats_file):
     """Calm CLI
 
 \b
@@ -63,6 +83,17 @@ Commonly used commands:
 """
     ctx.ensure_object(dict)
     ctx.obj["verbose"] = True
+
+    # Identical reads made by the command share server calls
+    start_request_coalescing()
+    ctx.call_on_close(stop_request_coalescing)
+    ctx.call_on_close(Cache.log_memo_stats)
+
+    if http_stats or http_stats_file:
+        ctx.call_on_close(
+            lambda: show_http_stats(print_table=http_stats, file=http_stats_file)
+        )
+
     try:
         validate_version()
     except Exception:
@@ -74,6 +105,59 @@ Commonly used commands:
         Cache.sync()
 
 
+def show_http_stats(print_table=True, file=None):
+    """Prints request stats (to stderr) and/or writes them as json to file"""
+
+    stats = get_request_metrics().to_dict()
+    if file:
+        with open(file, "w") as fd:
+            fd.write(codec.dumps(stats, indent=2))
+
+    if not print_table:
+        return
+
+    table = PrettyTable()
+    table.field_names = [
+        "METHOD",
+        "ENDPOINT",
+        "COUNT",
+        "ERRORS",
+        "RETRIES",
+        "TOTAL (s)",
+        "SERVER (s)",
+        "P50 (s)",
+        "P95 (s)",
+        "MAX (s)",
+        "SENT (KB)",
+        "RECEIVED (KB)",
+    ]
+    rows = stats["requests"] + [dict(stats["summary"], method="", endpoint="TOTAL")]
+    for row in rows:
+        table.add_row(
+            [
+                row["method"],
+                row["endpoint"],
+                row["count"],
+                row["errors"],
+                row["retries"],
+                "{:.3f}".format(row["total_time"]),
+                "{:.3f}".format(row["server_time"]),
+                row["p50"],
+                row["p95"],
+                "{:.3f}".format(row["max_time"]),
+                row["bytes_out"] // 1024,
+                row["bytes_in"] // 1024,
+            ]
+        )
+    click.echo(table, err=True)
+    click.echo(
+        "Command took {:.3f}s, of which {:.3f}s in server calls".format(
+            stats["summary"]["wall_time"], stats["summary"]["total_time"]
+        ),
+        err=True,
+    )
+
+
 @main.group(cls=FeatureFlagGroup)
 def validate():
     """Validate provider specs"""
@@ -211,7 +295,7 @@ def get_server_status():
         click.echo("[Fail]")
         raise Exception("[{}] - {}".format(err["code"], err["error"]))
 
-    result = json.loads(res.content)
+    result = codec.loads(res.content)
     service_enablement_status = result["service_enablement_status"]
 
     res, err = client.version.get_calm_version()
@@ -6,7 +6,8 @@ from prettytable import PrettyTable
 
 from calm.dsl.api import get_api_client, get_resource_api
 from calm.dsl.config import get_config
-from .utils import highlight_text, get_states_filter
+from calm.dsl.store import NameResolver
+from .utils import highlight_text, get_states_filter, get_group_data_value
 from .bps import launch_blueprint_simple, get_blueprint
 from .projects import get_project
 from calm.dsl.tools import get_logging_handle
@@ -45,26 +46,6 @@ def get_app_family_list():
     return categories
 
 
-def get_group_data_value(data_list, field, value_list=False):
-    """ to find the field value in group api call
-        return whole list of values if value_list is True
-    """
-
-    for entity in data_list:
-        if entity["name"] == field:
-            entity_value = entity["values"]
-            if not entity_value:
-                return None
-
-            return (
-                entity_value[0]["values"]
-                if value_list
-                else entity_value[0]["values"][0]
-            )
-
-    return None
-
-
 def trunc_string(data=None, max_length=50):
 
     if not data:
@@ -655,15 +636,17 @@ def publish_bp_to_marketplace_manager(
     }
 
     if icon_name:
+        resolver = NameResolver(client)
         if icon_file:
             # If file is there, upload first and then use it for marketplace item
             client.app_icon.upload(icon_name, icon_file)
+            resolver.invalidate("app_icon", [icon_name])
 
-        app_icon_name_uuid_map = client.app_icon.get_name_uuid_map()
-        app_icon_uuid = app_icon_name_uuid_map.get(icon_name, None)
-        if not app_icon_uuid:
+        app_icon_uuids = resolver.resolve("app_icon", [icon_name])[icon_name]
+        if not app_icon_uuids:
             LOG.error("App icon: {} not found".format(icon_name))
             sys.exit(-1)
+        app_icon_uuid = app_icon_uuids[0]
 
         bp_template["spec"]["resources"]["icon_reference_list"] = [
             {
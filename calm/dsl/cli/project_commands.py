@@ -72,10 +72,13 @@ def _create_project(project_file, project_name):
 
 @delete.command("project")
 @click.argument("project_names", nargs=-1)
-def _delete_project(project_names):
+@click.option(
+    "--wait", "-w", is_flag=True, default=False, help="Wait till projects are deleted"
+)
+def _delete_project(project_names, wait):
     """Deletes a project"""
 
-    delete_project(project_names)
+    delete_project(project_names, wait=wait)
 
 
 @describe.command("project")
@@ -1,3 +1,4 @@
+import sys
 import time
 import click
 import arrow
@@ -6,8 +7,10 @@ from prettytable import PrettyTable
 from calm.dsl.builtins import ProjectValidator
 from calm.dsl.api import get_api_client
 from calm.dsl.config import get_config
+from calm.dsl.store import NameResolver
 
-from .utils import get_name_query, highlight_text
+from .utils import get_name_query, highlight_text, delete_entities
+from .constants import DELETION
 from calm.dsl.tools import get_logging_handle
 from calm.dsl.providers import get_provider
 
@@ -88,46 +91,64 @@ def get_projects(name, filter_by, limit, offset, quiet):
 
 def get_project(client, name):
 
-    params = {"filter": "name=={}".format(name)}
+    return get_projects_by_name(client, [name])[0]
 
-    LOG.info("Searcing for the project {}".format(name))
-    res, err = client.project.list(params=params)
-    if err:
-        raise Exception("[{}] - {}".format(err["code"], err["error"]))
 
-    response = res.json()
-    entities = response.get("entities", None)
-    project = None
-    if entities:
+def get_projects_by_name(client, names):
+    """Returns projects with given names. Names are resolved through the
+    local name index"""
+
+    LOG.info("Searching for the projects {}".format(", ".join(names)))
+    found = NameResolver(client).get_entities("project", names)
+
+    projects = []
+    for name in names:
+        entities = found[name]
+        if not entities:
+            raise Exception("No project found with name {} found".format(name))
+
         if len(entities) != 1:
             raise Exception("More than one project found - {}".format(entities))
 
         LOG.info("Project {} found ".format(name))
-        project = entities[0]
-    else:
-        raise Exception("No project found with name {} found".format(name))
+        projects.append(entities[0])
 
-    project_id = project["metadata"]["uuid"]
-    LOG.info("Fetching details of project {}".format(name))
-    res, err = client.project.read(project_id)  # for getting additional fields
-    if err:
-        raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    return projects
+
+
+def get_project_deletion_state(project):
+    """Returns deletion status of project, read while it is being deleted"""
 
-    project = res.json()
-    return project
+    project_state = project["status"]["state"]
+    if project_state == "COMPLETE":
+        return DELETION.STATUS.DELETED, ""
 
+    elif project_state in ["DELETE_IN_PROGRESS", "DELETE_PENDING"]:
+        return DELETION.STATUS.IN_PROGRESS, ""
 
-def delete_project(project_names):
+    return DELETION.STATUS.FAILED, str(project["status"].get("message_list", ""))
+
+
+def delete_project(project_names, wait=False):
 
     client = get_api_client()
+    resolver = NameResolver(client)
+
+    # Names are looked up on server, an indexed uuid may now be another entity
+    resolved = resolver.resolve("project", project_names, use_index=False)
+    rows = delete_entities(
+        client.project,
+        "project",
+        project_names,
+        resolved,
+        get_deletion_state=get_project_deletion_state,
+        wait=wait,
+    )
+    resolver.invalidate("project", project_names)
 
-    for project_name in project_names:
-        project = get_project(client, project_name)
-        project_id = project["metadata"]["uuid"]
-        res, err = client.project.delete(project_id)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-        LOG.info("Project {} deleted".format(project_name))
+    failed_statuses = [DELETION.STATUS.FAILED, DELETION.STATUS.TIMED_OUT]
+    if any(row["status"] in failed_statuses for row in rows):
+        sys.exit(-1)
 
 
 def create_project(payload):
@@ -160,7 +181,9 @@ def create_project(payload):
         "spec": payload,
     }
 
-    return client.project.create(payload)
+    res, err = client.project.create(payload)
+    NameResolver(client).invalidate("project", [name])
+    return res, err
 
 
 def describe_project(project_name):
@@ -1,13 +1,18 @@
+import arrow
 import click
 import sys
+import time
 import importlib.util
-from functools import reduce
+from functools import reduce, wraps
 from asciimatics.screen import Screen
 from click_didyoumean import DYMMixin
+from prettytable import PrettyTable
 from distutils.version import LooseVersion as LV
 
 from calm.dsl.tools import get_logging_handle
 from calm.dsl.store import Version
+from calm.dsl.api import get_server_names, map_servers
+from .constants import DELETION
 
 LOG = get_logging_handle(__name__)
 
@@ -36,6 +41,250 @@ def get_name_query(names):
     return ""
 
 
+def servers_option(func):
+    """Adds --servers and --all-servers options to a command. Command gets
+    list of server names as `servers`, None if neither option is given"""
+
+    @click.option(
+        "--servers",
+        "servers",
+        default=None,
+        help="Comma separated names of servers to query ([SERVER:<name>] config sections, 'default' for [SERVER])",
+    )
+    @click.option(
+        "--all-servers",
+        "all_servers",
+        is_flag=True,
+        default=False,
+        help="Query all servers in config",
+    )
+    @wraps(func)
+    def wrapper(*args, servers=None, all_servers=False, **kwargs):
+
+        server_names = None
+        if all_servers:
+            server_names = get_server_names()
+        elif servers:
+            known_servers = get_server_names()
+            server_names = [name.strip() for name in servers.split(",")]
+            for name in server_names:
+                if name not in known_servers:
+                    raise click.BadParameter(
+                        "Server '{}' not found in config. Known servers: {}".format(
+                            name, ", ".join(known_servers)
+                        ),
+                        param_hint="--servers",
+                    )
+
+        return func(*args, servers=server_names, **kwargs)
+
+    return wrapper
+
+
+def list_on_servers(list_func, servers, entity_type):
+    """Calls list_func(client) on given servers concurrently. list_func
+    returns (entities, err).
+
+    Returns:
+        (list): (server, entity) for entities listed by all servers. Servers
+                that could not be queried are skipped with a warning
+    """
+
+    rows = []
+    for server, result, error in map_servers(list_func, servers):
+        entities, err = result or (None, error)
+        if err:
+            LOG.warning("Cannot fetch {} from server {}".format(entity_type, server))
+            continue
+        rows.extend((server, entity) for entity in entities)
+    return rows
+
+
+def get_group_data_value(data_list, field, value_list=False):
+    """ to find the field value in group api call
+        return whole list of values if value_list is True
+    """
+
+    for entity in data_list:
+        if entity["name"] == field:
+            entity_value = entity["values"]
+            if not entity_value:
+                return None
+
+            return (
+                entity_value[0]["values"]
+                if value_list
+                else entity_value[0]["values"][0]
+            )
+
+    return None
+
+
+def list_group_members(
+    client,
+    entity_type,
+    attributes,
+    filter_query="",
+    limit=20,
+    offset=0,
+    sort_attribute="_created_timestamp_usecs_",
+    sort_order="DESCENDING",
+    list_attributes=[],
+):
+    """Lists only the given attributes of entities using groups api, sorted
+    and paged on server. Values of list_attributes are lists, others are the
+    first value.
+
+    Returns:
+        (list): dicts of uuid and the attributes of each entity, None if
+                groups api call failed (callers fall back to list api)
+    """
+
+    params = {
+        "group_member_count": limit,
+        "group_member_offset": offset,
+        "group_member_sort_attribute": sort_attribute,
+        "group_member_sort_order": sort_order,
+    }
+    if filter_query:
+        params["filter_criteria"] = filter_query
+
+    res, err = client.groups.list_members(entity_type, attributes, params=params)
+    if err:
+        LOG.debug("Groups call for {} failed: {}".format(entity_type, err))
+        return None
+
+    members = []
+    for group in res.json().get("group_results", []):
+        for entity in group.get("entity_results", []):
+            member = {"uuid": entity["entity_id"]}
+            for attribute in attributes:
+                member[attribute] = get_group_data_value(
+                    entity["data"], attribute, value_list=attribute in list_attributes
+                )
+            members.append(member)
+
+    return members
+
+
+def delete_entities(
+    api,
+    entity_type,
+    names,
+    resolved,
+    delete_func=None,
+    get_deletion_state=None,
+    get_message=None,
+    wait=False,
+    poll_interval=DELETION.POLL_INTERVAL,
+    timeout=DELETION.TIMEOUT,
+):
+    """Deletes entities of the names in bulk, polls the pending deletions
+    together (if wait is True) and prints a summary. Failures do not stop
+    other deletions.
+
+    Args:
+        api (ResourceAPI): api of the entities
+        entity_type (str): used in messages, ex: "blueprint"
+        names (list): names of entities to delete
+        resolved (dict): name to list of uuids, see `NameResolver.resolve`
+        delete_func (callable): deletes list of uuids, returning
+                                (payload, err) of each. Default: api.delete_many
+        get_deletion_state (callable): returns (DELETION.STATUS, message) of
+                                       entity read during its deletion. If not
+                                       given, deletions are done once the
+                                       delete call succeeds
+        get_message (callable): returns message for a delete response
+        wait (bool): if True, pending deletions are polled till timeout.
+                     Deletions still pending then are TIMED_OUT
+    Returns:
+        (list): rows (dict of name, uuid, status, message) of each name
+    """
+
+    rows = {}
+    uuid_names = {}
+    for name in names:
+        uuids = resolved.get(name) or []
+        row = {"name": name, "uuid": "-", "status": DELETION.STATUS.FAILED}
+        if not uuids:
+            row["message"] = "No {} found with name {}".format(entity_type, name)
+        elif len(uuids) != 1:
+            row["message"] = "More than one {} found - {}".format(entity_type, uuids)
+        else:
+            row["uuid"] = uuids[0]
+            uuid_names[uuids[0]] = name
+        rows[name] = row
+
+    delete_func = delete_func or api.delete_many
+    LOG.info("Deleting {} {}(s)".format(len(uuid_names), entity_type))
+    pending = {}
+    for uuid, (payload, err) in zip(uuid_names, delete_func(list(uuid_names))):
+        row = rows[uuid_names[uuid]]
+        if err:
+            row["message"] = "[{}] - {}".format(err["code"], err["error"])
+            continue
+
+        row["message"] = get_message(payload) if get_message else ""
+        if get_deletion_state:
+            row["status"] = DELETION.STATUS.IN_PROGRESS
+            pending[uuid] = row
+        else:
+            row["status"] = DELETION.STATUS.DELETED
+
+    # One poller for all pending deletions
+    deadline = time.time() + timeout
+    while wait and pending and time.time() < deadline:
+        LOG.info("Waiting for {} {} deletion(s)".format(len(pending), entity_type))
+        time.sleep(poll_interval)
+
+        uuids = list(pending)
+        for uuid, (entity, err) in zip(uuids, api.read_many(uuids)):
+            if err and err["code"] == 404:
+                status, message = DELETION.STATUS.DELETED, ""
+            elif err:
+                LOG.debug("Could not read {} {}: {}".format(entity_type, uuid, err))
+                continue
+            else:
+                status, message = get_deletion_state(entity)
+
+            if status != DELETION.STATUS.IN_PROGRESS:
+                row = pending.pop(uuid)
+                row["status"] = status
+                row["message"] = message or row["message"]
+
+    if wait:
+        for row in pending.values():
+            row["status"] = DELETION.STATUS.TIMED_OUT
+            row["message"] = "Not deleted in {} seconds".format(timeout)
+
+    table = PrettyTable()
+    table.field_names = ["NAME", "UUID", "STATUS", "MESSAGE"]
+    for row in rows.values():
+        table.add_row(
+            [
+                highlight_text(row["name"]),
+                highlight_text(row["uuid"]),
+                highlight_text(row["status"]),
+                row["message"],
+            ]
+        )
+    click.echo(table)
+
+    return list(rows.values())
+
+
+def get_time_text(usecs, humanize=False):
+    """Returns display text of a timestamp in usecs, "-" if it is not known"""
+
+    if usecs is None or usecs == "":
+        return "-"
+
+    seconds = int(usecs) // 1000000
+    if humanize:
+        return arrow.get(seconds).humanize()
+    return time.ctime(seconds)
+
+
 def highlight_text(text, **kwargs):
     """Highlight text in our standard format"""
     return click.style("{}".format(text), fg="blue", bold=False, **kwargs)
@@ -83,6 +332,31 @@ class Display:
 display = Display()
 
 
+class DownloadProgress:
+    """Progress bar for `Connection.stream` downloads, use as its progress
+    callback within a `with` block"""
+
+    def __init__(self, label):
+        self.label = label
+        self.bar = None
+
+    def __call__(self, done, total):
+        if not total:
+            return
+
+        if self.bar is None:
+            self.bar = click.progressbar(length=total, label=self.label)
+            self.bar.render_progress()
+        self.bar.update(done - self.bar.pos)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.bar is not None:
+            self.bar.render_finish()
+
+
 class FeatureFlagMixin:
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
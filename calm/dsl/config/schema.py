@@ -1,16 +1,57 @@
-from schema import Schema, And, Use, SchemaError
+from schema import Schema, And, Use, Optional, Regex, SchemaError
 
 
+# Settings of [CONNECTION] section, can be overridden for a named server
+connection_schema_dict = {
+    Optional("retries_enabled"): And(Use(str)),
+    Optional("retry_total"): And(Use(int)),
+    Optional("retry_backoff_factor"): And(Use(float)),
+    Optional("retry_backoff_max"): And(Use(float)),
+    Optional("retry_status_forcelist"): And(Use(str)),
+    Optional("retry_methods"): And(Use(str)),
+    Optional("retry_jitter"): And(Use(str)),
+    Optional("session_cache"): And(Use(str)),
+    Optional("session_ttl"): And(Use(int)),
+    Optional("response_cache"): And(Use(str)),
+    Optional("response_cache_size"): And(Use(int)),
+    Optional("coalesce_window"): And(Use(float)),
+    Optional("compress_requests"): And(Use(str)),
+    Optional("compress_min_size"): And(Use(int)),
+    Optional("slow_request_threshold"): And(Use(float)),
+    Optional("rate_limit"): And(Use(float)),
+    Optional("rate_burst"): And(Use(int)),
+    Optional("max_in_flight"): And(Use(int)),
+    Optional("adaptive_throttle"): And(Use(str)),
+    Optional("throttle_latency"): And(Use(float)),
+}
+
+server_schema_dict = {
+    "pc_ip": And(Use(str)),
+    "pc_port": And(Use(str)),
+    "pc_username": And(Use(str)),
+    "pc_password": And(Use(str)),
+}
+
 config_schema_dict = {
-    "SERVER": {
-        "pc_ip": And(Use(str)),
-        "pc_port": And(Use(str)),
-        "pc_username": And(Use(str)),
-        "pc_password": And(Use(str)),
-    },
+    "SERVER": server_schema_dict,
     "PROJECT": {"name": And(Use(str))},
     "LOG": {"level": And(Use(str))},
     "CATEGORIES": {},
+    Optional("CONNECTION"): connection_schema_dict,
+    Optional("NAME_INDEX"): {
+        Optional("ttl"): And(Use(int)),
+        Optional("negative_ttl"): And(Use(int)),
+    },
+    Optional("CACHE"): {
+        Optional("read_through"): And(Use(str)),
+        Optional("negative_ttl"): And(Use(int)),
+        Optional(Regex(r"^\w+_ttl$")): And(Use(int)),
+    },
+    # Named servers
+    Optional(Regex(r"^SERVER:[\w.-]+$")): {
+        **server_schema_dict,
+        **connection_schema_dict,
+    },
 }
 
 
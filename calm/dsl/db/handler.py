@@ -2,17 +2,63 @@ import atexit
 
 from calm.dsl.config import get_init_data
 from .table_config import dsl_database, SecretTable, DataTable, VersionTable
+from .table_config import SessionTable, NameIndexTable, CacheSyncTable
+from .table_config import CacheMissTable
 from .table_config import CacheTableBase
 from calm.dsl.tools import get_logging_handle
 
 LOG = get_logging_handle(__name__)
 
+# Pragmas of connections to local db. In WAL mode readers do not block the
+# writer (or the other way round), so parallel calm processes can share the
+# db, and transactions are safe to commit without fsync (synchronous=normal)
+DB_PRAGMAS = [
+    ("journal_mode", "wal"),
+    ("synchronous", "normal"),
+    ("cache_size", -8 * 1024),  # KiB
+    ("mmap_size", 64 * 1024 * 1024),
+]
+
+# Seconds to wait for a lock held by another connection, before failing with
+# "database is locked"
+DB_BUSY_TIMEOUT = 30
+
+
+# Version of db schema, stored as user_version of the db file. Bump it when
+# tables or indexes change, adding a migration for the new version.
+SCHEMA_VERSION = 2
+
+
+def create_cache_miss_table(db):
+    db.create_tables([CacheMissTable])
+
+
+# Migrations of db schema, by the version they migrate to. They are run for
+# dbs stamped with an older version, in order.
+MIGRATIONS = {2: create_cache_miss_table}
+
 
 class Database:
-    """DSL database connection"""
+    """DSL database connection.
+
+    Tables and indexes are created once, when the db is not stamped with
+    current SCHEMA_VERSION, so opening an up to date db makes no schema
+    queries. Tables are the models of table_config, available as attributes
+    of the handle.
+    """
 
     db = None
-    registered_tables = []
+    # Connection is shared by the handles, so it is closed at exit only once
+    close_registered = False
+    registered_tables = [
+        SecretTable,
+        DataTable,
+        VersionTable,
+        SessionTable,
+        NameIndexTable,
+        CacheSyncTable,
+        CacheMissTable,
+    ]
 
     @classmethod
     def update_db(cls, db_instance):
@@ -22,7 +68,7 @@ class Database:
     def instantiate_db():
         init_obj = get_init_data()
         db_location = init_obj["DB"].get("location")
-        dsl_database.init(db_location)
+        dsl_database.init(db_location, pragmas=DB_PRAGMAS, timeout=DB_BUSY_TIMEOUT)
         return dsl_database
 
     def __init__(self):
@@ -30,35 +76,65 @@ class Database:
             self.update_db(self.instantiate_db())
 
         self.connect()
-        self.secret_table = self.set_and_verify(SecretTable)
-        self.data_table = self.set_and_verify(DataTable)
-        self.version_table = self.set_and_verify(VersionTable)
+        if self.get_schema_version() < SCHEMA_VERSION:
+            self.migrate()
+
+        self.secret_table = SecretTable
+        self.data_table = DataTable
+        self.version_table = VersionTable
+        self.session_table = SessionTable
+        self.name_index_table = NameIndexTable
+        self.cache_sync_table = CacheSyncTable
+        self.cache_miss_table = CacheMissTable
 
         for table_type, table in CacheTableBase.tables.items():
-            setattr(self, table_type, self.set_and_verify(table))
+            setattr(self, table_type, table)
+
+    @classmethod
+    def get_tables(cls):
+        """Returns all tables of db"""
 
-    def set_and_verify(self, table_cls):
-        """ Verify whether this class exists in db
-            If not, then creates one
-        """
+        return cls.registered_tables + list(CacheTableBase.tables.values())
 
-        if not self.db.table_exists((table_cls.__name__).lower()):
-            self.db.create_tables([table_cls])
+    def get_schema_version(self):
+        return self.db.pragma("user_version")
 
-        # Register table to class
-        if table_cls not in self.registered_tables:
-            self.registered_tables.append(table_cls)
+    def migrate(self):
+        """Brings db schema to SCHEMA_VERSION. A db without version stamp (new,
+        or created before stamping) gets the missing tables and indexes"""
 
-        return table_cls
+        # Other calm processes wait till migration is done
+        with self.db.atomic("IMMEDIATE"):
+            version = self.get_schema_version()
+            if version >= SCHEMA_VERSION:
+                return
+
+            LOG.debug(
+                "Migrating local DB schema from version {} to {}".format(
+                    version, SCHEMA_VERSION
+                )
+            )
+            if not version:
+                self.db.create_tables(self.get_tables(), safe=True)
+            else:
+                for next_version in range(version + 1, SCHEMA_VERSION + 1):
+                    MIGRATIONS[next_version](self.db)
+
+            self.db.pragma("user_version", SCHEMA_VERSION)
 
     def connect(self):
 
         LOG.debug("Connecting to local DB")
-        self.db.connect()
-        atexit.register(self.close)
+        self.db.connect(reuse_if_open=True)
+        if not Database.close_registered:
+            atexit.register(self.close)
+            Database.close_registered = True
 
     def close(self):
 
+        if self.db is None:
+            return
+
         LOG.debug("Closing connection to local DB")
         self.db.close()
 
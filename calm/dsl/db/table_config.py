@@ -4,11 +4,13 @@ from peewee import (
     CharField,
     BlobField,
     DateTimeField,
+    BigIntegerField,
     ForeignKeyField,
     CompositeKey,
     DoesNotExist,
 )
 import datetime
+import threading
 import click
 import arrow
 import sys
@@ -20,10 +22,23 @@ from calm.dsl.tools import get_logging_handle
 from calm.dsl.providers import get_provider
 
 LOG = get_logging_handle(__name__)
+
+# Page sizes of list calls made to sync all and updated entities of cache tables
+SYNC_PAGE_SIZE = 250
+INCREMENTAL_SYNC_PAGE_SIZE = 25
+
 # Proxy database
 dsl_database = SqliteDatabase(None)
 
 
+def write_transaction():
+    """Returns transaction for writes to db. It takes the write lock at begin,
+    so that other writers make it wait for busy timeout, instead of failing
+    when a read in the transaction is followed by a write"""
+
+    return dsl_database.atomic("IMMEDIATE")
+
+
 class BaseModel(Model):
     class Meta:
         database = dsl_database
@@ -56,9 +71,313 @@ class DataTable(BaseModel):
         return (self.kdf_salt, self.ciphertext, self.iv, self.auth_tag)
 
 
+class SessionTable(BaseModel):
+    name = CharField(primary_key=True)
+    kdf_salt = BlobField()
+    ciphertext = BlobField()
+    iv = BlobField()
+    auth_tag = BlobField()
+    expiry = DateTimeField()
+    last_update_time = DateTimeField(default=datetime.datetime.now)
+
+    def generate_enc_msg(self):
+        return (self.kdf_salt, self.ciphertext, self.iv, self.auth_tag)
+
+
+class NameIndexTable(BaseModel):
+    server = CharField()
+    kind = CharField()
+    name = CharField()
+    uuids = CharField()  # json list of uuids, empty if no entity has the name
+    last_update_time = DateTimeField(default=datetime.datetime.now)
+
+    class Meta:
+        primary_key = CompositeKey("server", "kind", "name")
+
+
+class CacheSyncTable(BaseModel):
+    """Stores till when the entities of a cache table are synced"""
+
+    cache_type = CharField(primary_key=True)
+    scope = CharField()  # server and project the data belongs to
+    high_water_mark = BigIntegerField()  # latest last_update_time (usecs) seen
+    last_update_time = DateTimeField(default=datetime.datetime.now)
+
+    @classmethod
+    def get_high_water_mark(cls, cache_type, scope):
+        """Returns high water mark of cache type, None if table was not synced
+        for the scope"""
+
+        entry = cls.get_or_none(cls.cache_type == cache_type)
+        if not entry or entry.scope != scope:
+            return None
+        return entry.high_water_mark
+
+    @classmethod
+    def get_sync_time(cls, cache_type, scope):
+        """Returns when cache type was last synced for the scope, None if it
+        was not synced"""
+
+        entry = cls.get_or_none(cls.cache_type == cache_type)
+        if not entry or entry.scope != scope:
+            return None
+        return entry.last_update_time
+
+    @classmethod
+    def set_high_water_mark(cls, cache_type, scope, high_water_mark):
+        cls.replace(
+            cache_type=cache_type,
+            scope=scope,
+            high_water_mark=high_water_mark,
+            last_update_time=datetime.datetime.now(),
+        ).execute()
+
+    @classmethod
+    def clear(cls):
+        cls.delete().execute()
+
+
+class CacheMissTable(BaseModel):
+    """Stores names of cache entities not found on server, when looked up"""
+
+    cache_type = CharField()
+    name = CharField()
+    scope = CharField()  # server and project the name was looked up on
+    last_update_time = DateTimeField(default=datetime.datetime.now)
+
+    @classmethod
+    def is_missing(cls, cache_type, name, scope, ttl):
+        """Returns True if name was not found on server in last ttl seconds"""
+
+        entry = cls.get_or_none((cls.cache_type == cache_type) & (cls.name == name))
+        if not entry or entry.scope != scope:
+            return False
+        return datetime.datetime.now() - entry.last_update_time < datetime.timedelta(
+            seconds=ttl
+        )
+
+    @classmethod
+    def add(cls, cache_type, name, scope):
+        cls.replace(
+            cache_type=cache_type,
+            name=name,
+            scope=scope,
+            last_update_time=datetime.datetime.now(),
+        ).execute()
+
+    @classmethod
+    def remove(cls, cache_type, name):
+        cls.delete().where(
+            (cls.cache_type == cache_type) & (cls.name == name)
+        ).execute()
+
+    @classmethod
+    def clear(cls):
+        cls.delete().execute()
+
+    class Meta:
+        primary_key = CompositeKey("cache_type", "name")
+
+
+def get_update_time(entity):
+    """Returns last_update_time of entity in usecs. Calm entities have it in
+    usecs, others as a datetime string"""
+
+    value = entity["metadata"].get("last_update_time")
+    if not value:
+        return None
+
+    try:
+        return int(value)
+    except ValueError:
+        return int(arrow.get(value).float_timestamp * 1000000)
+
+
+def iter_updated_entities(list_page, since=None):
+    """Yields entities updated at or after `since` (usecs), all if since is None.
+
+    list_page(params) returns response of list call for the params. Pages are
+    requested newest first, and paging stops at a page ending with an entity
+    older than `since`. That is done only if the response metadata tells that
+    server sorted the entities so, otherwise all the pages are read.
+    """
+
+    # Usually few entities change between syncs, so smaller pages are asked
+    page_size = SYNC_PAGE_SIZE if since is None else INCREMENTAL_SYNC_PAGE_SIZE
+    params = {
+        "length": page_size,
+        "offset": 0,
+        "sort_attribute": "last_update_time",
+        "sort_order": "DESCENDING",
+    }
+    while True:
+        response = list_page(dict(params))
+        entities = response.get("entities") or []
+
+        update_times = []
+        for entity in entities:
+            update_time = get_update_time(entity)
+            if since is None or update_time is None or update_time >= since:
+                yield entity
+            if update_time is not None:
+                update_times.append(update_time)
+
+        metadata = response["metadata"]
+        params["offset"] += len(entities)
+        if not entities or params["offset"] >= metadata.get("total_matches", 0):
+            return
+
+        # Servers ignoring sort params (ex: newest created first) may return
+        # pages which only look sorted
+        is_sorted = (
+            metadata.get("sort_attribute") == params["sort_attribute"]
+            and metadata.get("sort_order") == params["sort_order"]
+        )
+        if since is not None and is_sorted and update_times:
+            if update_times[-1] < since:
+                return
+
+
+def get_list_page_func(api):
+    """Returns list_page function, for `iter_updated_entities`, of resource api"""
+
+    def list_page(params):
+        res, err = api.list(params)
+        if err:
+            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+        return res.json()
+
+    return list_page
+
+
+def fetch_v3_entities(client, resource_type, entity_type, since=None):
+    """Returns (entities, uuids), as `fetch_entities` of cache tables does, for
+    a v3 resource. uuids are listed using groups api, all the entities are
+    fetched if that fails"""
+
+    uuids = None
+    if since is not None:
+        uuids, err = client.groups.list_uuids(entity_type)
+        if err:
+            LOG.debug("Listing {} uuids failed, syncing all".format(entity_type))
+            since = None
+
+    Obj = get_resource_api(resource_type, client.connection)
+    entities = iter_updated_entities(get_list_page_func(Obj), since)
+    return list(entities), uuids
+
+
+def fetch_v3_entities_by_name(client, resource_type, name):
+    """Returns entities of a v3 resource having the name"""
+
+    Obj = get_resource_api(resource_type, client.connection)
+    response = get_list_page_func(Obj)(
+        {"length": SYNC_PAGE_SIZE, "filter": "name=={}".format(name)}
+    )
+
+    # name filter is a regex, keep exact matches only
+    return [
+        entity
+        for entity in response.get("entities") or []
+        if entity["status"]["name"] == name
+    ]
+
+
+def get_sync_scope(client=None):
+    """Returns server and project, cache data is synced for. Server is the one
+    in config, if client is not given"""
+
+    config = get_config()
+    if client:
+        host, port = client.connection.host, client.connection.port
+    else:
+        host, port = config["SERVER"]["pc_ip"], config["SERVER"]["pc_port"]
+
+    return "{}:{}/{}".format(host, port, config["PROJECT"]["name"])
+
+
+def get_project_details(client):
+    """Returns project in config and the uuid of its nutanix_pc account"""
+
+    config = get_config()
+    project_name = config["PROJECT"]["name"]
+    params = {"length": 1000, "filter": "name=={}".format(project_name)}
+    project_name_uuid_map = client.project.get_name_uuid_map(params)
+
+    if not project_name_uuid_map:
+        LOG.error("Invalid project {} in config".format(project_name))
+        sys.exit(-1)
+
+    project_id = project_name_uuid_map[project_name]
+    res, err = client.project.read(project_id)
+    if err:
+        raise Exception("[{}] - {}".format(err["code"], err["error"]))
+
+    project = res.json()
+    accounts = project["status"]["project_status"]["resources"][
+        "account_reference_list"
+    ]
+
+    reg_accounts = []
+    for account in accounts:
+        reg_accounts.append(account["uuid"])
+
+    # As account_uuid is required for versions>2.9.0
+    account_uuid = ""
+    for entity in client.account.iter_entities(filter_query="type==nutanix_pc"):
+        entity_id = entity["metadata"]["uuid"]
+        if entity_id in reg_accounts:
+            account_uuid = entity_id
+            break
+
+    return project, account_uuid
+
+
+def get_project_subnet_uuids(project):
+    """Returns uuids of subnets, including external ones, of project"""
+
+    project_resources = project["status"]["project_status"]["resources"]
+    subnets_list = []
+    for subnet in project_resources["subnet_reference_list"]:
+        subnets_list.append(subnet["uuid"])
+
+    # Extending external subnet's list from remote account
+    for subnet in project_resources["external_network_list"]:
+        subnets_list.append(subnet["uuid"])
+
+    return subnets_list
+
+
+class CacheSyncContext:
+    """Data shared by cache tables synced together. Prerequisites, like the
+    project in config and its account, are looked up once, by whichever
+    table needs them first"""
+
+    def __init__(self, client=None):
+        self.client = client or get_api_client()
+        self.scope = get_sync_scope(self.client)
+        self._lock = threading.Lock()
+        self._project_details = None
+
+    def get_project_details(self):
+        """Returns project in config and the uuid of its nutanix_pc account"""
+
+        with self._lock:
+            if self._project_details is None:
+                self._project_details = get_project_details(self.client)
+        return self._project_details
+
+
 class CacheTableBase(BaseModel):
     tables = {}
 
+    # Rows written per statement, within SQLite's limit of variables
+    WRITE_CHUNK_SIZE = 100
+
+    # Seconds after which Cache.get_entity_data looks up an entry on server
+    # again. Can be set per cache type in [CACHE] config section
+    TTL = 3600
+
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
 
@@ -75,14 +394,53 @@ class CacheTableBase(BaseModel):
     @classmethod
     def clear(cls, *args, **kwargs):
         """removes entire data from table"""
-        raise NotImplementedError("clear helper not implemented")
+        cls.delete().execute()
 
     def get_detail_dict(self, *args, **kwargs):
         raise NotImplementedError("get_detail_dict helper not implemented")
 
+    @classmethod
+    def get_entry_fields(cls, name, uuid, **kwargs):
+        """returns column values of entry stored by create_entry"""
+        return {"name": name, "uuid": uuid}
+
     @classmethod
     def create_entry(cls, name, uuid, **kwargs):
-        raise NotImplementedError("create_entry helper not implemented")
+        cls.insert_entries([dict(name=name, uuid=uuid, **kwargs)])
+
+    @classmethod
+    def insert_entries(cls, entries):
+        """stores entries (create_entry arguments) in chunks, in one transaction.
+        Existing rows with same keys are replaced"""
+
+        now = datetime.datetime.now()
+        rows = [
+            dict(cls.get_entry_fields(**entry), last_update_time=now)
+            for entry in entries
+        ]
+        with write_transaction():
+            for index in range(0, len(rows), cls.WRITE_CHUNK_SIZE):
+                end = index + cls.WRITE_CHUNK_SIZE
+                cls.replace_many(rows[index:end]).execute()
+
+    @classmethod
+    def delete_entries(cls, uuids):
+        """removes entries of the uuids, in one transaction"""
+
+        uuids = list(uuids)
+        with write_transaction():
+            for index in range(0, len(uuids), cls.WRITE_CHUNK_SIZE):
+                end = index + cls.WRITE_CHUNK_SIZE
+                cls.delete().where(cls.uuid.in_(uuids[index:end])).execute()
+
+    @classmethod
+    def replace_entries(cls, entries):
+        """replaces entire data of table by entries. Done in one transaction,
+        so readers see either the old or the new data, never a partial table"""
+
+        with write_transaction():
+            cls.clear()
+            cls.insert_entries(entries)
 
     @classmethod
     def get_entity_data(cls, name, **kwargs):
@@ -93,14 +451,94 @@ class CacheTableBase(BaseModel):
         raise NotImplementedError("show_data helper not implemented")
 
     @classmethod
-    def sync(cls, *args, **kwargs):
-        raise NotImplementedError("sync helper not implemented")
+    def fetch_entities(cls, context, since=None):
+        """returns (entities, uuids). entities are the ones updated at or after
+        `since` (usecs), all if since is None. uuids are of all entities present
+        on server, None if entities has all of them"""
+        raise NotImplementedError("fetch_entities helper not implemented")
+
+    @classmethod
+    def get_entry_data(cls, entity):
+        """returns arguments of create_entry for entity"""
+        raise NotImplementedError("get_entry_data helper not implemented")
+
+    @classmethod
+    def fetch_entities_by_name(cls, context, name):
+        """returns entities of the name present on server"""
+        raise NotImplementedError("fetch_entities_by_name helper not implemented")
+
+    @classmethod
+    def store_entities_by_name(cls, name, entities):
+        """replaces entries of the name by entities, fetched by
+        fetch_entities_by_name"""
+
+        with write_transaction():
+            cls.delete().where(cls.name == name).execute()
+            cls.insert_entries([cls.get_entry_data(entity) for entity in entities])
+
+    @classmethod
+    def fetch_updates(cls, context, full=False):
+        """returns updates of table data since last sync, all the data if full
+        is True. Only reads the db, so can run alongside sync of other tables"""
+
+        since = None
+        if not full:
+            since = CacheSyncTable.get_high_water_mark(
+                cls.__cache_type__, context.scope
+            )
+
+        entities, uuids = cls.fetch_entities(context, since=since)
+        return since, entities, uuids
+
+    @classmethod
+    def store_updates(cls, context, updates):
+        """stores updates returned by fetch_updates in table"""
+
+        since, entities, uuids = updates
+        rows = [cls.get_entry_data(entity) for entity in entities]
+
+        update_times = [get_update_time(entity) for entity in entities]
+        high_water_mark = max(
+            [update_time for update_time in update_times if update_time] + [since or 0]
+        )
+
+        with write_transaction():
+            if uuids is None:
+                cls.replace_entries(rows)
+            else:
+                # Changed entries are replaced, deleted ones are dropped
+                stale_uuids = {row["uuid"] for row in rows}
+                for entity in cls.select(cls.uuid):
+                    if entity.uuid not in uuids:
+                        stale_uuids.add(entity.uuid)
+                cls.delete_entries(stale_uuids)
+                cls.insert_entries(rows)
+
+            CacheSyncTable.set_high_water_mark(
+                cls.__cache_type__, context.scope, high_water_mark
+            )
+
+        LOG.debug(
+            "Synced {} {} entities ({})".format(
+                len(rows),
+                cls.__cache_type__,
+                "full" if uuids is None else "incremental",
+            )
+        )
+
+    @classmethod
+    def sync(cls, full=False, context=None, *args, **kwargs):
+        """sync the table data from server. Only the entities updated since
+        last sync are fetched, unless full is True"""
+
+        context = context or CacheSyncContext()
+        cls.store_updates(context, cls.fetch_updates(context, full=full))
 
 
 class AhvSubnetsCache(CacheTableBase):
     __cache_type__ = "ahv_subnet"
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     cluster = CharField()
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
@@ -113,21 +551,12 @@ class AhvSubnetsCache(CacheTableBase):
         }
 
     @classmethod
-    def clear(cls, *args, **kwargs):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
-    @classmethod
-    def create_entry(cls, name, uuid, **kwargs):
+    def get_entry_fields(cls, name, uuid, **kwargs):
         cluster_name = kwargs.get("cluster", None)
         if not cluster_name:
             raise ValueError("cluster not supplied for subnet {}".format(name))
 
-        # store data in table
-        super().create(
-            name=name, uuid=uuid, cluster=cluster_name,
-        )
+        return {"name": name, "uuid": uuid, "cluster": cluster_name}
 
     @classmethod
     def get_entity_data(cls, name, **kwargs):
@@ -170,86 +599,75 @@ class AhvSubnetsCache(CacheTableBase):
         click.echo(table)
 
     @classmethod
-    def sync(cls, *args, **kwargs):
-        """sync the table data from server"""
-        # clear old data
-        cls.clear()
+    def fetch_entities(cls, context, since=None):
+        project, account_uuid = context.get_project_details()
+        subnets_list = get_project_subnet_uuids(project)
+        if not subnets_list:
+            return [], None
 
-        # update by latest data
-        config = get_config()
-        client = get_api_client()
-
-        project_name = config["PROJECT"]["name"]
-        params = {"length": 1000, "filter": "name=={}".format(project_name)}
-        project_name_uuid_map = client.project.get_name_uuid_map(params)
+        AhvVmProvider = get_provider("AHV_VM")
+        AhvObj = AhvVmProvider.get_api_obj()
 
-        if not project_name_uuid_map:
-            LOG.error("Invalid project {} in config".format(project_name))
-            sys.exit(-1)
+        def get_list_page(uuids):
+            filter_query = "(_entity_id_=={})".format(",_entity_id_==".join(uuids))
+            return lambda params: AhvObj.subnets(
+                account_uuid=account_uuid, filter_query=filter_query, **params
+            )
 
-        project_id = project_name_uuid_map[project_name]
-        res, err = client.project.read(project_id)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+        entities = list(iter_updated_entities(get_list_page(subnets_list), since))
+        if since is None:
+            return entities, None
 
-        project = res.json()
-        subnets_list = []
-        for subnet in project["status"]["project_status"]["resources"][
-            "subnet_reference_list"
-        ]:
-            subnets_list.append(subnet["uuid"])
-
-        # Extending external subnet's list from remote account
-        for subnet in project["status"]["project_status"]["resources"][
-            "external_network_list"
-        ]:
-            subnets_list.append(subnet["uuid"])
-
-        accounts = project["status"]["project_status"]["resources"][
-            "account_reference_list"
-        ]
+        # Subnets added to project may not be updated since last sync
+        synced_uuids = {entity.uuid for entity in cls.select(cls.uuid)}
+        synced_uuids.update(entity["metadata"]["uuid"] for entity in entities)
+        new_uuids = [uuid for uuid in subnets_list if uuid not in synced_uuids]
+        if new_uuids:
+            entities.extend(iter_updated_entities(get_list_page(new_uuids)))
 
-        reg_accounts = []
-        for account in accounts:
-            reg_accounts.append(account["uuid"])
+        # Project's subnet list has uuids of all subnets
+        return entities, set(subnets_list)
 
-        # As account_uuid is required for versions>2.9.0
-        account_uuid = ""
-        payload = {"length": 250, "filter": "type==nutanix_pc"}
-        res, err = client.account.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    @classmethod
+    def get_entry_data(cls, entity):
+        cluster_ref = entity["status"]["cluster_reference"]
+        return {
+            "name": entity["status"]["name"],
+            "uuid": entity["metadata"]["uuid"],
+            "cluster": cluster_ref.get("name", ""),
+        }
 
-        res = res.json()
-        for entity in res["entities"]:
-            entity_id = entity["metadata"]["uuid"]
-            if entity_id in reg_accounts:
-                account_uuid = entity_id
-                break
+    @classmethod
+    def fetch_entities_by_name(cls, context, name):
+        project, account_uuid = context.get_project_details()
+        subnets_list = get_project_subnet_uuids(project)
 
         AhvVmProvider = get_provider("AHV_VM")
         AhvObj = AhvVmProvider.get_api_obj()
+        res = AhvObj.subnets(
+            account_uuid=account_uuid, filter_query="name=={}".format(name)
+        )
 
-        filter_query = "(_entity_id_=={})".format(",_entity_id_==".join(subnets_list),)
-        res = AhvObj.subnets(account_uuid=account_uuid, filter_query=filter_query)
-        for entity in res["entities"]:
-            name = entity["status"]["name"]
-            uuid = entity["metadata"]["uuid"]
-            cluster_ref = entity["status"]["cluster_reference"]
-            cluster_name = cluster_ref.get("name", "")
-
-            cls.create_entry(name=name, uuid=uuid, cluster=cluster_name)
+        # Only subnets of the project are cached
+        return [
+            entity
+            for entity in res.get("entities") or []
+            if entity["status"]["name"] == name
+            and entity["metadata"]["uuid"] in subnets_list
+        ]
 
     class Meta:
         database = dsl_database
         primary_key = CompositeKey("name", "uuid")
+        # get_entity_data looks up subnet by name and cluster
+        indexes = ((("name", "cluster"), False),)
 
 
 class AhvImagesCache(CacheTableBase):
     __cache_type__ = "ahv_disk_image"
     name = CharField()
     image_type = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
     def get_detail_dict(self, *args, **kwargs):
@@ -261,16 +679,9 @@ class AhvImagesCache(CacheTableBase):
         }
 
     @classmethod
-    def clear(cls, *args, **kwargs):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
-    @classmethod
-    def create_entry(cls, name, uuid, **kwargs):
+    def get_entry_fields(cls, name, uuid, **kwargs):
         image_type = kwargs.get("image_type", "")
-        # Store data in table
-        super().create(name=name, uuid=uuid, image_type=image_type)
+        return {"name": name, "uuid": uuid, "image_type": image_type}
 
     @classmethod
     def get_entity_data(cls, name, **kwargs):
@@ -286,61 +697,48 @@ class AhvImagesCache(CacheTableBase):
             return None
 
     @classmethod
-    def sync(cls, *args, **kwargs):
-        """sync the table data from server"""
-        # clear old data
-        cls.clear()
+    def fetch_entities(cls, context, since=None):
+        _, account_uuid = context.get_project_details()
 
-        # update by latest data
-        config = get_config()
-        client = get_api_client()
-
-        project_name = config["PROJECT"]["name"]
-        params = {"length": 1000, "filter": "name=={}".format(project_name)}
-        project_name_uuid_map = client.project.get_name_uuid_map(params)
+        AhvVmProvider = get_provider("AHV_VM")
+        AhvObj = AhvVmProvider.get_api_obj()
 
-        if not project_name_uuid_map:
-            LOG.error("Invalid project {} in config".format(project_name))
-            sys.exit(-1)
+        uuids = None
+        if since is not None:
+            try:
+                uuids = AhvObj.entity_uuids("image", account_uuid=account_uuid)
+            except Exception as exp:
+                LOG.debug("Listing image uuids failed, syncing all: {}".format(exp))
+                since = None
 
-        project_id = project_name_uuid_map[project_name]
-        res, err = client.project.read(project_id)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        project = res.json()
-        accounts = project["status"]["project_status"]["resources"][
-            "account_reference_list"
-        ]
-
-        reg_accounts = []
-        for account in accounts:
-            reg_accounts.append(account["uuid"])
+        entities = iter_updated_entities(
+            lambda params: AhvObj.images(account_uuid=account_uuid, **params), since
+        )
+        return list(entities), uuids
 
-        # As account_uuid is required for versions>2.9.0
-        account_uuid = ""
-        payload = {"length": 250, "filter": "type==nutanix_pc"}
-        res, err = client.account.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    @classmethod
+    def get_entry_data(cls, entity):
+        return {
+            "name": entity["status"]["name"],
+            "uuid": entity["metadata"]["uuid"],
+            # TODO add proper validation for karbon images
+            "image_type": entity["status"]["resources"].get("image_type", ""),
+        }
 
-        res = res.json()
-        for entity in res["entities"]:
-            entity_id = entity["metadata"]["uuid"]
-            if entity_id in reg_accounts:
-                account_uuid = entity_id
-                break
+    @classmethod
+    def fetch_entities_by_name(cls, context, name):
+        _, account_uuid = context.get_project_details()
 
         AhvVmProvider = get_provider("AHV_VM")
         AhvObj = AhvVmProvider.get_api_obj()
-        res = AhvObj.images(account_uuid=account_uuid)
-
-        for entity in res["entities"]:
-            name = entity["status"]["name"]
-            uuid = entity["metadata"]["uuid"]
-            # TODO add proper validation for karbon images
-            image_type = entity["status"]["resources"].get("image_type", "")
-            cls.create_entry(name=name, uuid=uuid, image_type=image_type)
+        res = AhvObj.images(
+            account_uuid=account_uuid, filter_query="name=={}".format(name)
+        )
+        return [
+            entity
+            for entity in res.get("entities") or []
+            if entity["status"]["name"] == name
+        ]
 
     @classmethod
     def show_data(cls, *args, **kwargs):
@@ -370,12 +768,16 @@ class AhvImagesCache(CacheTableBase):
     class Meta:
         database = dsl_database
         primary_key = CompositeKey("name", "uuid")
+        # get_entity_data looks up image by name and image_type
+        indexes = ((("name", "image_type"), False),)
 
 
 class ProjectCache(CacheTableBase):
     __cache_type__ = "project"
+    # Projects are rarely renamed or deleted
+    TTL = 24 * 3600
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
     def get_detail_dict(self, *args, **kwargs):
@@ -385,18 +787,6 @@ class ProjectCache(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls, *args, **kwargs):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
-    @classmethod
-    def create_entry(cls, name, uuid, **kwargs):
-        super().create(
-            name=name, uuid=uuid,
-        )
-
     @classmethod
     def get_entity_data(cls, name, **kwargs):
         try:
@@ -407,23 +797,19 @@ class ProjectCache(CacheTableBase):
             return None
 
     @classmethod
-    def sync(cls, *args, **kwargs):
-        """sync the table data from server"""
-        # clear old data
-        cls.clear()
+    def fetch_entities(cls, context, since=None):
+        return fetch_v3_entities(context.client, "projects", "project", since)
 
-        # update by latest data
-        client = get_api_client()
-        Obj = get_resource_api("projects", client.connection)
-        res, err = Obj.list({"length": 1000})
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    @classmethod
+    def get_entry_data(cls, entity):
+        return {
+            "name": entity["status"]["name"],
+            "uuid": entity["metadata"]["uuid"],
+        }
 
-        res = res.json()
-        for entity in res["entities"]:
-            name = entity["status"]["name"]
-            uuid = entity["metadata"]["uuid"]
-            cls.create_entry(name=name, uuid=uuid)
+    @classmethod
+    def fetch_entities_by_name(cls, context, name):
+        return fetch_v3_entities_by_name(context.client, "projects", name)
 
     @classmethod
     def show_data(cls, *args, **kwargs):
@@ -456,7 +842,7 @@ class ProjectCache(CacheTableBase):
 class AhvNetworkFunctionChain(CacheTableBase):
     __cache_type__ = "ahv_network_function_chain"
     name = CharField()
-    uuid = CharField()
+    uuid = CharField(index=True)
     last_update_time = DateTimeField(default=datetime.datetime.now())
 
     def get_detail_dict(self, *args, **kwargs):
@@ -466,18 +852,6 @@ class AhvNetworkFunctionChain(CacheTableBase):
             "last_update_time": self.last_update_time,
         }
 
-    @classmethod
-    def clear(cls, *args, **kwargs):
-        """removes entire data from table"""
-        for db_entity in cls.select():
-            db_entity.delete_instance()
-
-    @classmethod
-    def create_entry(cls, name, uuid, **kwargs):
-        super().create(
-            name=name, uuid=uuid,
-        )
-
     @classmethod
     def get_entity_data(cls, name, **kwargs):
         try:
@@ -488,22 +862,23 @@ class AhvNetworkFunctionChain(CacheTableBase):
             return None
 
     @classmethod
-    def sync(cls, *args, **kwargs):
-        # clear old data
-        cls.clear()
+    def fetch_entities(cls, context, since=None):
+        return fetch_v3_entities(
+            context.client, "network_function_chains", "network_function_chain", since
+        )
 
-        # update by latest data
-        client = get_api_client()
-        Obj = get_resource_api("network_function_chains", client.connection)
-        res, err = Obj.list({"length": 1000})
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    @classmethod
+    def get_entry_data(cls, entity):
+        return {
+            "name": entity["status"]["name"],
+            "uuid": entity["metadata"]["uuid"],
+        }
 
-        res = res.json()
-        for entity in res["entities"]:
-            name = entity["status"]["name"]
-            uuid = entity["metadata"]["uuid"]
-            cls.create_entry(name=name, uuid=uuid)
+    @classmethod
+    def fetch_entities_by_name(cls, context, name):
+        return fetch_v3_entities_by_name(
+            context.client, "network_function_chains", name
+        )
 
     @classmethod
     def show_data(cls, *args, **kwargs):
@@ -0,0 +1,4 @@
+from .store import EntityStore, StoreError, KIND
+from .server import FakeServer
+
+__all__ = ["EntityStore", "StoreError", "KIND", "FakeServer"]
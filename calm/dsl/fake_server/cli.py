@@ -0,0 +1,84 @@
+import click
+
+from calm.dsl.tools import get_logging_handle, simple_verbosity_option
+
+from .server import FakeServer
+
+LOG = get_logging_handle(__name__)
+
+
+def parse_rule(rule):
+    """Parses 'PATH_REGEX=VALUE' or 'METHOD:PATH_REGEX=VALUE'"""
+
+    path, _, value = rule.rpartition("=")
+    if not path:
+        raise click.BadParameter("Rule '{}' is not of form PATH=VALUE".format(rule))
+
+    method = None
+    if ":" in path and path.split(":", 1)[0].isupper():
+        method, path = path.split(":", 1)
+    return method, path, value
+
+
+@click.command(context_settings=dict(help_option_names=["-h", "--help"]))
+@simple_verbosity_option(LOG)
+@click.option("--host", default="127.0.0.1", show_default=True, help="Bind address")
+@click.option("--port", "-p", default=9440, show_default=True, help="Port")
+@click.option("--certfile", default=None, help="Certificate file, to serve https")
+@click.option("--keyfile", default=None, help="Private key of certificate")
+@click.option("--blueprints", default=0, help="Number of blueprints to seed")
+@click.option("--apps", default=0, help="Number of apps to seed")
+@click.option("--latency", default=0.0, help="Latency (seconds) added to every request")
+@click.option(
+    "--endpoint-latency",
+    "-l",
+    multiple=True,
+    help="Latency for matching requests: [METHOD:]PATH_REGEX=SECONDS",
+)
+@click.option(
+    "--endpoint-error",
+    "-e",
+    multiple=True,
+    help="Error status for matching requests: [METHOD:]PATH_REGEX=STATUS",
+)
+@click.option(
+    "--error-rate",
+    default=1.0,
+    help="Probability with which --endpoint-error rules fail a request",
+)
+def main(
+    host,
+    port,
+    certfile,
+    keyfile,
+    blueprints,
+    apps,
+    latency,
+    endpoint_latency,
+    endpoint_error,
+    error_rate,
+):
+    """Runs a fake Calm/Prism Central server with an in-memory store.
+
+    Point calm to it with `calm init dsl --ip 127.0.0.1 --port 9440` (server
+    has to be started with --certfile for https, as calm uses https)."""
+
+    server = FakeServer(
+        host=host, port=port, latency=latency, certfile=certfile, keyfile=keyfile
+    )
+    server.store.seed(blueprints=blueprints, apps=apps)
+
+    for rule in endpoint_latency:
+        method, path, value = parse_rule(rule)
+        server.add_latency(path, float(value), method=method)
+
+    for rule in endpoint_error:
+        method, path, value = parse_rule(rule)
+        server.add_error(path, int(value), method=method, rate=error_rate)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
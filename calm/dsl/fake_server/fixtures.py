@@ -0,0 +1,26 @@
+"""
+pytest fixtures of fake server. Enable them in a conftest.py with
+
+    pytest_plugins = ["calm.dsl.fake_server.fixtures"]
+"""
+
+import pytest
+
+from .server import FakeServer
+
+
+@pytest.fixture
+def fake_server():
+    """Running fake server with seeded store (1 project, account, subnet, image)"""
+
+    server = FakeServer()
+    server.store.seed()
+    with server:
+        yield server
+
+
+@pytest.fixture
+def fake_client(fake_server):
+    """Client handle connected to `fake_server`"""
+
+    return fake_server.get_client_handle()
@@ -0,0 +1,501 @@
+import gzip
+import json
+import random
+import re
+import ssl
+import threading
+import time
+import uuid as uuid_lib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from calm.dsl.tools import get_logging_handle
+
+from .store import EntityStore, StoreError, KIND
+
+LOG = get_logging_handle(__name__)
+
+V3 = "api/nutanix/v3"
+
+# Resource paths, as used in urls, mapped to store kinds
+RESOURCE_KINDS = {kind: kind for kind in KIND.ALL}
+RESOURCE_KINDS["projects_internal"] = KIND.PROJECT
+
+RESOURCE_REGEX = "|".join(
+    re.escape(path) for path in sorted(RESOURCE_KINDS, key=len, reverse=True)
+)
+UUID_REGEX = r"[^/]+"
+
+# Entity types of groups api served from store
+GROUP_ENTITY_KINDS = {
+    "blueprint": KIND.BLUEPRINT,
+    "app": KIND.APP,
+    "project": KIND.PROJECT,
+    "subnet": KIND.SUBNET,
+    "image": KIND.IMAGE,
+    "network_function_chain": KIND.NETWORK_FUNCTION_CHAIN,
+}
+
+# Content of downloaded runlog archives
+RUNLOG_ARCHIVE = b"PK\x05\x06" + b"\x00" * 18
+
+
+class LatencyRule:
+    """Delays requests matching method and path regex"""
+
+    def __init__(self, path, delay, method=None, jitter=0):
+        self.path = re.compile(path)
+        self.method = method.upper() if method else None
+        self.delay = delay
+        self.jitter = jitter
+
+    def matches(self, method, path):
+        if self.method and self.method != method:
+            return False
+        return self.path.search(path) is not None
+
+    def get_delay(self):
+        return self.delay + random.uniform(0, self.jitter)
+
+
+class ErrorRule(LatencyRule):
+    """Fails requests matching method and path regex with given status.
+    If count is given, only that many requests are failed. If rate is
+    given, a request fails with that probability."""
+
+    def __init__(self, path, status=500, method=None, count=None, rate=1.0):
+        super().__init__(path, 0, method=method)
+        self.status = status
+        self.count = count
+        self.rate = rate
+        self._lock = threading.Lock()
+
+    def fire(self, method, path):
+
+        if not self.matches(method, path):
+            return False
+
+        with self._lock:
+            if self.count is not None:
+                if self.count <= 0:
+                    return False
+            if random.random() >= self.rate:
+                return False
+            if self.count is not None:
+                self.count -= 1
+        return True
+
+
+class RecordedRequest:
+    def __init__(self, method, path, query, headers, body, status, duration):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.status = status
+        self.duration = duration
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+    def __repr__(self):
+        return "<{} {} {}>".format(self.method, self.path, self.status)
+
+
+class FakeServer:
+    """In process fake of the Calm/Prism Central v3 api.
+
+    Serves entities of an in-memory `EntityStore` over http(s), with
+    configurable latency and errors. Every request is recorded.
+
+    Example:
+        with FakeServer() as server:
+            server.store.seed(blueprints=10)
+            server.add_latency(r"blueprints/list", 0.2)
+            client = server.get_client_handle()
+            res, err = client.blueprint.list()
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        store=None,
+        latency=0,
+        certfile=None,
+        keyfile=None,
+        calm_version="3.0.0",
+        pc_version="5.17",
+        batch_enabled=True,
+    ):
+        self.store = store or EntityStore()
+        self.latency = latency
+        self.calm_version = calm_version
+        self.pc_version = pc_version
+        self.batch_enabled = batch_enabled
+        self.latency_rules = []
+        self.error_rules = []
+        self.requests = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.httpd = ThreadingHTTPServer((host, port), self._get_handler_class())
+        self.httpd.daemon_threads = True
+        self.scheme = "http"
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            self.httpd.socket = context.wrap_socket(self.httpd.socket, server_side=True)
+            self.scheme = "https"
+
+        self.routes = self._get_routes()
+
+    @property
+    def host(self):
+        return self.httpd.server_address[0]
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    @property
+    def url(self):
+        return "{}://{}:{}".format(self.scheme, self.host, self.port)
+
+    def start(self):
+        """Starts serving requests in a background thread"""
+
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        LOG.debug("Fake server listening at {}".format(self.url))
+        return self
+
+    def serve_forever(self):
+        LOG.info("Fake server listening at {}".format(self.url))
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def add_latency(self, path, delay, method=None, jitter=0):
+        """Delays requests to paths matching regex by delay (+ jitter) seconds"""
+
+        rule = LatencyRule(path, delay, method=method, jitter=jitter)
+        self.latency_rules.append(rule)
+        return rule
+
+    def add_error(self, path, status=500, method=None, count=None, rate=1.0):
+        """Fails requests to paths matching regex with the status"""
+
+        rule = ErrorRule(path, status=status, method=method, count=count, rate=rate)
+        self.error_rules.append(rule)
+        return rule
+
+    def reset(self):
+        """Clears rules and recorded requests"""
+
+        with self._lock:
+            self.latency_rules = []
+            self.error_rules = []
+            self.requests = []
+
+    def get_requests(self, method=None, path=None):
+        """Returns recorded requests, filtered by method and path regex"""
+
+        with self._lock:
+            requests = list(self.requests)
+        return [
+            req
+            for req in requests
+            if (not method or req.method == method.upper())
+            and (not path or re.search(path, req.path))
+        ]
+
+    def get_client_handle(self, **kwargs):
+        """Returns a new client handle connected to this server"""
+
+        # Imported here as api module reads config at import
+        from calm.dsl.api import get_client_handle
+
+        return get_client_handle(
+            self.host,
+            self.port,
+            scheme=self.scheme,
+            auth=("admin", "password"),
+            temp=True,
+            **kwargs
+        )
+
+    def _get_routes(self):
+
+        resource = r"^{}/(?P<resource>{})".format(V3, RESOURCE_REGEX)
+        item = resource + r"/(?P<uuid>{})".format(UUID_REGEX)
+        routes = [
+            ("GET", r"^apps/version$", self.get_calm_version),
+            (
+                "GET",
+                r"^PrismGateway/services/rest/v1/cluster/version$",
+                self.get_pc_version,
+            ),
+            ("GET", r"^{}/services/nucalm/status$".format(V3), self.get_status),
+            ("POST", r"^{}/groups$".format(V3), self.groups),
+            ("POST", r"^{}/nutanix/v1/groups/list$".format(V3), self.groups),
+            ("POST", r"^{}/batch$".format(V3), self.batch),
+            ("POST", r"^{}/blueprints/import_json$".format(V3), self.import_bp),
+            ("POST", item + r"/(simple_launch|launch)$", self.launch_bp),
+            ("GET", item + r"/pending_launches/(?P<request_id>[^/]+)$", self.poll),
+            ("GET", item + r"/runtime_editables$", self.runtime_editables),
+            ("GET", item + r"/export_json$", self.read),
+            ("POST", item + r"/app_runlogs/list$", self.list_runlogs),
+            ("POST", item + r"/actions/(?P<action>[^/]+)/run$", self.run_action),
+            ("GET", item + r"/app_runlogs/[^/]+/output/download$", self.download),
+            ("POST", resource + r"/list$", self.list),
+            ("POST", resource + r"$", self.create),
+            ("GET", item + r"$", self.read),
+            ("PUT", item + r"$", self.update),
+            ("DELETE", item + r"$", self.delete),
+        ]
+        return [(method, re.compile(path), func) for method, path, func in routes]
+
+    def dispatch(self, method, path, query, headers, body):
+        """Returns (status, headers, payload) of response for the request"""
+
+        for rule in self.latency_rules:
+            if rule.matches(method, path):
+                time.sleep(rule.get_delay())
+        if self.latency:
+            time.sleep(self.latency)
+
+        for rule in self.error_rules:
+            if rule.fire(method, path):
+                return rule.status, {}, get_error(rule.status, "Injected error")
+
+        for route_method, regex, func in self.routes:
+            match = regex.match(path)
+            if route_method == method and match:
+                break
+        else:
+            return 404, {}, get_error(404, "No route for {} {}".format(method, path))
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {}, get_error(400, "Invalid json body")
+
+        kwargs = match.groupdict()
+        if "resource" in kwargs:
+            kwargs["kind"] = RESOURCE_KINDS[kwargs.pop("resource")]
+
+        try:
+            response = func(payload=payload, query=query, headers=headers, **kwargs)
+        except StoreError as exc:
+            return exc.code, {}, get_error(exc.code, exc.message)
+
+        if isinstance(response, tuple):
+            return response
+        return 200, {}, response
+
+    # Handlers
+    # They get parsed json body (payload), query params, request headers and
+    # named groups of route regex. They return response payload or a tuple
+    # (status, headers, payload).
+
+    def get_calm_version(self, **kwargs):
+        return 200, {"Content-Type": "text/plain"}, self.calm_version
+
+    def get_pc_version(self, **kwargs):
+        return {"version": self.pc_version}
+
+    def get_status(self, **kwargs):
+        return {"service_enablement_status": "ENABLED"}
+
+    def groups(self, payload, **kwargs):
+        entity_type = payload.get("entity_type")
+        kind = GROUP_ENTITY_KINDS.get(entity_type)
+        if not kind:
+            return {
+                "entity_type": entity_type,
+                "filtered_entity_count": 0,
+                "total_entity_count": 0,
+                "group_results": [],
+            }
+
+        attributes = [
+            item["attribute"] for item in payload.get("group_member_attributes", [])
+        ]
+        response = self.store.group(kind, attributes, payload)
+        response["entity_type"] = entity_type
+        return response
+
+    def batch(self, payload, headers, **kwargs):
+
+        if not self.batch_enabled:
+            return 404, {}, get_error(404, "No route for POST batch")
+
+        responses = []
+        for request in payload.get("api_request_list", []):
+            url = urlsplit(request["path_and_params"])
+            query = {key: value[-1] for key, value in parse_qs(url.query).items()}
+            body = request.get("body")
+            status, _, response = self.dispatch(
+                request["operation"].upper(),
+                url.path.lstrip("/"),
+                query,
+                headers,
+                json.dumps(body).encode("utf-8") if body else b"",
+            )
+            responses.append(
+                {
+                    "status": str(status),
+                    "path_and_params": request["path_and_params"],
+                    "api_response": response,
+                }
+            )
+
+        if payload.get("execution_order") == "NON_SEQUENTIAL":
+            # Order of responses is not kept, as requests run in parallel
+            responses.reverse()
+        return {"api_response_list": responses}
+
+    def list(self, kind, payload, **kwargs):
+        return self.store.list(kind, payload)
+
+    def create(self, kind, payload, **kwargs):
+        return self.store.create(kind, payload)
+
+    def read(self, kind, uuid, **kwargs):
+        return self.store.read(kind, uuid)
+
+    def update(self, kind, uuid, payload, **kwargs):
+        return self.store.update(kind, uuid, payload)
+
+    def delete(self, kind, uuid, **kwargs):
+        entity = self.store.delete(kind, uuid)
+        entity["status"]["state"] = "DELETE_PENDING"
+        if kind == KIND.APP:
+            # App deletion runs the delete action
+            entity["status"]["runlog_uuid"] = str(uuid_lib.uuid4())
+        return 202, {}, entity
+
+    def import_bp(self, payload, **kwargs):
+        return self.store.create(KIND.BLUEPRINT, payload)
+
+    def launch_bp(self, uuid, payload, **kwargs):
+        request_id = self.store.launch(uuid, payload)
+        return {
+            "metadata": {"kind": "blueprint", "uuid": uuid},
+            "status": {"request_id": request_id},
+        }
+
+    def poll(self, request_id, **kwargs):
+        return self.store.get_launch(request_id)
+
+    def runtime_editables(self, uuid, **kwargs):
+        self.store.read(KIND.BLUEPRINT, uuid)
+        return {"resources": []}
+
+    def list_runlogs(self, uuid, payload, **kwargs):
+        return self.store.list_runlogs(uuid, payload)
+
+    def run_action(self, uuid, action, payload, **kwargs):
+        runlog_uuid = self.store.run_action(uuid, action, payload)
+        return {"status": {"runlog_uuid": runlog_uuid}}
+
+    def download(self, uuid, headers, **kwargs):
+
+        self.store.read(KIND.APP, uuid)
+        content = RUNLOG_ARCHIVE
+        response_headers = {
+            "Content-Type": "application/octet-stream",
+            "Accept-Ranges": "bytes",
+        }
+
+        match = re.match(r"bytes=(\d+)-$", headers.get("Range", ""))
+        if not match:
+            return 200, response_headers, content
+
+        start = int(match.group(1))
+        if start >= len(content):
+            return 416, {"Content-Range": "bytes */{}".format(len(content))}, b""
+
+        response_headers["Content-Range"] = "bytes {}-{}/{}".format(
+            start, len(content) - 1, len(content)
+        )
+        return 206, response_headers, content[start:]
+
+    def _get_handler_class(self):
+
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def handle_request(self):
+
+                start = time.time()
+                url = urlsplit(self.path)
+                path = url.path.lstrip("/")
+                query = {key: value[-1] for key, value in parse_qs(url.query).items()}
+
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+
+                status, headers, payload = server.dispatch(
+                    self.command, path, query, self.headers, body
+                )
+                if isinstance(payload, (dict, list)):
+                    payload = json.dumps(payload).encode("utf-8")
+                    headers.setdefault("Content-Type", "application/json")
+                elif isinstance(payload, str):
+                    payload = payload.encode("utf-8")
+
+                # Recorded before responding, so that clients see the request
+                # recorded as soon as they get the response
+                with server._lock:
+                    server.requests.append(
+                        RecordedRequest(
+                            self.command,
+                            path,
+                            query,
+                            dict(self.headers),
+                            body,
+                            status,
+                            time.time() - start,
+                        )
+                    )
+
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = handle_request
+
+            def log_message(self, format, *args):
+                LOG.debug("Fake server: " + format % args)
+
+        return RequestHandler
+
+
+def get_error(status, message):
+    return {
+        "api_version": "3.0",
+        "code": status,
+        "state": "ERROR",
+        "message_list": [{"message": message, "reason": "FAKE_SERVER_ERROR"}],
+    }
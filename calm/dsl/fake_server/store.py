@@ -0,0 +1,548 @@
+import copy
+import datetime
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class KIND:
+    """Resources (path under api/nutanix/v3) served by fake server"""
+
+    PROJECT = "projects"
+    BLUEPRINT = "blueprints"
+    APP = "apps"
+    ACCOUNT = "accounts"
+    SUBNET = "nutanix/v1/subnets"
+    IMAGE = "nutanix/v1/images"
+    NETWORK_FUNCTION_CHAIN = "network_function_chains"
+    MARKETPLACE_ITEM = "calm_marketplace_items"
+    APP_ICON = "app_icons"
+
+    ALL = [
+        PROJECT,
+        BLUEPRINT,
+        APP,
+        ACCOUNT,
+        SUBNET,
+        IMAGE,
+        NETWORK_FUNCTION_CHAIN,
+        MARKETPLACE_ITEM,
+        APP_ICON,
+    ]
+
+    # metadata.kind of entities
+    NAMES = {
+        PROJECT: "project",
+        BLUEPRINT: "blueprint",
+        APP: "app",
+        ACCOUNT: "account",
+        SUBNET: "subnet",
+        IMAGE: "image",
+        NETWORK_FUNCTION_CHAIN: "network_function_chain",
+        MARKETPLACE_ITEM: "marketplace_item",
+        APP_ICON: "app_icon",
+    }
+
+
+class StoreError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def get_timestamp(kind):
+    """Returns current time in the format used by the kind"""
+
+    if kind == KIND.PROJECT:
+        return datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    return str(int(time.time() * 1000000))
+
+
+def get_attribute(entity, name):
+    """Returns value of a filter attribute for the entity, None if not found"""
+
+    if name in ["_entity_id_", "uuid"]:
+        return entity["metadata"]["uuid"]
+    if name == "_state":
+        name = "state"
+
+    status = entity.get("status", {})
+    spec = entity.get("spec", {})
+    for source in [
+        entity["metadata"],
+        status,
+        status.get("resources", {}),
+        spec,
+        spec.get("resources", {}),
+        entity,
+    ]:
+        if isinstance(source, dict) and name in source:
+            value = source[name]
+            # References are matched by uuid
+            if isinstance(value, dict):
+                return value.get("uuid")
+            return value
+    return None
+
+
+def get_group_attribute(entity, name):
+    """Returns value of a groups api attribute for the entity"""
+
+    metadata = entity["metadata"]
+    status = entity.get("status", {})
+    if name == "_created_timestamp_usecs_":
+        return metadata.get("creation_time")
+    if name == "project_name":
+        return metadata.get("project_reference", {}).get("name")
+    if name == "owner_username":
+        return metadata.get("owner_reference", {}).get("name")
+    if name == "blueprint_name":
+        resources = status.get("resources", {})
+        return resources.get("app_blueprint_reference", {}).get("name")
+    if name == "categories":
+        categories = metadata.get("categories", {})
+        return ["{}:{}".format(key, value) for key, value in categories.items()]
+    return get_attribute(entity, name)
+
+
+def get_sort_key(value):
+    """Sorts numeric values (ex: timestamps) by number, others as strings"""
+
+    try:
+        return (0, float(value), "")
+    except (TypeError, ValueError):
+        return (1, 0, str(value))
+
+
+def match_value(expected, value):
+
+    if value is None:
+        return False
+    value = str(value)
+    if expected == value:
+        return True
+    try:
+        return re.fullmatch(expected, value) is not None
+    except re.error:
+        return False
+
+
+def match_clause(entity, clause):
+    """Matches clause of form 'attr==value' or 'attr!=value'"""
+
+    for operator in ["!=", "=="]:
+        if operator in clause:
+            name, expected = clause.split(operator, 1)
+            matched = match_value(expected, get_attribute(entity, name.strip()))
+            return not matched if operator == "!=" else matched
+
+    return True
+
+
+def match_filter(entity, filter_query):
+    """Matches v3 filter expressions. Clauses separated by ';' are ANDed,
+    clauses separated by ',' (optionally in parentheses) are ORed"""
+
+    for group in filter_query.split(";"):
+        group = group.strip().strip("()")
+        if not group:
+            continue
+        if not any(match_clause(entity, clause) for clause in group.split(",")):
+            return False
+    return True
+
+
+def set_project_status(status):
+    """Sets project_status of project from its resources"""
+
+    resources = status.setdefault("resources", {})
+    for key in [
+        "subnet_reference_list",
+        "external_network_list",
+        "account_reference_list",
+    ]:
+        resources.setdefault(key, [])
+    status["project_status"] = {"resources": resources}
+
+
+class EntityStore:
+    """Thread safe in-memory store of v3 entities"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entities = {kind: OrderedDict() for kind in KIND.ALL}
+        self._runlogs = {}
+        self._launches = {}
+        self.app_ready_after = 0  # seconds an app stays in provisioning
+
+    def _new_entity(self, kind, payload, state):
+
+        payload = copy.deepcopy(payload or {})
+        spec = payload.get("spec", {})
+        metadata = payload.get("metadata", {})
+        entity_uuid = metadata.get("uuid") or str(uuid.uuid4())
+        name = spec.get("name") or metadata.get("name") or entity_uuid
+        now = get_timestamp(kind)
+
+        metadata.update(
+            {
+                "kind": KIND.NAMES[kind],
+                "uuid": entity_uuid,
+                "name": name,
+                "spec_version": 0,
+                "creation_time": now,
+                "last_update_time": now,
+            }
+        )
+        metadata.setdefault("owner_reference", {"kind": "user", "name": "admin"})
+
+        status = copy.deepcopy(spec)
+        status.update(
+            {
+                "name": name,
+                "uuid": entity_uuid,
+                "state": state,
+                "description": spec.get("description", ""),
+            }
+        )
+        status.setdefault("resources", {})
+        if kind == KIND.BLUEPRINT:
+            status["application_count"] = 0
+        elif kind == KIND.PROJECT:
+            set_project_status(status)
+
+        return {
+            "api_version": "3.0",
+            "metadata": metadata,
+            "spec": spec,
+            "status": status,
+        }
+
+    def create(self, kind, payload, state="ACTIVE"):
+        entity = self._new_entity(kind, payload, state)
+        with self._lock:
+            self._entities[kind][entity["metadata"]["uuid"]] = entity
+        return copy.deepcopy(entity)
+
+    def read(self, kind, entity_uuid):
+        with self._lock:
+            entity = self._entities[kind].get(entity_uuid)
+            if entity is None:
+                raise StoreError(
+                    404, "{} {} not found".format(KIND.NAMES[kind], entity_uuid)
+                )
+            self._update_app_state(kind, entity)
+            return copy.deepcopy(entity)
+
+    def update(self, kind, entity_uuid, payload):
+        payload = payload or {}
+        with self._lock:
+            entity = self._entities[kind].get(entity_uuid)
+            if entity is None:
+                raise StoreError(
+                    404, "{} {} not found".format(KIND.NAMES[kind], entity_uuid)
+                )
+
+            spec_version = payload.get("metadata", {}).get("spec_version")
+            if spec_version is not None and (
+                spec_version != entity["metadata"]["spec_version"]
+            ):
+                raise StoreError(409, "spec_version mismatch")
+
+            spec = copy.deepcopy(payload.get("spec", entity["spec"]))
+            entity["spec"] = spec
+            entity["status"].update(copy.deepcopy(spec))
+            if kind == KIND.PROJECT:
+                set_project_status(entity["status"])
+            entity["metadata"]["spec_version"] += 1
+            entity["metadata"]["last_update_time"] = get_timestamp(kind)
+            return copy.deepcopy(entity)
+
+    def delete(self, kind, entity_uuid):
+        with self._lock:
+            entity = self._entities[kind].pop(entity_uuid, None)
+            if entity is None:
+                raise StoreError(
+                    404, "{} {} not found".format(KIND.NAMES[kind], entity_uuid)
+                )
+            self._runlogs.pop(entity_uuid, None)
+            return copy.deepcopy(entity)
+
+    def list(self, kind, params=None):
+        params = params or {}
+        offset = int(params.get("offset", 0))
+        length = int(params.get("length", 20))
+        filter_query = params.get("filter", "")
+        sort_attribute = params.get("sort_attribute")
+
+        with self._lock:
+            entities = []
+            for entity in self._entities[kind].values():
+                self._update_app_state(kind, entity)
+                if match_filter(entity, filter_query):
+                    entities.append(entity)
+
+            if sort_attribute:
+                entities.sort(
+                    key=lambda entity: get_sort_key(
+                        get_attribute(entity, sort_attribute)
+                    ),
+                    reverse=params.get("sort_order") == "DESCENDING",
+                )
+
+            end = offset + length
+            page = copy.deepcopy(entities[offset:end])
+
+        metadata = {
+            "kind": KIND.NAMES[kind],
+            "total_matches": len(entities),
+            "length": len(page),
+            "offset": offset,
+        }
+        if sort_attribute:
+            # Sort params are echoed, like v3 list api does
+            metadata["sort_attribute"] = sort_attribute
+            metadata["sort_order"] = params.get("sort_order", "ASCENDING")
+
+        return {"api_version": "3.0", "metadata": metadata, "entities": page}
+
+    def group(self, kind, attributes, params=None):
+        """Lists given attributes of entities, like groups api does"""
+
+        params = params or {}
+        offset = int(params.get("group_member_offset", 0))
+        length = int(params.get("group_member_count", 20))
+        filter_query = params.get("filter_criteria", "")
+        sort_attribute = params.get("group_member_sort_attribute")
+
+        with self._lock:
+            entities = []
+            for entity in self._entities[kind].values():
+                self._update_app_state(kind, entity)
+                if match_filter(entity, filter_query):
+                    entities.append(entity)
+
+            if sort_attribute:
+                entities.sort(
+                    key=lambda entity: get_sort_key(
+                        get_group_attribute(entity, sort_attribute)
+                    ),
+                    reverse=params.get("group_member_sort_order") == "DESCENDING",
+                )
+
+            end = offset + length
+            members = []
+            for entity in entities[offset:end]:
+                data = []
+                for name in attributes:
+                    value = get_group_attribute(entity, name)
+                    if value is None:
+                        values = []
+                    else:
+                        value = value if isinstance(value, list) else [value]
+                        values = [{"values": [str(item) for item in value]}]
+                    data.append({"name": name, "values": values})
+                members.append({"entity_id": entity["metadata"]["uuid"], "data": data})
+
+        return {
+            "filtered_entity_count": len(entities),
+            "total_entity_count": self.count(kind),
+            "group_results": [
+                {"entity_results": members, "total_entity_count": len(entities)}
+            ],
+        }
+
+    def count(self, kind):
+        with self._lock:
+            return len(self._entities[kind])
+
+    def _update_app_state(self, kind, entity):
+
+        ready_at = entity.get("_ready_at")
+        if kind == KIND.APP and ready_at and time.time() >= ready_at:
+            entity.pop("_ready_at")
+            entity["status"]["state"] = "running"
+            entity["metadata"]["last_update_time"] = get_timestamp(kind)
+
+    def launch(self, bp_uuid, payload):
+        """Creates app from blueprint, returns launch request id"""
+
+        blueprint = self.read(KIND.BLUEPRINT, bp_uuid)
+        spec = (payload or {}).get("spec", {})
+        app_name = spec.get("application_name") or "app-{}".format(uuid.uuid4().hex)
+        app_payload = {
+            "spec": {
+                "name": app_name,
+                "resources": {
+                    "app_blueprint_reference": {
+                        "kind": "blueprint",
+                        "name": blueprint["metadata"]["name"],
+                        "uuid": bp_uuid,
+                    },
+                    "action_list": [],
+                },
+            },
+            "metadata": {
+                "project_reference": blueprint["metadata"].get("project_reference", {})
+            },
+        }
+
+        app = self._new_entity(KIND.APP, app_payload, "provisioning")
+        app["_ready_at"] = time.time() + self.app_ready_after
+        request_id = str(uuid.uuid4())
+        with self._lock:
+            self._entities[KIND.APP][app["metadata"]["uuid"]] = app
+            self._launches[request_id] = app["metadata"]["uuid"]
+            entity = self._entities[KIND.BLUEPRINT][bp_uuid]
+            entity["status"]["application_count"] = (
+                entity["status"].get("application_count", 0) + 1
+            )
+
+        return request_id
+
+    def get_launch(self, request_id):
+        with self._lock:
+            app_uuid = self._launches.get(request_id)
+        if app_uuid is None:
+            raise StoreError(404, "launch request {} not found".format(request_id))
+        return {
+            "status": {
+                "state": "success",
+                "request_id": request_id,
+                "application_uuid": app_uuid,
+            }
+        }
+
+    def run_action(self, app_uuid, action_uuid, payload=None):
+        """Records a runlog for the action, returns runlog uuid"""
+
+        self.read(KIND.APP, app_uuid)
+        runlog_uuid = str(uuid.uuid4())
+        now = get_timestamp(KIND.APP)
+        runlog = {
+            "metadata": {
+                "kind": "app_runlog",
+                "uuid": runlog_uuid,
+                "creation_time": now,
+                "last_update_time": now,
+            },
+            "status": {
+                "uuid": runlog_uuid,
+                "type": "action_runlog",
+                "state": "SUCCESS",
+                "action_reference": {"uuid": action_uuid},
+                "root_reference": {"uuid": runlog_uuid},
+                "application_reference": {"uuid": app_uuid},
+            },
+        }
+        with self._lock:
+            self._runlogs.setdefault(app_uuid, []).append(runlog)
+        return runlog_uuid
+
+    def list_runlogs(self, app_uuid, params=None):
+        self.read(KIND.APP, app_uuid)
+        params = params or {}
+        with self._lock:
+            runlogs = [
+                runlog
+                for runlog in self._runlogs.get(app_uuid, [])
+                if match_filter(runlog, params.get("filter", ""))
+            ]
+            return {
+                "metadata": {"kind": "app_runlog", "total_matches": len(runlogs)},
+                "entities": copy.deepcopy(runlogs),
+            }
+
+    def seed(self, blueprints=0, apps=0, project_name="default"):
+        """Creates a project with a nutanix_pc account, subnet and image. Also
+        creates given number of blueprints and apps in that project"""
+
+        account = self.create(
+            KIND.ACCOUNT,
+            {"spec": {"name": "NTNX_LOCAL_AZ", "resources": {"type": "nutanix_pc"}}},
+        )
+        account_uuid = account["metadata"]["uuid"]
+        subnet = self.create(
+            KIND.SUBNET,
+            {
+                "spec": {
+                    "name": "vlan.0",
+                    "cluster_reference": {"kind": "cluster", "name": "cluster-1"},
+                    "resources": {"account_uuid": account_uuid},
+                }
+            },
+            state="COMPLETE",
+        )
+        self.create(
+            KIND.IMAGE,
+            {
+                "spec": {
+                    "name": "Centos7",
+                    "resources": {
+                        "image_type": "DISK_IMAGE",
+                        "account_uuid": account_uuid,
+                    },
+                }
+            },
+            state="COMPLETE",
+        )
+        project = self.create(
+            KIND.PROJECT,
+            {
+                "spec": {
+                    "name": project_name,
+                    "resources": {
+                        "subnet_reference_list": [
+                            {"kind": "subnet", "uuid": subnet["metadata"]["uuid"]}
+                        ],
+                        "account_reference_list": [
+                            {"kind": "account", "uuid": account_uuid}
+                        ],
+                    },
+                }
+            },
+            state="COMPLETE",
+        )
+        project_reference = {
+            "kind": "project",
+            "name": project_name,
+            "uuid": project["metadata"]["uuid"],
+        }
+
+        bp_uuids = []
+        for index in range(blueprints):
+            bp = self.create(
+                KIND.BLUEPRINT,
+                {
+                    "spec": {"name": "bp-{}".format(index), "resources": {}},
+                    "metadata": {"project_reference": project_reference},
+                },
+            )
+            bp_uuids.append(bp["metadata"]["uuid"])
+
+        for index in range(apps):
+            bp_uuid = bp_uuids[index % len(bp_uuids)] if bp_uuids else None
+            if bp_uuid:
+                request_id = self.launch(
+                    bp_uuid, {"spec": {"application_name": "app-{}".format(index)}}
+                )
+                self._entities[KIND.APP][self._launches[request_id]]["status"][
+                    "state"
+                ] = "running"
+            else:
+                self.create(
+                    KIND.APP,
+                    {
+                        "spec": {
+                            "name": "app-{}".format(index),
+                            "resources": {"app_blueprint_reference": {"name": ""}},
+                        },
+                        "metadata": {"project_reference": project_reference},
+                    },
+                    state="running",
+                )
+
+        return project
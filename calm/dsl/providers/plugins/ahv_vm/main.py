@@ -9,6 +9,7 @@ from distutils.version import LooseVersion as LV
 from collections import OrderedDict
 
 from calm.dsl.api import get_resource_api, get_api_client
+from calm.dsl.api.groups import list_group_uuids
 from calm.dsl.providers import get_provider_interface
 from calm.dsl.tools import StrictDraft7Validator, get_logging_handle
 from calm.dsl.builtins import ref
@@ -96,13 +97,7 @@ class AhvVmProvider(Provider):
         # As account_uuid is required for versions>2.9.0
         account_uuid = ""
         is_host_pc = True
-        payload = {"length": 250, "filter": "type==nutanix_pc"}
-        res, err = client.account.list(payload)
-        if err:
-            raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-        res = res.json()
-        for entity in res["entities"]:
+        for entity in client.account.iter_entities(filter_query="type==nutanix_pc"):
             entity_id = entity["metadata"]["uuid"]
             if entity_id in reg_accounts:
                 account_uuid = entity_id
@@ -786,6 +781,9 @@ class AhvBase:
     def categories(self, *args, **kwargs):
         raise NotImplementedError("categories call not implemented")
 
+    def entity_uuids(self, *args, **kwargs):
+        raise NotImplementedError("entity_uuids call not implemented")
+
 
 class AhvNew(AhvBase):
     """ahv api object for calm_version >= 2.9.0"""
@@ -827,6 +825,7 @@ class AhvNew(AhvBase):
             filter_query = filter_query[1:]
 
         params = {"length": limit, "offset": offset, "filter": filter_query}
+        params.update(get_sort_params(kwargs))
         res, err = Obj.list(params)
         if err:
             raise Exception("[{}] - {}".format(err["code"], err["error"]))
@@ -848,6 +847,7 @@ class AhvNew(AhvBase):
             filter_query = filter_query[1:]
 
         params = {"length": limit, "offset": offset, "filter": filter_query}
+        params.update(get_sort_params(kwargs))
         res, err = Obj.list(params)
         if err:
             raise Exception("[{}] - {}".format(err["code"], err["error"]))
@@ -888,6 +888,15 @@ class AhvNew(AhvBase):
 
         return categories
 
+    def entity_uuids(self, entity_type, *args, **kwargs):
+        Obj = get_resource_api(self.GROUPS, self.connection)
+        filter_query = ""
+        account_uuid = kwargs.get("account_uuid", None)
+        if account_uuid:
+            filter_query = "account_uuid=={}".format(account_uuid)
+
+        return get_group_uuids(Obj.list, entity_type, filter_query)
+
 
 class Ahv(AhvBase):
     """ahv api object for calm_version < 2.9.0"""
@@ -923,6 +932,7 @@ class Ahv(AhvBase):
         filter_query = kwargs.get("filter_query", "")
 
         params = {"length": limit, "offset": offset, "filter": filter_query}
+        params.update(get_sort_params(kwargs))
         res, err = Obj.list(params)
         if err:
             raise Exception("[{}] - {}".format(err["code"], err["error"]))
@@ -937,6 +947,7 @@ class Ahv(AhvBase):
         filter_query = kwargs.get("filter_query", "")
 
         params = {"length": limit, "offset": offset, "filter": filter_query}
+        params.update(get_sort_params(kwargs))
         res, err = Obj.list(params)
         if err:
             raise Exception("[{}] - {}".format(err["code"], err["error"]))
@@ -962,6 +973,27 @@ class Ahv(AhvBase):
 
         return categories
 
+    def entity_uuids(self, entity_type, *args, **kwargs):
+        Obj = get_resource_api(self.GROUPS, self.connection)
+        return get_group_uuids(Obj.create, entity_type)
+
+
+def get_sort_params(kwargs):
+    """Returns sort params of list call present in kwargs"""
+
+    return {
+        key: kwargs[key] for key in ["sort_attribute", "sort_order"] if kwargs.get(key)
+    }
+
+
+def get_group_uuids(call, entity_type, filter_query=""):
+    """Returns uuids of all entities of the type, using groups call"""
+
+    uuids, err = list_group_uuids(call, entity_type, filter_query)
+    if err:
+        raise Exception("[{}] - {}".format(err["code"], err["error"]))
+    return uuids
+
 
 def highlight_text(text, **kwargs):
     """Highlight text in our standard format"""
@@ -1030,13 +1062,7 @@ def create_spec(client):
     # As account_uuid is required for versions>2.9.0
     account_uuid = ""
     is_host_pc = True
-    payload = {"length": 250, "filter": "type==nutanix_pc"}
-    res, err = client.account.list(payload)
-    if err:
-        raise Exception("[{}] - {}".format(err["code"], err["error"]))
-
-    res = res.json()
-    for entity in res["entities"]:
+    for entity in client.account.iter_entities(filter_query="type==nutanix_pc"):
         entity_id = entity["metadata"]["uuid"]
         if entity_id in reg_accounts:
             account_uuid = entity_id
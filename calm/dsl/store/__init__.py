@@ -1,5 +1,7 @@
 from .secrets import Secret
 from .cache import Cache
 from .version import Version
+from .session import AuthSession
+from .name_index import NameResolver
 
-__all__ = ["Secret", "Cache", "Version"]
+__all__ = ["Secret", "Cache", "Version", "AuthSession", "NameResolver"]
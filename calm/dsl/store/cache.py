@@ -1,33 +1,152 @@
 import click
+import datetime
 import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ..db import get_db_handle
+from ..db.table_config import CacheSyncContext, CacheSyncTable, get_sync_scope
 from .version import Version
+from .name_index import NameResolver
+from calm.dsl.api import raise_request_errors
+from calm.dsl.config import get_config
 from calm.dsl.tools import get_logging_handle
 
 LOG = get_logging_handle(__name__)
 
+# Seconds for which names not found on server are not looked up again
+NEGATIVE_TTL = 30
+
+# Max lookups of Cache.get_entity_data remembered by a process
+MEMO_SIZE = 512
+
+
+def get_cache_config():
+    """Returns settings of [CACHE] config section"""
+
+    config = get_config()
+    if not config.has_section("CACHE"):
+        return {}
+
+    section = config["CACHE"]
+    settings = {}
+    if section.get("read_through") is not None:
+        settings["read_through"] = section.getboolean("read_through")
+    if section.get("negative_ttl") is not None:
+        settings["negative_ttl"] = section.getint("negative_ttl")
+    for key in section:
+        if key.endswith("_ttl") and key != "negative_ttl":
+            settings[key] = section.getint(key)
+    return settings
+
+
+class EntityMemo:
+    """Bounded LRU map of lookups to entity data, with expiry per entry"""
+
+    def __init__(self, max_size=MEMO_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns (found, entity data) of key"""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entity_data, expires_at = entry
+                if expires_at is None or datetime.datetime.now() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entity_data
+                del self._entries[key]
+
+            self.misses += 1
+            return False, None
+
+    def put(self, key, entity_data, expires_at=None):
+        with self._lock:
+            self._entries[key] = (entity_data, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, entity_type=None, name=None):
+        """Drops entries of the entity type and name, all if not given"""
+
+        with self._lock:
+            if entity_type is None:
+                self._entries.clear()
+                return
+
+            for key in list(self._entries):
+                if key[0] == entity_type and (name is None or key[1] == name):
+                    del self._entries[key]
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
 
 class Cache:
     """Cache class Implementation"""
 
+    # Lookups of get_entity_data, invalidated when cache tables are written
+    memo = EntityMemo()
+    _cache_tables = None
+    # Context of lookups made on server, shared by the process
+    _sync_context = None
+    _sync_context_lock = threading.Lock()
+
     @classmethod
     def get_cache_tables(cls):
         """returns tables used for cache purpose"""
 
-        db = get_db_handle()
-        db_tables = db.registered_tables
+        # Tables are fixed once modules are loaded, so the map is built once
+        if cls._cache_tables is None:
+            db = get_db_handle()
+            db_tables = db.get_tables()
+
+            cache_tables = {}
+            for table in db_tables:
+                if hasattr(table, "__cache_type__"):
+                    cache_tables[table.__cache_type__] = table
+            cls._cache_tables = cache_tables
 
-        cache_tables = {}
-        for table in db_tables:
-            if hasattr(table, "__cache_type__"):
-                cache_tables[table.__cache_type__] = table
-        return cache_tables
+        return cls._cache_tables
+
+    @classmethod
+    def get_sync_context(cls):
+        """Returns CacheSyncContext shared by lookups of the process, so that
+        project details are fetched only once"""
+
+        with cls._sync_context_lock:
+            if cls._sync_context is None:
+                cls._sync_context = CacheSyncContext()
+            return cls._sync_context
 
     @classmethod
     def get_entity_data(cls, entity_type, name, **kwargs):
         """returns entity data corresponding to supplied entry"""
 
+        key = (entity_type, name, tuple(sorted(kwargs.items())))
+        found, entity_data = cls.memo.get(key)
+        if found:
+            return entity_data
+
         cache_tables = cls.get_cache_tables()
         if not entity_type:
             LOG.error("No entity type for cache supplied")
@@ -38,24 +157,111 @@ class Cache:
             LOG.error("Unknown entity type ({}) supplied".format(entity_type))
             sys.exit(-1)
 
-        return db_cls.get_entity_data(name=name, **kwargs)
+        entity_data = db_cls.get_entity_data(name=name, **kwargs)
+
+        settings = get_cache_config()
+        if not settings.get("read_through", False):
+            cls.memo.put(key, entity_data)
+            return entity_data
+
+        now = datetime.datetime.now()
+        ttl = datetime.timedelta(
+            seconds=settings.get("{}_ttl".format(entity_type), db_cls.TTL)
+        )
+        negative_ttl = settings.get("negative_ttl", NEGATIVE_TTL)
+        updated_at = cls.get_update_time(db_cls, entity_data)
+        if not entity_data or now - updated_at >= ttl:
+            entity_data = cls.read_through(
+                db_cls, name, entity_data, negative_ttl, **kwargs
+            )
+            updated_at = cls.get_update_time(db_cls, entity_data)
+
+        # Misses, and stale entries of unreachable server, are retried after
+        # negative_ttl
+        if entity_data and now - updated_at < ttl:
+            expires_at = updated_at + ttl
+        else:
+            expires_at = now + datetime.timedelta(seconds=negative_ttl)
+        cls.memo.put(key, entity_data, expires_at)
+        return entity_data
 
     @classmethod
-    def sync(cls):
-        """Sync cache by latest data"""
+    def get_update_time(cls, db_cls, entity_data):
+        """Returns when entry was last known to match the server. Incremental
+        sync rewrites only the changed rows, so the time of last sync of the
+        table is used for rows older than that"""
+
+        if not entity_data:
+            return None
+
+        synced_at = CacheSyncTable.get_sync_time(
+            db_cls.__cache_type__, get_sync_scope()
+        )
+        if synced_at is None:
+            return entity_data["last_update_time"]
+        return max(entity_data["last_update_time"], synced_at)
+
+    @classmethod
+    def read_through(cls, db_cls, name, entity_data, negative_ttl, **kwargs):
+        """Fetches entities of the name from server and stores them in cache
+        table. Returns the entry for the lookup, entity_data (stale or None)
+        if server could not be reached"""
+
+        cache_type = db_cls.__cache_type__
+        miss_table = get_db_handle().cache_miss_table
+        scope = get_sync_scope()
+        if not entity_data and miss_table.is_missing(
+            cache_type, name, scope, negative_ttl
+        ):
+            return None
+
+        # Failed api calls raise instead of exiting, and lookups of the project
+        # in config exit if it is not found. Cached data is used then
+        try:
+            with raise_request_errors():
+                context = cls.get_sync_context()
+                LOG.debug("Fetching %s %s from server", cache_type, name)
+                entities = db_cls.fetch_entities_by_name(context, name)
+        except (Exception, SystemExit) as exc:
+            LOG.debug("Lookup of %s %s failed: %s", cache_type, name, exc)
+            return entity_data
+
+        db_cls.store_entities_by_name(name, entities)
+        cls.memo.invalidate(cache_type, name)
+        entity_data = db_cls.get_entity_data(name=name, **kwargs)
+        if entity_data:
+            miss_table.remove(cache_type, name)
+        else:
+            miss_table.add(cache_type, name, scope)
+        return entity_data
+
+    @classmethod
+    def sync(cls, full=False):
+        """Sync cache by latest data. Only the entities updated since last sync
+        are fetched, unless full is True"""
 
         LOG.info("Updating cache", nl=False)
 
-        # Updating version details first
+        # Updating version details first, provider apis depend on it
         Version.sync()
         click.echo(".", nl=False, err=True)
 
-        # Updating cache tables
-        cache_tables = cls.get_cache_tables()
-        for table in list(cache_tables.values()):
-            table.sync()
-            click.echo(".", nl=False, err=True)
+        # Tables are fetched concurrently, sharing the project and account
+        # lookups. Their data is written by this thread only.
+        context = CacheSyncContext()
+        with cls._sync_context_lock:
+            cls._sync_context = context
+        cache_tables = list(cls.get_cache_tables().values())
+        with ThreadPoolExecutor(max_workers=len(cache_tables) or 1) as executor:
+            futures = {
+                executor.submit(table.fetch_updates, context, full): table
+                for table in cache_tables
+            }
+            for future in as_completed(futures):
+                futures[future].store_updates(context, future.result())
+                click.echo(".", nl=False, err=True)
 
+        cls.memo.invalidate()
         click.echo(" [Done]", err=True)
 
     @classmethod
@@ -65,6 +271,23 @@ class Cache:
         cache_tables = cls.get_cache_tables()
         for table in list(cache_tables.values()):
             table.clear()
+        cls.memo.invalidate()
+        with cls._sync_context_lock:
+            cls._sync_context = None
+
+        # Next sync fetches all entities
+        db = get_db_handle()
+        db.cache_sync_table.clear()
+        db.cache_miss_table.clear()
+        NameResolver.clear()
+
+    @classmethod
+    def log_memo_stats(cls):
+        """Logs hit rate of entity lookups (at debug level), if any were made"""
+
+        stats = cls.memo.get_stats()
+        if stats["hits"] or stats["misses"]:
+            LOG.debug("Cache lookup stats: %s", stats)
 
     @classmethod
     def show_data(cls):
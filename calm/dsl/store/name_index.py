@@ -0,0 +1,226 @@
+import datetime
+import json
+
+from ..db import get_db_handle
+from calm.dsl.config import get_config
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+# States of soft deleted entities, which are still read from server
+DELETED_STATES = ["DELETED"]
+
+
+def get_entity_name(entity):
+    """Returns name of entity in list/read response"""
+
+    return entity.get("status", {}).get("name") or entity["metadata"].get("name")
+
+
+def get_name_index_config():
+    """Returns settings of [NAME_INDEX] config section"""
+
+    config = get_config()
+    if not config.has_section("NAME_INDEX"):
+        return {}
+
+    section = config["NAME_INDEX"]
+    settings = {}
+    if section.get("ttl") is not None:
+        settings["ttl"] = section.getint("ttl")
+    if section.get("negative_ttl") is not None:
+        settings["negative_ttl"] = section.getint("negative_ttl")
+    return settings
+
+
+class NameResolver:
+    """Resolves entity names to uuids, using an index stored in local db.
+
+    Names are looked up on the server with batched list calls and the
+    uuids of entities having exactly that name are kept in the index, per
+    server and kind, for `ttl` seconds. Names not found on the server are
+    remembered for `negative_ttl` seconds. Cli commands creating or deleting
+    entities invalidate their names. Entities read for indexed uuids are
+    checked to still have the name, and not be deleted. Destructive commands
+    should not use the index (`use_index=False`).
+
+    kind is the attribute of the api client used for the entity, ex:
+    "blueprint", "application". Lookups of a kind using the index should
+    always use the same filter query.
+
+    Example:
+
+    resolver = NameResolver(client)
+    bp_uuids = resolver.resolve("blueprint", ["bp1", "bp2"])["bp1"]
+    """
+
+    # Seconds for which an indexed name is trusted
+    TTL = 300
+    # Seconds for which a name not found on server is remembered
+    NEGATIVE_TTL = 30
+
+    def __init__(self, client, ttl=None, negative_ttl=None):
+        self.client = client
+        connection = client.connection
+        self.server = "{}:{}".format(connection.host, connection.port)
+
+        settings = {}
+        if ttl is None or negative_ttl is None:
+            settings = get_name_index_config()
+
+        self.ttl = ttl if ttl is not None else settings.get("ttl", self.TTL)
+        self.negative_ttl = (
+            negative_ttl
+            if negative_ttl is not None
+            else settings.get("negative_ttl", self.NEGATIVE_TTL)
+        )
+
+    def resolve(self, kind, names, filter_query="", use_index=True):
+        """Returns map of names to list of uuids of entities having the name.
+
+        Args:
+            kind (str): client attribute of the entity api, ex: "blueprint"
+            names (list): names to resolve
+            filter_query (str): added to name filter of list calls
+            use_index (bool): if False, names are looked up on server and the
+                              results are not stored in index
+        Returns:
+            (dict): name to list of uuids, empty list if name is not found
+        """
+
+        names = list(dict.fromkeys(names))
+        use_index = use_index and self.ttl > 0
+
+        resolved = self._get_indexed(kind, names) if use_index else {}
+        missing = [name for name in names if name not in resolved]
+        if missing:
+            found = self._lookup(kind, missing, filter_query)
+            if use_index:
+                self._store(kind, found)
+            resolved.update(found)
+
+        return resolved
+
+    def get_entities(self, kind, names, filter_query="", use_index=True):
+        """Returns map of names to list of entities (read responses) having
+        the name. Names whose indexed uuids are gone are looked up again"""
+
+        resolved = self.resolve(kind, names, filter_query, use_index)
+        # Entities of uuids looked up just now need not be checked again
+        entities = self._read(kind, resolved, verify=use_index)
+
+        stale = [name for name, items in entities.items() if items is None]
+        if stale:
+            LOG.debug("Indexed uuids of %s not found, looking them up", stale)
+            self.invalidate(kind, stale)
+            resolved = self.resolve(kind, stale, filter_query, use_index)
+            entities.update(self._read(kind, resolved, verify=use_index))
+
+        return {name: items or [] for name, items in entities.items()}
+
+    def invalidate(self, kind, names=None):
+        """Drops names of the kind from index, all if names is None"""
+
+        table = get_db_handle().name_index_table
+        condition = (table.server == self.server) & (table.kind == kind)
+        if names is not None:
+            condition &= table.name.in_(list(names))
+        table.delete().where(condition).execute()
+
+    @classmethod
+    def clear(cls):
+        """Drops all entries of the index"""
+
+        table = get_db_handle().name_index_table
+        table.delete().execute()
+
+    def _get_indexed(self, kind, names):
+
+        table = get_db_handle().name_index_table
+        query = table.select().where(
+            (table.server == self.server)
+            & (table.kind == kind)
+            & (table.name.in_(names))
+        )
+
+        now = datetime.datetime.now()
+        resolved = {}
+        for entry in query:
+            uuids = json.loads(entry.uuids)
+            ttl = self.ttl if uuids else self.negative_ttl
+            if now - entry.last_update_time < datetime.timedelta(seconds=ttl):
+                resolved[entry.name] = uuids
+
+        LOG.debug(
+            "Resolved %s of %s %s names from index", len(resolved), len(names), kind
+        )
+        return resolved
+
+    def _lookup(self, kind, names, filter_query):
+
+        params_list = []
+        for name in names:
+            params = {"filter": "name=={}".format(name)}
+            if filter_query:
+                params["filter"] += ";{}".format(filter_query)
+            params_list.append(params)
+
+        api = getattr(self.client, kind)
+        found = {}
+        for name, (response, err) in zip(names, api.list_many(params_list)):
+            if err:
+                raise Exception("[{}] - {}".format(err["code"], err["error"]))
+
+            # name filter is a regex, keep exact matches only
+            found[name] = [
+                entity["metadata"]["uuid"]
+                for entity in response.get("entities") or []
+                if get_entity_name(entity) == name
+            ]
+
+        return found
+
+    def _store(self, kind, found):
+
+        db = get_db_handle()
+        now = datetime.datetime.now()
+        rows = [
+            {
+                "server": self.server,
+                "kind": kind,
+                "name": name,
+                "uuids": json.dumps(uuids),
+                "last_update_time": now,
+            }
+            for name, uuids in found.items()
+        ]
+        with db.db.atomic("IMMEDIATE"):
+            db.name_index_table.replace_many(rows).execute()
+
+    def _read(self, kind, resolved, verify=True):
+        """Reads entities of resolved uuids. List of a name is None, if any
+        of its uuids is not found. If verify is True, an entity renamed or
+        deleted (still readable after soft delete) is also taken as not found"""
+
+        pairs = [(name, uuid) for name, uuids in resolved.items() for uuid in uuids]
+        results = getattr(self.client, kind).read_many([uuid for _, uuid in pairs])
+
+        entities = {name: [] for name in resolved}
+        for (name, _), (payload, err) in zip(pairs, results):
+            if entities[name] is None:
+                continue
+            if err:
+                if err["code"] == 404:
+                    entities[name] = None
+                    continue
+                raise Exception("[{}] - {}".format(err["code"], err["error"]))
+            if verify and (
+                get_entity_name(payload) != name
+                or str(payload.get("status", {}).get("state", "")).upper()
+                in DELETED_STATES
+            ):
+                entities[name] = None
+                continue
+            entities[name].append(payload)
+
+        return entities
@@ -0,0 +1,81 @@
+import datetime
+import json
+import peewee
+
+from ..crypto import Crypto
+from ..db import get_db_handle
+from calm.dsl.tools import get_logging_handle
+
+LOG = get_logging_handle(__name__)
+
+
+class AuthSession:
+    """Server issued auth session cache.
+
+    Session cookies are stored in db, encrypted with the user's password, so
+    that following cli invocations can skip authenticating every call.
+    """
+
+    def __init__(self, host, port, username, password):
+        self.name = "{}@{}:{}".format(username, host, port)
+        self.pass_phrase = (password or "").encode()
+
+    def get_instance(self):
+        """Return stored session instance"""
+
+        db = get_db_handle()
+        try:
+            return db.session_table.get(db.session_table.name == self.name)
+        except peewee.DoesNotExist:
+            return None
+
+    def load(self):
+        """Returns the stored session cookies, None if absent or expired"""
+
+        session = self.get_instance()
+        if not session:
+            return None
+
+        if session.expiry <= datetime.datetime.now():
+            LOG.debug("Stored auth session expired")
+            session.delete_instance()
+            return None
+
+        try:
+            LOG.debug("Decrypting auth session")
+            cookies = Crypto.decrypt_AES_GCM(
+                session.generate_enc_msg(), self.pass_phrase
+            )
+        except ValueError:
+            # Password got changed after session was stored
+            LOG.debug("Could not decrypt stored auth session")
+            session.delete_instance()
+            return None
+
+        return json.loads(cookies)
+
+    def save(self, cookies, expiry):
+        """Stores the session cookies till expiry (timestamp)"""
+
+        db = get_db_handle()
+        LOG.debug("Encrypting auth session")
+        encrypted_msg = Crypto.encrypt_AES_GCM(json.dumps(cookies), self.pass_phrase)
+
+        (kdf_salt, ciphertext, iv, auth_tag) = encrypted_msg
+
+        db.session_table.replace(
+            name=self.name,
+            kdf_salt=kdf_salt,
+            ciphertext=ciphertext,
+            iv=iv,
+            auth_tag=auth_tag,
+            expiry=datetime.datetime.fromtimestamp(expiry),
+            last_update_time=datetime.datetime.now(),
+        ).execute()
+
+    def clear(self):
+        """Deletes the stored session"""
+
+        db = get_db_handle()
+        query = db.session_table.delete().where(db.session_table.name == self.name)
+        query.execute()
@@ -2,6 +2,7 @@ from .ping import ping
 from .validator import StrictDraft7Validator
 from .logger import get_logging_handle
 from .click_options import simple_verbosity_option, show_trace_option
+from . import codec
 
 
 __all__ = [
@@ -11,4 +12,5 @@ __all__ = [
     "get_logging_handle",
     "simple_verbosity_option",
     "show_trace_option",
+    "codec",
 ]
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+codec: JSON encoding/decoding used by api, builtins and cli modules
+
+Uses orjson if it is installed and falls back to the standard library json
+module otherwise. Set CALM_DSL_JSON_BACKEND=json to force the standard
+library backend. Compact output (no indent) is identical for both backends,
+except that non-ascii characters are never escaped.
+
+Example:
+
+from calm.dsl.tools import codec
+
+data = codec.dumps({"name": "bp"})
+obj = codec.loads(data)
+
+"""
+
+import os
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class BACKEND:
+    JSON = "json"
+    ORJSON = "orjson"
+
+
+def _get_default_backend():
+
+    backend = os.environ.get("CALM_DSL_JSON_BACKEND", "")
+    if backend == BACKEND.JSON or orjson is None:
+        return BACKEND.JSON
+    return BACKEND.ORJSON
+
+
+_BACKEND = _get_default_backend()
+
+
+def get_backend():
+    """Returns name of the backend in use"""
+
+    return _BACKEND
+
+
+def set_backend(backend):
+    """Sets the backend to be used (ex: for benchmarks)"""
+
+    global _BACKEND
+    if backend == BACKEND.ORJSON and orjson is None:
+        raise ValueError("orjson is not installed")
+    if backend not in [BACKEND.JSON, BACKEND.ORJSON]:
+        raise ValueError("Unknown json backend {}".format(backend))
+    _BACKEND = backend
+
+
+def dumps_bytes(obj, default=None, sort_keys=False, indent=None):
+    """Encodes obj as utf-8 json bytes.
+
+    Args:
+        obj (object): object to encode
+        default (callable): returns a serializable version of objects that
+                            can not be encoded otherwise
+        sort_keys (bool): sort keys of dictionaries
+        indent (int): pretty print with this indent
+    Returns:
+        (bytes): encoded json
+    """
+
+    if _BACKEND == BACKEND.ORJSON and indent in [None, 2]:
+        option = 0
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            # Values not supported by orjson (ex: non-str keys, big ints)
+            pass
+
+    return _json_dumps(obj, default, sort_keys, indent).encode("utf-8")
+
+
+def dumps(obj, default=None, sort_keys=False, indent=None):
+    """Encodes obj as json string. Accepts same args as `dumps_bytes`"""
+
+    if _BACKEND == BACKEND.ORJSON and indent in [None, 2]:
+        return dumps_bytes(obj, default, sort_keys, indent).decode("utf-8")
+
+    return _json_dumps(obj, default, sort_keys, indent)
+
+
+def _json_dumps(obj, default, sort_keys, indent):
+
+    return json.dumps(
+        obj,
+        default=default,
+        sort_keys=sort_keys,
+        indent=indent,
+        ensure_ascii=False,
+        separators=(",", ": ") if indent else (",", ":"),
+    )
+
+
+def loads(data):
+    """Decodes json str/bytes. Raises ValueError for invalid json"""
+
+    if _BACKEND == BACKEND.ORJSON:
+        return orjson.loads(data)
+
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+def response_json(res, **kwargs):
+    """Returns parsed json body of a `requests.Response`"""
+
+    if kwargs or not res.content:
+        # Keep behaviour (and errors) of requests for these cases
+        return type(res).json(res, **kwargs)
+
+    return loads(res.content)
@@ -1,5 +1,4 @@
 import logging
-import inspect
 
 from colorlog import ColoredFormatter
 import time
@@ -31,6 +30,11 @@ class CustomLogging:
         * LOG.critical  - [CRITICAL]
         * LOG.exception - [ERROR]
 
+    Messages are built only if the level is enabled. Pass %-style args
+    (``LOG.debug("Body: %s", body)``) or a callable returning the message
+    (``LOG.debug(lambda: json.dumps(body))``) instead of formatting the
+    message at call site, if it is expensive to build.
+
     """
 
     DEBUG = logging.DEBUG
@@ -67,11 +71,12 @@ class CustomLogging:
 
     @staticmethod
     def __add_caller_info(msg):
-        stack = inspect.stack()
+        # Frame of the caller of log method. inspect.stack() is not used, as
+        # it reads source lines of every frame in the stack.
+        ln = sys._getframe(2).f_lineno
 
-        # filename = stack[2][1]
-        # func = stack[2][3]
-        ln = stack[2][2]
+        if callable(msg):
+            msg = msg()
 
         return ":{}] {}".format(ln, msg)
 
@@ -93,24 +98,30 @@ class CustomLogging:
         """sets the logger verbose level"""
         self._logger.setLevel(lvl)
 
-    def info(self, msg, nl=True, **kwargs):
+    def is_enabled_for(self, lvl):
+        """returns True if messages of the level will be logged"""
+        return self.get_logger().isEnabledFor(lvl)
+
+    def info(self, msg, *args, nl=True, **kwargs):
         """
         info log level
 
         Args:
-            msg (str): message to log
+            msg (str/callable): message to log
             nl (bool): Add newline (default: True)
 
         Returns:
             None
         """
         logger = self.get_logger()
+        if not logger.isEnabledFor(self.INFO):
+            return
 
         if not nl:
             for handler in logger.handlers:
                 handler.terminator = " "
 
-        logger.info(self.__add_caller_info(msg), **kwargs)
+        logger.info(self.__add_caller_info(msg), *args, **kwargs)
 
         if not nl:
             for handler in logger.handlers:
@@ -121,13 +132,15 @@ class CustomLogging:
         warning log level
 
         Args:
-            msg (str): message to log
+            msg (str/callable): message to log
 
         Returns:
             None
         """
 
         logger = self.get_logger()
+        if not logger.isEnabledFor(self.WARNING):
+            return
         return logger.warning(self.__add_caller_info(msg), *args, **kwargs)
 
     def error(self, msg, *args, **kwargs):
@@ -135,13 +148,15 @@ class CustomLogging:
         error log level
 
         Args:
-            msg (str): message to log
+            msg (str/callable): message to log
 
         Returns:
             None
         """
 
         logger = self.get_logger()
+        if not logger.isEnabledFor(self.ERROR):
+            return
         if self.show_trace:
             kwargs["stack_info"] = sys.exc_info()
         return logger.error(self.__add_caller_info(msg), *args, **kwargs)
@@ -151,13 +166,15 @@ class CustomLogging:
         exception log level
 
         Args:
-            msg (str): message to log
+            msg (str/callable): message to log
 
         Returns:
             None
         """
 
         logger = self.get_logger()
+        if not logger.isEnabledFor(self.ERROR):
+            return
         if self.show_trace:
             kwargs["stack_info"] = sys.exc_info()
         return logger.exception(self.__add_caller_info(msg), *args, **kwargs)
@@ -167,13 +184,15 @@ class CustomLogging:
         critical log level
 
         Args:
-            msg (str): message to log
+            msg (str/callable): message to log
 
         Returns:
             None
         """
 
         logger = self.get_logger()
+        if not logger.isEnabledFor(self.CRITICAL):
+            return
         if self.show_trace:
             kwargs["stack_info"] = sys.exc_info()
         return logger.critical(self.__add_caller_info(msg), *args, **kwargs)
@@ -183,13 +202,15 @@ class CustomLogging:
         debug log level
 
         Args:
-            msg (str): message to log
+            msg (str/callable): message to log
 
         Returns:
             None
         """
 
         logger = self.get_logger()
+        if not logger.isEnabledFor(self.DEBUG):
+            return
         return logger.debug(self.__add_caller_info(msg), *args, **kwargs)
 
     def __addCustomFormatter(self, ch):
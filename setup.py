@@ -41,7 +41,12 @@ setuptools.setup(
     cmdclass={"test": PyTest},
     zip_safe=False,
     include_package_data=True,
-    entry_points={"console_scripts": ["calm=calm.dsl.cli:main"]},
+    entry_points={
+        "console_scripts": [
+            "calm=calm.dsl.cli:main",
+            "calm-fake-server=calm.dsl.fake_server.cli:main",
+        ]
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Environment :: Console",
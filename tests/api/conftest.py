@@ -0,0 +1,75 @@
+"""Fixtures of offline tests of the api module. Tests needing a server use
+the fake server fixtures (see `calm.dsl.fake_server.fixtures`)"""
+
+import configparser
+import functools
+import json
+import threading
+
+import pytest
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from calm.dsl.api.connection import Connection
+
+
+class FakeTransport:
+    """Stands in for the http session of a connection. Requests are recorded
+    and answered with queued responses, or by a function called with each
+    request (dict of method, url, auth of session and the request args)"""
+
+    def __init__(self, session, responses):
+        self.session = session
+        self.responses = responses
+        self.requests = []
+        self._lock = threading.Lock()
+        for method in ["get", "post", "put", "delete"]:
+            setattr(session, method, functools.partial(self.send, method.upper()))
+
+    def send(self, method, url, **kwargs):
+        request = dict(kwargs, method=method, url=url, auth=self.session.auth)
+        with self._lock:
+            self.requests.append(request)
+            if not callable(self.responses):
+                return self.responses.pop(0)
+        return self.responses(request)
+
+
+@pytest.fixture
+def offline_connection():
+    """Returns function creating a connected `Connection` to localhost, with
+    requests answered by a FakeTransport. It returns (connection, transport)"""
+
+    def connect(responses=None, **kwargs):
+        conn = Connection("localhost", 9440, **kwargs)
+        conn.connect()
+        responses = responses if responses is not None else []
+        return conn, FakeTransport(conn.session, responses)
+
+    return connect
+
+
+@pytest.fixture
+def json_response():
+    """Returns function building a response with json body"""
+
+    def get_json_response(body, status_code=200, headers=None):
+        res = Response()
+        res.status_code = status_code
+        res._content = json.dumps(body).encode()
+        res.headers = CaseInsensitiveDict(headers or {})
+        return res
+
+    return get_json_response
+
+
+@pytest.fixture
+def conn_config():
+    """Returns function building config with the given [CONNECTION] options"""
+
+    def get_conn_config(**options):
+        config = configparser.ConfigParser()
+        config.read_dict({"CONNECTION": options})
+        return config
+
+    return get_conn_config
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import time
+
+from calm.dsl.api.async_handle import AsyncResourceAPI, get_async_client_handle
+from calm.dsl.api.handle import ClientHandle
+
+
+class TestAsyncClientHandle:
+    def test_calls_fan_out_within_concurrency_limit(self):
+        handle = get_async_client_handle("localhost", 9440, max_concurrency=4)
+        state = {"in_flight": 0, "max_in_flight": 0}
+        lock = threading.Lock()
+
+        def fake_call(endpoint, **kwargs):
+            with lock:
+                state["in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            time.sleep(0.05)
+            with lock:
+                state["in_flight"] -= 1
+            return endpoint, None
+
+        handle.connection.connection._call = fake_call
+
+        async def read_apps():
+            async with handle:
+                return await asyncio.gather(
+                    *[handle.application.read("uuid-{}".format(i)) for i in range(12)]
+                )
+
+        results = asyncio.run(read_apps())
+
+        assert [res for res, _ in results] == [
+            "api/nutanix/v3/apps/uuid-{}".format(i) for i in range(12)
+        ]
+        assert 1 < state["max_in_flight"] <= 4
+
+    def test_handle_mirrors_client_handle(self):
+        handle = get_async_client_handle("localhost", 9440)
+        for api_name in ClientHandle.API_NAMES:
+            assert isinstance(getattr(handle, api_name), AsyncResourceAPI)
+        handle.close()
@@ -0,0 +1,84 @@
+import base64
+import io
+import json
+
+from calm.dsl.api.connection import Connection, get_jwt_expiry
+
+
+class FakeSessionStore:
+    def __init__(self, cookies=None):
+        self.cookies = cookies
+        self.saved = []
+
+    def load(self):
+        return self.cookies
+
+    def save(self, cookies, expiry):
+        self.saved.append((cookies, expiry))
+        self.cookies = cookies
+
+    def clear(self):
+        self.cookies = None
+
+
+class TestAuthSession:
+    def test_cached_session_replaces_basic_auth(self):
+        store = FakeSessionStore({"NTNX_IGW_SESSION": "token"})
+        conn = Connection("localhost", 9440, auth=("user", "pass"), session_store=store)
+        session = conn.connect()
+
+        assert session.auth is None
+        assert session.cookies.get("NTNX_IGW_SESSION") == "token"
+
+    def test_fallback_to_basic_auth_on_401(self, offline_connection, json_response):
+        responses = [json_response({}, status_code=401), json_response({})]
+
+        def respond(request):
+            res = responses.pop(0)
+            if res.status_code == 200:
+                conn.session.cookies.set("NTNX_IGW_SESSION", "fresh")
+            return res
+
+        store = FakeSessionStore({"NTNX_IGW_SESSION": "expired"})
+        conn, transport = offline_connection(
+            respond, auth=("user", "pass"), session_store=store
+        )
+        res, err = conn._call("api/nutanix/v3/apps/list")
+
+        assert err is None
+        assert res.status_code == 200
+        assert [request["auth"] for request in transport.requests] == [
+            None,
+            ("user", "pass"),
+        ]
+        assert store.saved[-1][0] == {"NTNX_IGW_SESSION": "fresh"}
+
+    def test_upload_replayed_with_whole_file(self, offline_connection, json_response):
+        responses = [json_response({}, status_code=401), json_response({})]
+        bodies = []
+
+        def respond(request):
+            bodies.append(request["data"].read())
+            return responses.pop(0)
+
+        store = FakeSessionStore({"NTNX_IGW_SESSION": "expired"})
+        conn, _ = offline_connection(
+            respond, auth=("user", "pass"), session_store=store
+        )
+        image = io.BytesIO(b"image-data")
+        res, err = conn._call(
+            "api/nutanix/v3/app_icons/upload",
+            request_json={"name": "icon"},
+            files={"image": ("icon", image, "image/jpeg")},
+        )
+
+        assert err is None
+        assert len(bodies) == 2
+        assert all(b"image-data" in body for body in bodies)
+
+    def test_session_expiry_from_jwt(self):
+        claims = base64.urlsafe_b64encode(json.dumps({"exp": 1893456000}).encode())
+        token = "header.{}.signature".format(claims.decode().rstrip("="))
+
+        assert get_jwt_expiry(token) == 1893456000
+        assert get_jwt_expiry("not-a-jwt") is None
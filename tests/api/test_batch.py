@@ -0,0 +1,73 @@
+from calm.dsl.api.batch import BatchAPI
+from calm.dsl.api.connection import REQUEST
+from calm.dsl.fake_server import KIND
+
+
+class TestBatchAPI:
+    def get_bp_uuids(self, fake_server, count):
+        fake_server.store.seed(blueprints=count)
+        return [
+            bp["metadata"]["uuid"]
+            for bp in fake_server.store.list(KIND.BLUEPRINT)["entities"]
+        ]
+
+    def test_batch_delete(self, fake_server, fake_client):
+        bp_uuids = self.get_bp_uuids(fake_server, 4)
+
+        batch = BatchAPI(fake_client.connection, chunk_size=2)
+        requests = [
+            (REQUEST.METHOD.DELETE, fake_client.blueprint.ITEM.format(uuid), None)
+            for uuid in bp_uuids + ["missing"]
+        ]
+        results = batch.execute(requests)
+
+        # 5 requests in chunks of 2, last one sent directly
+        assert len(fake_server.get_requests(path="batch")) == 2
+        assert len(fake_server.get_requests(method="DELETE")) == 1
+        assert [err for _, err in results[:4]] == [None] * 4
+        assert results[4][0] is None
+        assert results[4][1]["code"] == 404
+        assert fake_server.store.count(KIND.BLUEPRINT) == 0
+
+    def test_list_many(self, fake_server, fake_client):
+        self.get_bp_uuids(fake_server, 3)
+        bp_names = [
+            bp["metadata"]["name"]
+            for bp in fake_server.store.list(KIND.BLUEPRINT)["entities"]
+        ]
+
+        params_list = [{"filter": "name=={}".format(name)} for name in bp_names]
+        results = fake_client.blueprint.list_many(params_list)
+
+        assert len(fake_server.get_requests(path="batch")) == 1
+        for name, (response, err) in zip(bp_names, results):
+            assert not err
+            assert response["entities"][0]["metadata"]["name"] == name
+
+    def test_responses_matched_to_requests(self, fake_server, fake_client):
+        bp_uuids = self.get_bp_uuids(fake_server, 3)
+
+        # Reads have distinct paths, and run in parallel
+        results = fake_client.blueprint.read_many(bp_uuids)
+        assert [bp["metadata"]["uuid"] for bp, _ in results] == bp_uuids
+
+        # List calls share a path, and run in order
+        fake_client.blueprint.list_many([{"length": 1}, {"length": 2}])
+        orders = [
+            request.json()["execution_order"]
+            for request in fake_server.get_requests(path="batch")
+        ]
+        assert orders == ["NON_SEQUENTIAL", "SEQUENTIAL"]
+
+    def test_fallback_to_concurrent_calls(self, fake_server, fake_client):
+        bp_uuids = self.get_bp_uuids(fake_server, 3)
+        fake_server.batch_enabled = False
+
+        results = fake_client.blueprint.read_many(bp_uuids)
+        assert [bp["metadata"]["uuid"] for bp, _ in results] == bp_uuids
+        assert not fake_client.connection.batch_supported
+
+        # Batch api is not tried again
+        fake_client.blueprint.read_many(bp_uuids)
+        assert len(fake_server.get_requests(path="batch")) == 1
+        assert len(fake_server.get_requests(method="GET", path="blueprints/")) == 6
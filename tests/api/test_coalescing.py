@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from calm.dsl.api.coalescer import request_coalescing
+from calm.dsl.api.connection import REQUEST
+from calm.dsl.api.resource import ResourceAPI
+
+
+@pytest.fixture
+def coalescing_connection(offline_connection, json_response):
+    def connect(delay=0, coalesce_window=REQUEST.COALESCE.WINDOW):
+        def respond(request):
+            time.sleep(delay)
+            return json_response({"metadata": {"uuid": "1"}})
+
+        return offline_connection(respond, coalesce_window=coalesce_window)
+
+    return connect
+
+
+class TestRequestCoalescing:
+    def test_concurrent_reads_share_one_call(self, coalescing_connection):
+        conn, transport = coalescing_connection(delay=0.1)
+        api = ResourceAPI(conn, "projects")
+        results = []
+
+        def read():
+            results.append(api.read("1"))
+
+        with request_coalescing():
+            threads = [threading.Thread(target=read) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(transport.requests) == 1
+        assert len(results) == 5
+        # Every caller gets its own response object to parse
+        assert len({id(res) for res, _ in results}) == 5
+        assert all(res.json() == {"metadata": {"uuid": "1"}} for res, _ in results)
+
+    def test_writes_invalidate_reads(self, coalescing_connection):
+        conn, transport = coalescing_connection()
+        api = ResourceAPI(conn, "projects")
+
+        with request_coalescing():
+            api.list({"length": 20})
+            api.list({"length": 20})
+            api.list({"length": 40})
+            assert len(transport.requests) == 2
+
+            api.update("1", {"spec": {}})
+            api.list({"length": 20})
+            assert len(transport.requests) == 4
+
+    def test_window_and_scope(self, coalescing_connection):
+        conn, transport = coalescing_connection(coalesce_window=0)
+        api = ResourceAPI(conn, "projects")
+
+        with request_coalescing():
+            api.read("1")
+            time.sleep(0.01)
+            api.read("1")
+        assert len(transport.requests) == 2
+
+        # Nothing is shared outside a coalescing scope
+        conn.coalesce_window = 10
+        api.read("1")
+        api.read("1")
+        assert len(transport.requests) == 4
@@ -0,0 +1,52 @@
+import gzip
+import json
+
+from calm.dsl.tools import codec
+from calm.dsl.api.connection import encode_json_body, iter_json
+
+
+class TestRequestCompression:
+    payload = {
+        "spec": {
+            "name": "HelloBlueprint",
+            "resources": {
+                "task_definition_list": [
+                    {"name": "Task{}".format(i), "script": "echo 'hello'\n" * 50}
+                    for i in range(200)
+                ],
+                "flags": [True, None, 1.5, {1: "one"}],
+            },
+        },
+        "metadata": {"spec_version": 1, "kind": "blueprint"},
+    }
+
+    def test_iter_json_matches_codec(self):
+        for depth in range(5):
+            assert b"".join(iter_json(self.payload, depth=depth)) == codec.dumps_bytes(
+                self.payload
+            )
+
+    def test_compression_threshold(self):
+        body, encoding = encode_json_body({"name": "small"}, compress_min_size=1024)
+        assert encoding is None
+        assert json.loads(body) == {"name": "small"}
+
+        body, encoding = encode_json_body(self.payload, compress_min_size=1024)
+        assert encoding == "gzip"
+        assert len(body) < len(json.dumps(self.payload)) / 10
+        assert json.loads(gzip.decompress(body)) == json.loads(json.dumps(self.payload))
+
+    def test_compressed_upload(self, offline_connection, json_response):
+        conn, transport = offline_connection(
+            [json_response({})], compress_requests=True
+        )
+        conn._call("api/nutanix/v3/blueprints/import_json", request_json=self.payload)
+
+        request = transport.requests[0]
+        assert request["headers"]["Content-Encoding"] == "gzip"
+        assert request["headers"]["Content-Type"] == "application/json"
+        assert "Content-Encoding" not in conn.session.headers
+        assert (
+            json.loads(gzip.decompress(request["data"]))["metadata"]["kind"]
+            == "blueprint"
+        )
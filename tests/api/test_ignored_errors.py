@@ -0,0 +1,21 @@
+class TestIgnoredErrors:
+    def test_ignored_errors_warned(self, fake_server, caplog):
+        client = fake_server.get_client_handle()
+        fake_server.add_error(r"blueprints/1$", status=500)
+        url = "api/nutanix/v3/blueprints/1"
+
+        caplog.clear()
+        client.connection._call(url, method="GET", ignore_error=True)
+        assert "Request to {} failed: [500]".format(url) in caplog.text
+
+        caplog.clear()
+        client.connection._call(
+            url, method="GET", ignore_error=True, warning_msg="Could not read"
+        )
+        assert "Could not read" in caplog.text
+        assert "Request to" not in caplog.text
+
+        # Callers reporting errors themselves do not log them
+        caplog.clear()
+        client.connection._call(url, method="GET", ignore_error=True, warning_msg=None)
+        assert not caplog.records
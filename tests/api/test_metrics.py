@@ -0,0 +1,59 @@
+import time
+
+from requests import PreparedRequest
+
+from calm.dsl.api.connection import REQUEST
+from calm.dsl.api.metrics import RequestMetrics
+
+
+class TestRequestMetrics:
+    def test_requests_are_recorded(self, caplog, offline_connection, json_response):
+        delays = [0, 0.1]
+
+        def respond(request):
+            time.sleep(delays.pop(0))
+            res = json_response({"entities": []})
+            res.request = PreparedRequest()
+            res.request.body = request["data"]
+            return res
+
+        metrics = RequestMetrics()
+        conn, _ = offline_connection(
+            respond, metrics=metrics, slow_request_threshold=0.05
+        )
+        for uuid in [
+            "4d9b5ee8-c2ef-4ec2-9d1f-8c3a5e1f2a10",
+            "00000000-0000-0000-0000-000000000001",
+        ]:
+            conn._call(
+                "api/nutanix/v3/apps/{}/app_runlogs/list".format(uuid),
+                request_json={"length": 20},
+            )
+
+        stats = metrics.to_dict()
+        assert stats["summary"]["count"] == 2
+        (endpoint_stats,) = stats["requests"]
+        assert endpoint_stats["method"] == "POST"
+        assert (
+            endpoint_stats["endpoint"] == "/api/nutanix/v3/apps/{uuid}/app_runlogs/list"
+        )
+        assert endpoint_stats["bytes_out"] == 2 * len(b'{"length":20}')
+        assert endpoint_stats["bytes_in"] == 2 * len(b'{"entities": []}')
+        assert endpoint_stats["status_codes"] == {"200": 2}
+        assert endpoint_stats["histogram"]["le_0.05"] == 1
+        assert "Slow request: POST" in caplog.text
+
+    def test_errors_are_recorded(self, offline_connection):
+        def respond(request):
+            raise ConnectionError("refused")
+
+        metrics = RequestMetrics()
+        conn, _ = offline_connection(respond, metrics=metrics)
+        res, err = conn._call(
+            "api/nutanix/v3/apps/1", method=REQUEST.METHOD.GET, ignore_error=True,
+        )
+
+        assert res is None
+        stats = metrics.to_dict()["requests"][0]
+        assert stats["errors"] == 1
+        assert stats["status_codes"] == {"error": 1}
@@ -0,0 +1,48 @@
+from unittest.mock import MagicMock
+
+from calm.dsl.api.connection import Connection
+from calm.dsl.api.resource import ResourceAPI
+
+
+class TestResourceAPIPagination:
+    def get_api(self, total):
+        api = ResourceAPI(Connection("localhost", 9440), "apps")
+        requested = []
+
+        def fake_list(params):
+            requested.append(params)
+            offset, length = params["offset"], params["length"]
+            entities = [
+                {"metadata": {"uuid": str(i)}}
+                for i in range(offset, min(offset + length, total))
+            ]
+            res = MagicMock()
+            res.json.return_value = {
+                "entities": entities,
+                "metadata": {"total_matches": total},
+            }
+            return res, None
+
+        api.list = fake_list
+        return api, requested
+
+    def test_iter_entities_walks_all_pages(self):
+        api, requested = self.get_api(total=1050)
+        uuids = [
+            entity["metadata"]["uuid"]
+            for entity in api.iter_entities(filter_query="state==RUNNING")
+        ]
+
+        assert uuids == [str(i) for i in range(1050)]
+        assert [params["offset"] for params in requested] == [0, 250, 500, 750, 1000]
+        assert all(params["filter"] == "state==RUNNING" for params in requested)
+
+    def test_iter_entities_stops_early(self):
+        api, requested = self.get_api(total=1000)
+        entities = api.iter_entities(page_size=100)
+        first = next(entities)
+        entities.close()
+
+        assert first["metadata"]["uuid"] == "0"
+        # Atmost one page is prefetched ahead of the consumer
+        assert len(requested) <= 2
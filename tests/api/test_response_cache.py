@@ -0,0 +1,98 @@
+import time
+
+from calm.dsl.api.resource import ResourceAPI
+from calm.dsl.api.response_cache import ResponseCache
+from calm.dsl.fake_server import KIND
+
+
+class TestResponseCache:
+    def test_etag_revalidation(self, tmp_path, offline_connection, json_response):
+        body = {"metadata": {"uuid": "1", "spec_version": 2}}
+        conn, transport = offline_connection(
+            [
+                json_response(body, headers={"ETag": '"v2"'}),
+                json_response({}, status_code=304),
+            ],
+            response_cache=ResponseCache(str(tmp_path)),
+        )
+        api = ResourceAPI(conn, "blueprints")
+
+        res, _ = api.read("1")
+        assert res.json() == body
+
+        res, err = api.read("1")
+        assert err is None
+        assert res.json() == body
+        assert transport.requests[1]["headers"]["If-None-Match"] == '"v2"'
+        assert "If-None-Match" not in conn.session.headers
+
+    def test_entity_version_revalidation(
+        self, tmp_path, offline_connection, json_response
+    ):
+        body = {"metadata": {"uuid": "1", "spec_version": 2, "last_update_time": 5}}
+        conn, transport = offline_connection(
+            [json_response(body), json_response(body)],
+            response_cache=ResponseCache(str(tmp_path)),
+        )
+        api = ResourceAPI(conn, "blueprints")
+        api.GROUPS_ENTITY_TYPE = "blueprint"
+        probes = []
+
+        def get_entity_version(uuid):
+            probes.append(uuid)
+            return "2:5"
+
+        api.get_entity_version = get_entity_version
+
+        # Version is probed only to revalidate a cached response, a response
+        # cached without version is read again
+        assert api.read("1")[0].json() == body
+        assert not probes
+        for _ in range(2):
+            assert api.read("1")[0].json() == body
+        assert len(transport.requests) == 2
+        assert len(probes) == 2
+
+        # Entity status changed at server
+        api.get_entity_version = lambda uuid: "2:6"
+        transport.responses.append(
+            json_response({"metadata": {"uuid": "1", "spec_version": 3}})
+        )
+        assert api.read("1")[0].json()["metadata"]["spec_version"] == 3
+
+    def test_version_probed_through_groups(self, fake_server, tmp_path):
+        fake_server.store.seed(blueprints=1)
+        bp_uuid = fake_server.store.list(KIND.BLUEPRINT)["entities"][0]["metadata"][
+            "uuid"
+        ]
+        client = fake_server.get_client_handle(
+            response_cache=ResponseCache(str(tmp_path))
+        )
+
+        bp = client.blueprint.read(bp_uuid)[0].json()
+        assert not fake_server.get_requests(path="groups$")
+        client.blueprint.read(bp_uuid)
+        fake_server.reset()
+        assert client.blueprint.read(bp_uuid)[0].json() == bp
+
+        # Only the projected version attributes are fetched for a cache hit
+        requests = fake_server.get_requests()
+        assert [request.path for request in requests] == ["api/nutanix/v3/groups"]
+        assert requests[0].json()["group_member_attributes"] == [
+            {"attribute": "spec_version"},
+            {"attribute": "last_update_time"},
+        ]
+
+        bp["spec"]["description"] = "updated"
+        client.blueprint.update(bp_uuid, bp)
+        bp = client.blueprint.read(bp_uuid)[0].json()
+        assert bp["spec"]["description"] == "updated"
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_size=250)
+        for i in range(3):
+            cache.put("https://pc/{}".format(i), b"x" * 100)
+            time.sleep(0.01)
+
+        assert cache.get("https://pc/0") is None
+        assert cache.get("https://pc/2")[0] == b"x" * 100
@@ -0,0 +1,54 @@
+from calm.dsl.api.connection import Connection, RetryPolicy, REQUEST
+from calm.dsl.api.handle import get_connection_params
+
+
+class TestRetryPolicy:
+    def test_backoff_is_bounded(self):
+        policy = RetryPolicy(total=10, backoff_factor=1, backoff_max=4)
+        for _ in range(8):
+            policy = policy.increment(method="GET", url="/", error=ConnectionError())
+            assert 0 <= policy.get_backoff_time() <= 4
+
+        # Bounds and jitter survive `Retry.new()`
+        assert policy.backoff_max == 4
+        assert policy.jitter is True
+
+    def test_only_idempotent_methods_retried_by_default(self):
+        policy = RetryPolicy()
+        assert policy._is_method_retryable("GET")
+        assert policy._is_method_retryable("PUT")
+        assert not policy._is_method_retryable("POST")
+
+    def test_policy_from_config(self, conn_config):
+        config = conn_config(
+            retries_enabled="true",
+            retry_total="3",
+            retry_backoff_max="10",
+            retry_status_forcelist="502, 503",
+            retry_methods="get,post",
+        )
+        params = get_connection_params(config)
+
+        assert params["retries_enabled"] is True
+        policy = params["retry_policy"]
+        assert policy.total == 3
+        assert policy.backoff_max == 10
+        assert set(policy.status_forcelist) == {502, 503}
+        assert policy._is_method_retryable("POST")
+
+    def test_retries_disabled_by_default(self, conn_config):
+        assert get_connection_params(conn_config()) == {}
+
+        conn = Connection("localhost", 9440, auth=("user", "pass"))
+        session = conn.connect()
+        adapter = session.get_adapter("https://localhost:9440")
+        assert adapter.max_retries.total == 0
+
+    def test_connect_mounts_retry_policy(self):
+        conn = Connection(
+            "localhost", 9440, scheme=REQUEST.SCHEME.HTTPS, retries_enabled=True
+        )
+        session = conn.connect()
+        adapter = session.get_adapter("https://localhost:9440")
+        assert isinstance(adapter.max_retries, RetryPolicy)
+        assert adapter.max_retries.total == REQUEST.RETRY.TOTAL
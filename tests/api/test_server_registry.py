@@ -0,0 +1,57 @@
+import configparser
+import time
+
+from calm.dsl.api import handle
+from calm.dsl.api.handle import get_connection_params, get_server_names, map_servers
+
+
+class TestServerRegistry:
+    def get_config(self):
+        config = configparser.ConfigParser()
+        config.optionxform = str
+        server = {"pc_ip": "10.0.0.1", "pc_port": "9440"}
+        config.read_dict(
+            {
+                "SERVER": server,
+                "CONNECTION": {"rate_limit": "10"},
+                "SERVER:pc-2": dict(server, pc_ip="10.0.0.2", rate_limit="2"),
+                "SERVER:pc-3": dict(server, pc_ip="10.0.0.3"),
+            }
+        )
+        return config
+
+    def test_server_settings(self):
+        config = self.get_config()
+        assert get_server_names(config) == ["default", "pc-2", "pc-3"]
+
+        rates = [
+            get_connection_params(config, server)["throttle"].bucket.rate
+            for server in get_server_names(config)
+        ]
+        assert rates == [10, 2, 10]
+
+    def test_map_servers(self, fake_server, monkeypatch):
+        client = fake_server.get_client_handle()
+
+        def get_server_client(server):
+            if server == "down":
+                raise ValueError("Server 'down' not found in config")
+            return client
+
+        monkeypatch.setattr(handle, "get_server_client", get_server_client)
+        fake_server.add_latency(r"/projects/list$", 0.2)
+
+        start = time.time()
+        results = map_servers(
+            lambda client: client.project.list()[0].json()["metadata"]["total_matches"],
+            ["a", "down", "b"],
+        )
+
+        # Servers are queried concurrently
+        assert time.time() - start < 0.4
+        assert [(server, result) for server, result, _ in results] == [
+            ("a", 1),
+            ("down", None),
+            ("b", 1),
+        ]
+        assert isinstance(results[1][2], ValueError)
@@ -0,0 +1,81 @@
+import io
+
+from requests import Response
+from requests.exceptions import ChunkedEncodingError
+from requests.structures import CaseInsensitiveDict
+
+
+class BrokenStream(io.BytesIO):
+    """Raw response body which breaks after `limit` bytes"""
+
+    def __init__(self, content, limit):
+        super().__init__(content)
+        self.limit = limit
+        self.size = len(content)
+
+    def read(self, size=-1):
+        if self.limit < self.size and self.tell() >= self.limit:
+            raise ChunkedEncodingError("Connection broken")
+        return super().read(min(size, self.limit - self.tell()))
+
+
+def get_stream_response(content, status_code=200, limit=None, headers=None):
+    res = Response()
+    res.status_code = status_code
+    res.raw = BrokenStream(content, limit if limit is not None else len(content))
+    res.headers = CaseInsensitiveDict(headers or {})
+    res.headers["Content-Length"] = str(len(content))
+    return res
+
+
+class TestStreamingDownload:
+    def test_body_written_in_chunks(self, tmp_path, offline_connection):
+        content = b"x" * 1000
+        conn, _ = offline_connection([get_stream_response(content)])
+        file_name = str(tmp_path / "runlog.zip")
+        progress = []
+
+        res, err = conn.stream(
+            "api/nutanix/v3/apps/1/app_runlogs/2/output/download",
+            file_name,
+            chunk_size=300,
+            progress=lambda done, total: progress.append((done, total)),
+        )
+
+        assert err is None
+        assert open(file_name, "rb").read() == content
+        assert progress == [(300, 1000), (600, 1000), (900, 1000), (1000, 1000)]
+
+    def test_interrupted_download_is_resumed(self, offline_connection):
+        content = bytes(range(256)) * 4
+        conn, transport = offline_connection(
+            [
+                get_stream_response(
+                    content, limit=600, headers={"Accept-Ranges": "bytes"}
+                ),
+                get_stream_response(content[600:], status_code=206),
+            ]
+        )
+        fd = io.BytesIO()
+
+        res, err = conn.stream("api/nutanix/v3/blueprints/1/export_json", fd)
+
+        assert err is None
+        assert fd.getvalue() == content
+        headers = [request["headers"] for request in transport.requests]
+        assert all(request["stream"] for request in transport.requests)
+        assert "Range" not in headers[0]
+        assert headers[1]["Range"] == "bytes=600-"
+
+    def test_resume_partial_file(self, tmp_path, offline_connection):
+        content = b"abcdefghij"
+        file_name = tmp_path / "runlog.zip"
+        file_name.write_bytes(content[:4])
+        conn, transport = offline_connection(
+            [get_stream_response(content[4:], status_code=206)]
+        )
+
+        conn.stream("download", str(file_name), resume=True)
+
+        assert transport.requests[0]["headers"]["Range"] == "bytes=4-"
+        assert file_name.read_bytes() == content
@@ -0,0 +1,82 @@
+import threading
+import time
+
+from calm.dsl.api import handle
+from calm.dsl.api.connection import Connection
+from calm.dsl.api.handle import get_connection_params
+from calm.dsl.api.throttle import RequestThrottle, TokenBucket
+
+
+class TestRequestThrottle:
+    def test_token_bucket_rate(self):
+        bucket = TokenBucket(rate=20, burst=1)
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+
+        # First token is available at once, rest come every 50ms
+        assert time.monotonic() - start >= 0.19
+
+    def test_in_flight_limit(self, fake_server):
+        throttle = RequestThrottle(max_in_flight=2, adaptive=False)
+        conn = Connection(
+            fake_server.host,
+            fake_server.port,
+            scheme=fake_server.scheme,
+            throttle=throttle,
+        )
+        conn.connect()
+        fake_server.add_latency(r"/projects/list$", 0.1)
+
+        start = time.monotonic()
+        threads = [
+            threading.Thread(target=conn._call, args=("api/nutanix/v3/projects/list",))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert time.monotonic() - start >= 0.3
+        assert len(fake_server.get_requests(path="projects/list")) == 6
+
+    def test_backs_off_on_overload(self, fake_server):
+        throttle = RequestThrottle(rate=50, max_in_flight=4)
+        conn = Connection(
+            fake_server.host,
+            fake_server.port,
+            scheme=fake_server.scheme,
+            throttle=throttle,
+        )
+        conn.connect()
+        fake_server.add_error(r"/apps/list$", status=429, count=1)
+
+        res, err = conn._call("api/nutanix/v3/apps/list", ignore_error=True)
+        assert err["code"] == 429
+        stats = throttle.get_stats()
+        assert stats["rate"] == 25
+        assert stats["in_flight_limit"] == 2
+        assert stats["throttled"] == 1
+
+        for _ in range(10):
+            conn._call("api/nutanix/v3/apps/list")
+        stats = throttle.get_stats()
+        assert 25 < stats["rate"] < 50
+        assert stats["in_flight_limit"] > 2
+
+    def test_throttle_from_config(self, conn_config):
+        config = conn_config(rate_limit="10", max_in_flight="4")
+        throttle = get_connection_params(config)["throttle"]
+        assert throttle.bucket.rate == 10
+        assert throttle.limiter.max_limit == 4
+        assert throttle.adaptive
+
+        assert "throttle" not in get_connection_params(conn_config())
+
+    def test_params_read_only_for_new_handle(self, monkeypatch):
+        client = object()
+        monkeypatch.setattr(handle, "_CLIENT_HANDLE", client)
+        monkeypatch.setattr(handle, "get_connection_params", None)
+
+        assert handle.get_api_client() is client
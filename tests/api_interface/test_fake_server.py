@@ -0,0 +1,95 @@
+import time
+
+from calm.dsl.tools import get_logging_handle
+from calm.dsl.api.connection import Connection, REQUEST
+from calm.dsl.api.metrics import RequestMetrics
+from calm.dsl.fake_server import KIND
+
+LOG = get_logging_handle(__name__)
+
+
+class TestFakeServer:
+    def test_entity_crud(self, fake_server, fake_client):
+        project = fake_server.store.list(KIND.PROJECT)["entities"][0]
+        payload = {
+            "spec": {"name": "test_bp", "resources": {}},
+            "metadata": {
+                "kind": "blueprint",
+                "project_reference": {
+                    "kind": "project",
+                    "uuid": project["metadata"]["uuid"],
+                },
+            },
+        }
+        res, err = fake_client.blueprint.create(payload)
+        assert not err
+        bp_uuid = res.json()["metadata"]["uuid"]
+
+        bp_map = fake_client.blueprint.get_name_uuid_map({"filter": "name==test_.*"})
+        assert bp_map == {"test_bp": bp_uuid}
+
+        res, err = fake_client.blueprint.read(bp_uuid)
+        bp = res.json()
+        assert bp["status"]["state"] == "ACTIVE"
+        bp["spec"]["description"] = "updated"
+        res, err = fake_client.blueprint.update(bp_uuid, bp)
+        assert res.json()["metadata"]["spec_version"] == 1
+
+        # Stale spec_version is rejected
+        res, err = fake_client.connection._call(
+            fake_client.blueprint.ITEM.format(bp_uuid),
+            method=REQUEST.METHOD.PUT,
+            request_json=bp,
+            ignore_error=True,
+        )
+        assert err["code"] == 409
+
+        fake_client.blueprint.delete(bp_uuid)
+        assert fake_server.store.count(KIND.BLUEPRINT) == 0
+
+    def test_launch_and_run_action(self, fake_server, fake_client):
+        fake_server.store.seed(blueprints=1)
+        bp_uuid = fake_server.store.list(KIND.BLUEPRINT)["entities"][0]["metadata"][
+            "uuid"
+        ]
+
+        res, err = fake_client.blueprint.launch(
+            bp_uuid, {"spec": {"application_name": "app-1"}}
+        )
+        request_id = res.json()["status"]["request_id"]
+        res, err = fake_client.blueprint.poll_launch(bp_uuid, request_id)
+        app_uuid = res.json()["status"]["application_uuid"]
+
+        res, err = fake_client.application.run_action(app_uuid, "action-1", {})
+        runlog_uuid = res.json()["status"]["runlog_uuid"]
+        res, err = fake_client.application.poll_action_run(
+            "api/nutanix/v3/apps/{}/app_runlogs/list".format(app_uuid),
+            {"filter": "root_reference=={}".format(runlog_uuid)},
+        )
+        assert res.json()["metadata"]["total_matches"] == 1
+
+    def test_latency_and_error_injection(self, fake_server):
+        metrics = RequestMetrics()
+        conn = Connection(
+            fake_server.host,
+            fake_server.port,
+            scheme=fake_server.scheme,
+            metrics=metrics,
+        )
+        conn.connect()
+        fake_server.add_latency(r"/projects/list$", 0.2, method="POST")
+        fake_server.add_error(r"/apps/list$", status=503, count=1)
+
+        start = time.time()
+        res, err = conn._call("api/nutanix/v3/projects/list", request_json={})
+        assert time.time() - start >= 0.2
+        assert res.json()["metadata"]["total_matches"] == 1
+
+        res, err = conn._call("api/nutanix/v3/apps/list", ignore_error=True)
+        assert err["code"] == 503
+        res, err = conn._call("api/nutanix/v3/apps/list", ignore_error=True)
+        assert not err
+
+        recorded = fake_server.get_requests(method="POST", path="apps/list")
+        assert [req.status for req in recorded] == [503, 200]
+        assert metrics.to_dict()["summary"]["count"] == 3
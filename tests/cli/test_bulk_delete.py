@@ -0,0 +1,114 @@
+from calm.dsl.cli.apps import AppDeletionState
+from calm.dsl.cli.projects import get_project_deletion_state
+from calm.dsl.cli.utils import delete_entities
+from calm.dsl.cli.constants import APPLICATION, DELETION
+from calm.dsl.fake_server import KIND
+
+
+def get_resolved(fake_server, kind, names):
+    resolved = {name: [] for name in names}
+    for entity in fake_server.store.list(kind, {"length": 100})["entities"]:
+        name = entity["metadata"]["name"]
+        if name in resolved:
+            resolved[name].append(entity["metadata"]["uuid"])
+    return resolved
+
+
+def get_statuses(rows):
+    return {row["name"]: row["status"] for row in rows}
+
+
+class TestBulkDelete:
+    def test_delete_failures_do_not_stop_others(self, fake_server, fake_client):
+        fake_server.store.seed(blueprints=4)
+        names = ["bp-0", "bp-1", "bp-2", "bp-3", "missing"]
+        resolved = get_resolved(fake_server, KIND.BLUEPRINT, names)
+        fake_server.add_error(
+            r"blueprints/{}$".format(resolved["bp-1"][0]), status=500, method="DELETE"
+        )
+
+        rows = delete_entities(fake_client.blueprint, "blueprint", names, resolved)
+
+        assert get_statuses(rows) == {
+            "bp-0": DELETION.STATUS.DELETED,
+            "bp-1": DELETION.STATUS.FAILED,
+            "bp-2": DELETION.STATUS.DELETED,
+            "bp-3": DELETION.STATUS.DELETED,
+            "missing": DELETION.STATUS.FAILED,
+        }
+        assert fake_server.store.count(KIND.BLUEPRINT) == 1
+
+    def test_pending_deletions_polled_together(self, fake_server, fake_client):
+        fake_server.store.seed(blueprints=3)
+        names = ["bp-0", "bp-1", "bp-2"]
+        resolved = get_resolved(fake_server, KIND.BLUEPRINT, names)
+        bp_1 = resolved["bp-1"][0]
+
+        # Deletion of bp-1 never finishes, others are found deleted when polled
+        def delete_func(uuids):
+            return [({}, None) for _ in uuids]
+
+        def get_deletion_state(bp):
+            if bp["metadata"]["uuid"] == bp_1:
+                return DELETION.STATUS.IN_PROGRESS, ""
+            return DELETION.STATUS.DELETED, ""
+
+        rows = delete_entities(
+            fake_client.blueprint,
+            "blueprint",
+            names,
+            resolved,
+            delete_func=delete_func,
+            get_deletion_state=get_deletion_state,
+            wait=True,
+            poll_interval=0.05,
+            timeout=0.3,
+        )
+
+        assert get_statuses(rows) == {
+            "bp-0": DELETION.STATUS.DELETED,
+            "bp-1": DELETION.STATUS.TIMED_OUT,
+            "bp-2": DELETION.STATUS.DELETED,
+        }
+
+        # First poll reads all pending deletions in one batch, later ones only bp-1
+        polls = fake_server.get_requests(method="POST", path="batch")
+        assert len(polls) == 1
+        assert len(fake_server.get_requests(method="GET", path=bp_1)) >= 2
+
+    def test_pending_deletions_not_polled_by_default(self, fake_server, fake_client):
+        fake_server.store.seed(blueprints=1)
+        resolved = get_resolved(fake_server, KIND.BLUEPRINT, ["bp-0"])
+
+        rows = delete_entities(
+            fake_client.blueprint,
+            "blueprint",
+            ["bp-0"],
+            resolved,
+            get_deletion_state=lambda bp: (DELETION.STATUS.DELETED, ""),
+        )
+
+        assert get_statuses(rows) == {"bp-0": DELETION.STATUS.IN_PROGRESS}
+        assert not fake_server.get_requests(method="GET")
+
+    def test_errored_app_failed_only_after_deleting(self):
+        get_deletion_state = AppDeletionState()
+
+        def get_app(state):
+            return {"metadata": {"uuid": "1"}, "status": {"state": state}}
+
+        # App was in error state before delete started
+        status, _ = get_deletion_state(get_app(APPLICATION.STATES.ERROR))
+        assert status == DELETION.STATUS.IN_PROGRESS
+
+        get_deletion_state(get_app(APPLICATION.STATES.DELETING))
+        status, _ = get_deletion_state(get_app(APPLICATION.STATES.ERROR))
+        assert status == DELETION.STATUS.FAILED
+
+    def test_project_deletion_state(self):
+        for state in ["DELETE_PENDING", "DELETE_IN_PROGRESS"]:
+            status, _ = get_project_deletion_state({"status": {"state": state}})
+            assert status == DELETION.STATUS.IN_PROGRESS
+
+        status, _ = get_project_deletion_state({"status": {"state": "COMPLETE"}})
+        assert status == DELETION.STATUS.DELETED
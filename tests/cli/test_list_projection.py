@@ -0,0 +1,63 @@
+import json
+
+from calm.dsl.cli import bps, apps
+from calm.dsl.cli.bps import list_blueprint_rows, BLUEPRINT_GROUP_ATTRIBUTES
+from calm.dsl.cli.apps import list_app_rows
+
+
+class TestListProjection:
+    def test_blueprint_rows(self, fake_server, fake_client):
+        fake_server.store.seed(blueprints=5)
+
+        rows, err = list_blueprint_rows(fake_client, "name==bp-[0-3]", 3, 1)
+        assert not err
+        assert [row["name"] for row in rows] == ["bp-2", "bp-1", "bp-0"]
+
+        # Only the displayed attributes are asked for, paged on server
+        payload = json.loads(fake_server.get_requests(path="groups$")[0].body)
+        assert payload["group_member_count"] == 3
+        assert payload["group_member_offset"] == 1
+        assert [item["attribute"] for item in payload["group_member_attributes"]] == (
+            BLUEPRINT_GROUP_ATTRIBUTES
+        )
+
+        # list api gives same rows, if groups api fails
+        fake_server.add_error(r"groups$", status=500)
+        list_rows, err = list_blueprint_rows(fake_client, "name==bp-[0-3]", 3, 0)
+        assert not err
+        assert len(fake_server.get_requests(path="blueprints/list")) == 1
+        assert sorted(list_rows, key=lambda row: row["name"]) == sorted(
+            rows, key=lambda row: row["name"]
+        )
+
+    def test_app_rows(self, fake_server, fake_client):
+        fake_server.store.seed(blueprints=2, apps=2)
+
+        rows, err = list_app_rows(fake_client, "", 20, 0)
+        assert not err
+        assert [(row["name"], row["blueprint"]) for row in rows] == [
+            ("app-1", "bp-1"),
+            ("app-0", "bp-0"),
+        ]
+
+        fake_server.add_error(r"groups$", status=500)
+        list_rows, err = list_app_rows(fake_client, "", 20, 0)
+        assert not err
+        assert list_rows[::-1] == rows
+
+    def test_rows_without_values(self, fake_client, monkeypatch, capsys):
+        # groups api does not return attributes which have no value
+        def list_group_members(client, entity_type, attributes, **kwargs):
+            member = {attribute: None for attribute in attributes}
+            member.update({"uuid": "uuid-1", "name": "name-1"})
+            return [member]
+
+        for module in [bps, apps]:
+            monkeypatch.setattr(module, "list_group_members", list_group_members)
+            monkeypatch.setattr(module, "get_api_client", lambda: fake_client)
+
+        bps.get_blueprint_list(None, None, 20, 0, False, False)
+        assert "uuid-1" in capsys.readouterr().out
+
+        apps.get_apps(None, None, 20, 0, False, False)
+        assert "uuid-1" in capsys.readouterr().out
@@ -0,0 +1 @@
+pytest_plugins = ["calm.dsl.fake_server.fixtures"]
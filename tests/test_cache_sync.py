@@ -0,0 +1,351 @@
+import datetime
+import json
+import time
+
+import pytest
+
+from calm.dsl.providers.plugins.ahv_vm import main as ahv_main
+from calm.dsl.config import get_config
+from calm.dsl.db import get_db_handle
+from calm.dsl.db import table_config
+from calm.dsl.store import Cache
+from calm.dsl.store import version
+from calm.dsl.store import cache
+from calm.dsl.fake_server import KIND
+
+
+@pytest.fixture
+def client(fake_server, fake_client, monkeypatch):
+    monkeypatch.setattr(table_config, "get_api_client", lambda: fake_client)
+    monkeypatch.setattr(ahv_main, "get_api_client", lambda: fake_client)
+    monkeypatch.setattr(version, "get_api_client", lambda: fake_client)
+
+    # Cache lookups are scoped to the server in config
+    config = get_config()
+    monkeypatch.setitem(config["SERVER"], "pc_ip", fake_client.connection.host)
+    monkeypatch.setitem(config["SERVER"], "pc_port", str(fake_client.connection.port))
+
+    Cache.clear_entities()
+    # Provider apis are chosen by calm version
+    version.Version.sync()
+    fake_server.reset()
+    yield fake_client
+    Cache.clear_entities()
+
+
+def set_cache_config(monkeypatch, **settings):
+    monkeypatch.setattr(
+        cache, "get_cache_config", lambda: dict(settings, read_through=True)
+    )
+
+
+def get_cached(table):
+    return sorted((entity.name, entity.uuid) for entity in table.select())
+
+
+def get_project(fake_server, name):
+    for project in fake_server.store.list(KIND.PROJECT)["entities"]:
+        if project["metadata"]["name"] == name:
+            return project
+
+
+def test_project_incremental_sync(fake_server, client):
+    db = get_db_handle()
+    db.project.sync()
+    default = get_project(fake_server, "default")
+    assert get_cached(db.project) == [("default", default["metadata"]["uuid"])]
+
+    p1 = fake_server.store.create(KIND.PROJECT, {"spec": {"name": "p1"}})
+    p1_uuid = p1["metadata"]["uuid"]
+    fake_server.store.delete(KIND.PROJECT, default["metadata"]["uuid"])
+    fake_server.reset()
+
+    db.project.sync()
+    assert get_cached(db.project) == [("p1", p1_uuid)]
+
+    # Deletions are found from uuids, updates from a small sorted page
+    assert len(fake_server.get_requests(path="groups$")) == 1
+    list_request = fake_server.get_requests(path="projects/list")[0]
+    params = json.loads(list_request.body)
+    assert params["sort_attribute"] == "last_update_time"
+    assert params["length"] == table_config.INCREMENTAL_SYNC_PAGE_SIZE
+
+
+def test_full_sync(fake_server, client):
+    db = get_db_handle()
+    db.project.sync()
+    fake_server.reset()
+
+    db.project.sync(full=True)
+    assert len(get_cached(db.project)) == 1
+    assert not fake_server.get_requests(path="groups$")
+
+
+def test_uuid_listing_failure_syncs_all(fake_server, client):
+    db = get_db_handle()
+    db.project.sync()
+    fake_server.store.create(KIND.PROJECT, {"spec": {"name": "p1"}})
+    fake_server.add_error(r"groups$", status=500)
+
+    db.project.sync()
+    assert [name for name, _ in get_cached(db.project)] == ["default", "p1"]
+
+
+def test_unsorted_pages_are_all_read(monkeypatch):
+    # Newest created first, the server ignoring sort params
+    update_times = [500, 300, 200, 100, 900]
+    pages = []
+
+    def list_page(params):
+        pages.append(params["offset"])
+        offset = params["offset"]
+        end = offset + params["length"]
+        entities = [
+            {"metadata": {"uuid": str(index), "last_update_time": update_time}}
+            for index, update_time in enumerate(update_times)
+        ]
+        return {
+            "entities": entities[offset:end],
+            "metadata": {"total_matches": len(entities)},
+        }
+
+    monkeypatch.setattr(table_config, "INCREMENTAL_SYNC_PAGE_SIZE", 2)
+    entities = list(table_config.iter_updated_entities(list_page, since=400))
+
+    assert [entity["metadata"]["uuid"] for entity in entities] == ["0", "4"]
+    assert pages == [0, 2, 4]
+
+
+def test_subnet_added_to_project(fake_server, client):
+    db = get_db_handle()
+    project = get_project(fake_server, "default")
+    account_uuid = project["spec"]["resources"]["account_reference_list"][0]["uuid"]
+    subnet = fake_server.store.create(
+        KIND.SUBNET,
+        {
+            "spec": {
+                "name": "vlan.1",
+                "cluster_reference": {"name": "cluster-1"},
+                "resources": {"account_uuid": account_uuid},
+            }
+        },
+        state="COMPLETE",
+    )
+    # vlan.0 is updated after vlan.1, so synced data is newer than vlan.1
+    vlan_0 = fake_server.store.list(KIND.SUBNET)["entities"][0]
+    fake_server.store.update(KIND.SUBNET, vlan_0["metadata"]["uuid"], vlan_0)
+    db.ahv_subnet.sync()
+    assert [name for name, _ in get_cached(db.ahv_subnet)] == ["vlan.0"]
+
+    # vlan.1 is not updated after last sync, but is new to the project
+    project["spec"]["resources"]["subnet_reference_list"].append(
+        {"kind": "subnet", "uuid": subnet["metadata"]["uuid"]}
+    )
+    fake_server.store.update(KIND.PROJECT, project["metadata"]["uuid"], project)
+
+    db.ahv_subnet.sync()
+    assert [name for name, _ in get_cached(db.ahv_subnet)] == ["vlan.0", "vlan.1"]
+
+
+def test_tables_synced_concurrently(fake_server, client):
+    delay = 1
+    fake_server.add_latency(r"list$", delay)
+
+    start = time.time()
+    Cache.sync()
+    elapsed = time.time() - start
+
+    db = get_db_handle()
+    assert [name for name, _ in get_cached(db.ahv_subnet)] == ["vlan.0"]
+    assert [name for name, _ in get_cached(db.ahv_disk_image)] == ["Centos7"]
+
+    # Project and account, needed by subnets and images, are looked up once
+    assert len(fake_server.get_requests(path="projects_internal")) == 1
+    assert len(fake_server.get_requests(path="accounts/list")) == 1
+
+    # Longest chain: project lookup, account lookup and subnets list.
+    # Tables synced one after other make atleast 6 list calls.
+    assert elapsed < 5 * delay
+
+
+def test_bulk_writes(client):
+    db = get_db_handle()
+    table = db.ahv_disk_image
+    entries = [
+        {"name": "image-{}".format(index), "uuid": str(index), "image_type": "ISO"}
+        for index in range(table.WRITE_CHUNK_SIZE * 2 + 1)
+    ]
+
+    table.replace_entries(entries)
+    assert table.select().count() == len(entries)
+    assert table.get_entity_data("image-0", image_type="ISO")["uuid"] == "0"
+
+    # Entries with same keys are replaced
+    table.insert_entries(entries[:2])
+    assert table.select().count() == len(entries)
+
+    table.delete_entries(entry["uuid"] for entry in entries[1:])
+    assert get_cached(table) == [("image-0", "0")]
+
+    table.replace_entries(entries[1:2])
+    assert get_cached(table) == [("image-1", "1")]
+
+
+def test_missing_entry_read_through(fake_server, client, monkeypatch):
+    set_cache_config(monkeypatch)
+    db = get_db_handle()
+    project = Cache.get_entity_data("project", "default")
+    assert project["uuid"] == get_project(fake_server, "default")["metadata"]["uuid"]
+    assert get_cached(db.project) == [("default", project["uuid"])]
+
+    fake_server.reset()
+    assert Cache.get_entity_data("project", "default") == project
+    assert not fake_server.get_requests()
+
+    image = Cache.get_entity_data("ahv_disk_image", "Centos7", image_type="DISK_IMAGE")
+    assert image["name"] == "Centos7"
+    subnet = Cache.get_entity_data("ahv_subnet", "vlan.0", cluster="cluster-1")
+    assert subnet["name"] == "vlan.0"
+
+
+def test_unknown_name_looked_up_once(fake_server, client, monkeypatch):
+    set_cache_config(monkeypatch)
+    assert Cache.get_entity_data("project", "defualt") is None
+    assert len(fake_server.get_requests(path="projects/list")) == 1
+
+    fake_server.reset()
+    assert Cache.get_entity_data("project", "defualt") is None
+    assert not fake_server.get_requests()
+
+    # Names are looked up again after negative_ttl. Memoized lookups expire
+    # as per settings they were made with.
+    set_cache_config(monkeypatch, negative_ttl=0)
+    Cache.memo.invalidate()
+    assert Cache.get_entity_data("project", "defualt") is None
+    assert len(fake_server.get_requests(path="projects/list")) == 1
+
+
+def test_expired_entry_read_through(fake_server, client, monkeypatch):
+    set_cache_config(monkeypatch)
+    db = get_db_handle()
+    db.project.sync()
+    project = get_project(fake_server, "default")
+    fake_server.store.delete(KIND.PROJECT, project["metadata"]["uuid"])
+    p1 = fake_server.store.create(KIND.PROJECT, {"spec": {"name": "default"}})
+    fake_server.reset()
+
+    # Fresh entries are used as is
+    assert Cache.get_entity_data("project", "default")["uuid"] == (
+        project["metadata"]["uuid"]
+    )
+    assert not fake_server.get_requests()
+
+    set_cache_config(monkeypatch, project_ttl=0)
+    Cache.memo.invalidate()
+    assert Cache.get_entity_data("project", "default")["uuid"] == (
+        p1["metadata"]["uuid"]
+    )
+    assert get_cached(db.project) == [("default", p1["metadata"]["uuid"])]
+
+    # Stale entry is used, if server can not be reached
+    fake_server.add_error(r"projects/list$", status=500)
+    Cache.memo.invalidate()
+    assert Cache.get_entity_data("project", "default")["uuid"] == (
+        p1["metadata"]["uuid"]
+    )
+
+
+def test_entry_fresh_after_sync(fake_server, client, monkeypatch):
+    set_cache_config(monkeypatch)
+    db = get_db_handle()
+    # Project update times are in seconds, p1 is updated after default
+    time.sleep(1)
+    fake_server.store.create(KIND.PROJECT, {"spec": {"name": "p1"}})
+    db.project.sync()
+
+    # Incremental sync does not rewrite unchanged rows, entries synced just
+    # now are fresh whatever the row time
+    last_update_time = datetime.datetime.now() - datetime.timedelta(days=1)
+    db.project.update(last_update_time=last_update_time).execute()
+    db.project.sync()
+    assert db.project.get(name="default").last_update_time == last_update_time
+    fake_server.reset()
+
+    # Fresh entries are looked up without an api client
+    monkeypatch.setattr(table_config, "get_api_client", None)
+    assert Cache.get_entity_data("project", "default")
+    assert not fake_server.get_requests()
+
+
+def test_sync_context_shared(fake_server, client, monkeypatch):
+    contexts = []
+
+    def create_context():
+        contexts.append(table_config.CacheSyncContext())
+        return contexts[-1]
+
+    monkeypatch.setattr(cache, "CacheSyncContext", create_context)
+    set_cache_config(monkeypatch, project_ttl=0)
+    for _ in range(3):
+        Cache.memo.invalidate()
+        Cache.get_entity_data("project", "default")
+
+    assert len(contexts) == 1
+
+
+def test_read_through_disabled(fake_server, client, monkeypatch):
+    # Read through is off by default
+    monkeypatch.setattr(cache, "get_cache_config", lambda: {})
+    monkeypatch.setattr(table_config, "get_api_client", None)
+
+    assert Cache.get_entity_data("project", "default") is None
+    assert not fake_server.get_requests()
+
+
+def test_project_not_found_read_through(fake_server, client, monkeypatch):
+    set_cache_config(monkeypatch)
+    config = get_config()
+    monkeypatch.setitem(config["PROJECT"], "name", "missing")
+
+    # Project in config is needed to look up subnets, cached data is used
+    assert Cache.get_entity_data("ahv_subnet", "vlan.0", cluster="cluster-1") is None
+
+
+def test_lookups_memoized(fake_server, client, monkeypatch):
+    db = get_db_handle()
+    db.ahv_disk_image.sync()
+    monkeypatch.setattr(Cache, "memo", cache.EntityMemo(max_size=2))
+    monkeypatch.setattr(cache, "get_cache_config", lambda: {"read_through": False})
+
+    queries = []
+    get_entity_data = db.ahv_disk_image.get_entity_data.__func__
+
+    def counted_get_entity_data(table, name, **kwargs):
+        queries.append(name)
+        return get_entity_data(table, name, **kwargs)
+
+    monkeypatch.setattr(
+        db.ahv_disk_image, "get_entity_data", classmethod(counted_get_entity_data)
+    )
+
+    for _ in range(3):
+        image = Cache.get_entity_data(
+            "ahv_disk_image", "Centos7", image_type="DISK_IMAGE"
+        )
+        assert image["name"] == "Centos7"
+    assert queries == ["Centos7"]
+
+    # Least recently used lookups are evicted
+    Cache.get_entity_data("ahv_disk_image", "Centos7", image_type="ISO_IMAGE")
+    Cache.get_entity_data("ahv_disk_image", "CentOS", image_type="DISK_IMAGE")
+    Cache.get_entity_data("ahv_disk_image", "Centos7", image_type="DISK_IMAGE")
+    assert len(queries) == 4
+
+    stats = Cache.memo.get_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 4, 2)
+    assert stats["hit_rate"] == round(2 / 6, 4)
+
+    # Sync invalidates memoized lookups
+    Cache.sync()
+    Cache.get_entity_data("ahv_disk_image", "Centos7", image_type="DISK_IMAGE")
+    assert len(queries) == 5
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from calm.dsl.builtins import Service
+from calm.dsl.builtins import CalmVariable as Var
+from calm.dsl.builtins import action
+from calm.dsl.tools import codec
+
+
+BACKENDS = [codec.BACKEND.JSON]
+if codec.orjson is not None:
+    BACKENDS.append(codec.BACKEND.ORJSON)
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    default_backend = codec.get_backend()
+    codec.set_backend(request.param)
+    yield request.param
+    codec.set_backend(default_backend)
+
+
+def test_codec_roundtrip(backend):
+
+    data = {"name": "bp", "spec": {"tiers": ["web", "db"], "count": 2}, "é": None}
+    dump = codec.dumps(data)
+
+    assert dump == json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    assert codec.loads(dump) == data
+    assert codec.loads(codec.dumps_bytes(data)) == data
+    assert json.loads(codec.dumps(data, indent=2)) == data
+
+
+def test_codec_fallback(backend):
+
+    # Non-str keys are not supported by orjson
+    assert codec.loads(codec.dumps({1: "one"})) == {"1": "one"}
+
+    with pytest.raises(TypeError):
+        codec.dumps({"obj": object()})
+
+    with pytest.raises(ValueError):
+        codec.loads(b"{invalid")
+
+
+def test_entity_dump(backend):
+    class MySQLService(Service):
+        """sample mysql service specification"""
+
+        foo = Var("bar")
+
+        @action
+        def __create__():
+            pass
+
+    expected = json.loads(MySQLService.json_dumps(pprint=True))
+
+    assert MySQLService.get_dict() == expected
+    assert codec.loads(MySQLService.json_dumps()) == expected
@@ -0,0 +1,122 @@
+import sqlite3
+
+import pytest
+
+from calm.dsl.providers.plugins.ahv_vm import main  # noqa: F401
+from calm.dsl.db import handler
+from calm.dsl.db.table_config import dsl_database, SecretTable
+
+
+@pytest.fixture
+def db_file(tmp_path, monkeypatch):
+    """Points local db to a new file"""
+
+    path = str(tmp_path / "dsl.db")
+    original_path = dsl_database.database
+    if not dsl_database.is_closed():
+        dsl_database.close()
+    monkeypatch.setattr(handler, "get_init_data", lambda: {"DB": {"location": path}})
+    monkeypatch.setattr(handler.Database, "db", None)
+
+    yield path
+
+    dsl_database.close()
+    dsl_database.init(
+        original_path, pragmas=handler.DB_PRAGMAS, timeout=handler.DB_BUSY_TIMEOUT
+    )
+
+
+def get_user_version(path):
+    return sqlite3.connect(path).execute("PRAGMA user_version").fetchone()[0]
+
+
+def get_tables(path):
+    rows = sqlite3.connect(path).execute(
+        "SELECT name FROM sqlite_master WHERE type='table'"
+    )
+    return {row[0] for row in rows}
+
+
+def test_new_db_is_created_and_stamped(db_file):
+    db = handler.Database()
+
+    assert get_user_version(db_file) == handler.SCHEMA_VERSION
+    assert get_tables(db_file) == {table._meta.table_name for table in db.get_tables()}
+
+
+def test_stamped_db_skips_schema_queries(db_file, monkeypatch):
+    handler.Database()
+    dsl_database.close()
+
+    statements = []
+    connect = dsl_database._connect
+
+    def traced_connect():
+        conn = connect()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(dsl_database, "_connect", traced_connect)
+    handler.Database()
+    assert statements == ["PRAGMA user_version"]
+
+
+def test_unstamped_db_gets_missing_tables(db_file):
+    dsl_database.init(db_file)
+    dsl_database.create_tables([SecretTable])
+    dsl_database.close()
+
+    db = handler.Database()
+    assert get_user_version(db_file) == handler.SCHEMA_VERSION
+    assert db.version_table._meta.table_name in get_tables(db_file)
+
+
+def test_migrations_run_in_order(db_file, monkeypatch):
+    handler.Database()
+    dsl_database.close()
+
+    version = handler.SCHEMA_VERSION
+    migrated = []
+    monkeypatch.setattr(handler, "SCHEMA_VERSION", version + 2)
+    monkeypatch.setattr(
+        handler,
+        "MIGRATIONS",
+        {
+            version + 1: lambda db: migrated.append(version + 1),
+            version + 2: lambda db: migrated.append(version + 2),
+        },
+    )
+
+    handler.Database()
+    assert migrated == [version + 1, version + 2]
+    assert get_user_version(db_file) == version + 2
+
+
+def test_cache_miss_table_migrated(db_file):
+    db = handler.Database()
+    dsl_database.close()
+
+    # Db stamped by version 1, before cache misses were stored
+    conn = sqlite3.connect(db_file)
+    conn.execute("DROP TABLE {}".format(db.cache_miss_table._meta.table_name))
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    handler.Database()
+    assert db.cache_miss_table._meta.table_name in get_tables(db_file)
+    assert get_user_version(db_file) == handler.SCHEMA_VERSION
+
+
+def test_close_registered_once(db_file, monkeypatch):
+    registered = []
+    monkeypatch.setattr(handler.atexit, "register", registered.append)
+    monkeypatch.setattr(handler.Database, "close_registered", False)
+
+    handler.Database()
+    handler.Database()
+    assert len(registered) == 1
+
+    # db may be reset by the time handlers run at exit
+    monkeypatch.setattr(handler.Database, "db", None)
+    registered[0]()
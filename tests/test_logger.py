@@ -0,0 +1,27 @@
+from calm.dsl.tools import logger, get_logging_handle
+
+
+def test_lazy_debug_message(caplog):
+
+    LOG = get_logging_handle("calm.dsl.test_logger")
+    calls = []
+
+    def build_message():
+        calls.append(1)
+        return "built"
+
+    default_level = logger.VERBOSE_LEVEL
+    try:
+        logger.set_verbose_level(logger.CustomLogging.INFO)
+        LOG.debug(build_message)
+        assert not calls
+
+        logger.set_verbose_level(logger.CustomLogging.DEBUG)
+        LOG.debug(build_message)
+        LOG.debug("Body: %s", {"a": 1})
+    finally:
+        logger.set_verbose_level(default_level)
+
+    assert calls == [1]
+    assert "] built" in caplog.text
+    assert "] Body: {'a': 1}" in caplog.text
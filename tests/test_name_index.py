@@ -0,0 +1,83 @@
+import pytest
+
+from calm.dsl.store import NameResolver
+from calm.dsl.fake_server import KIND
+
+
+@pytest.fixture
+def resolver(fake_server, fake_client):
+    fake_server.store.seed(blueprints=3)
+    resolver = NameResolver(fake_client, ttl=300, negative_ttl=30)
+    resolver.invalidate("blueprint")
+    yield resolver
+    resolver.invalidate("blueprint")
+
+
+def get_bp_uuid(fake_server, name):
+    for bp in fake_server.store.list(KIND.BLUEPRINT)["entities"]:
+        if bp["metadata"]["name"] == name:
+            return bp["metadata"]["uuid"]
+
+
+def test_resolve_from_index(fake_server, resolver):
+    names = ["bp-0", "bp-1", "missing"]
+    resolved = resolver.resolve("blueprint", names)
+    assert resolved == {
+        "bp-0": [get_bp_uuid(fake_server, "bp-0")],
+        "bp-1": [get_bp_uuid(fake_server, "bp-1")],
+        "missing": [],
+    }
+    assert len(fake_server.get_requests(path="batch")) == 1
+
+    # Found and missing names are both served from index
+    assert resolver.resolve("blueprint", names) == resolved
+    assert len(fake_server.get_requests(path="batch")) == 1
+
+    # Index is bypassed for lookups with other filters
+    resolver.resolve("blueprint", names, use_index=False)
+    assert len(fake_server.get_requests(path="batch")) == 2
+
+
+def test_negative_ttl(fake_server, fake_client, resolver):
+    resolver.resolve("blueprint", ["missing"])
+
+    resolver = NameResolver(fake_client, ttl=300, negative_ttl=0)
+    resolver.resolve("blueprint", ["missing"])
+    assert len(fake_server.get_requests(path="blueprints/list")) == 2
+
+
+def test_invalidate(fake_server, resolver):
+    resolver.resolve("blueprint", ["bp-0"])
+    resolver.invalidate("blueprint", ["bp-0"])
+    resolver.resolve("blueprint", ["bp-0"])
+    assert len(fake_server.get_requests(path="blueprints/list")) == 2
+
+
+def test_stale_uuid_is_looked_up_again(fake_server, resolver):
+    resolver.resolve("blueprint", ["bp-0"])
+    fake_server.store.delete(KIND.BLUEPRINT, get_bp_uuid(fake_server, "bp-0"))
+
+    assert resolver.get_entities("blueprint", ["bp-0"]) == {"bp-0": []}
+    assert resolver.resolve("blueprint", ["bp-0"]) == {"bp-0": []}
+    assert len(fake_server.get_requests(path="blueprints/list")) == 2
+
+
+def test_renamed_entity_is_not_returned(fake_server, resolver):
+    bp_uuid = get_bp_uuid(fake_server, "bp-0")
+    resolver.resolve("blueprint", ["bp-0"])
+    fake_server.store.update(KIND.BLUEPRINT, bp_uuid, {"spec": {"name": "bp-new"}})
+
+    assert resolver.get_entities("blueprint", ["bp-0"]) == {"bp-0": []}
+
+
+def test_soft_deleted_entity_is_not_returned(fake_server, resolver):
+    bp_uuid = get_bp_uuid(fake_server, "bp-0")
+    resolver.resolve("blueprint", ["bp-0"], filter_query="state!=DELETED")
+    fake_server.store._entities[KIND.BLUEPRINT][bp_uuid]["status"]["state"] = "DELETED"
+
+    found = resolver.get_entities("blueprint", ["bp-0"], filter_query="state!=DELETED")
+    assert found == {"bp-0": []}
+
+    # Deleted entities are returned, if they are searched for
+    found = resolver.get_entities("blueprint", ["bp-0"], use_index=False)
+    assert [bp["metadata"]["uuid"] for bp in found["bp-0"]] == [bp_uuid]